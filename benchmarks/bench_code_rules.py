@@ -0,0 +1,120 @@
+"""
+품목코드 규칙 엔진 벤치마크 + 동일성 검사
+=========================================
+합성 (색상, 품명, 규격, 비고) 행을 만들어
+- legacy_codegen(최적화 이전 사본)과 local_file_processor 의 결과가 완전히 같은지 확인하고
+- 행당 품목명/품목코드 생성 시간을 비교한 뒤
+- 규칙별 적중 횟수를 출력
+
+사용법:
+    python benchmarks/bench_code_rules.py              # 100,000행
+    python benchmarks/bench_code_rules.py --rows 20000 --seed 7
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import code_rules  # noqa: E402
+import legacy_codegen  # noqa: E402
+import local_file_processor  # noqa: E402
+
+COLORS = [
+    '영림101', '영림101 화이트', '영림205 PS12', '영림301PS12', 'PS123', 'PX77', '화이트',
+    '화이트 오크', '우딘 월넛', '예림 체리', '체리', '미색', 'W-303', '영림 12 그레이', '',
+    '영림7 LG01', '그레이 88', 'www.yl.co.kr 화이트',
+]
+ITEMS = [
+    'ABS문틀 일반형', '발포 문틀 슬림', '방염 와이드문틀', '비방염 3연동 문틀', '분리형 문틀 스토퍼',
+    '알루미늄 히든 문틀', '차음 문틀(식기X)', 'YS-100 ABS도어', 'YA-20A 미서기 도어', 'YAT-5 도어',
+    'M/D 민무늬 문짝', '탈공 문짝', '슬림 3연동 도어', '상부레일 슬림', '초슬림 2연동 레일', '하부레일',
+    '걸레받이몰딩 (80*9)', '60MM평판 몰딩(9T)', '40MM평 몰딩', '템바보드 방염 소반달', '템바루바 대형반달',
+    '기둥 몰딩', '프레임몰딩 45', '천장몰딩', '코너몰딩 30번', '문선 70바용', '계단 몰딩', '루바 12*90',
+    '일체형 문틀', '가변형 문틀 2100문', '스텝 문틀', '무메 문틀', '기타 부자재',
+]
+SPECS = [
+    '2100*900*/N', '2100*800/S', '2100*900*/Y', '2300*1200', '2400', '(2400*600)', '(100*100*9)',
+    '1800', '2100*900*', '2100*900*/', '2100*1500/ Y', '(80*9)', '900', '21', '', '2100문',
+]
+REMARKS = ['', '현장납품', '18*9', '9T', '12t', '기둥용', '70*9', '비고']
+BRANDS = ['Y', 'W', 'y']
+
+
+def make_rows(count: int, seed: int) -> list:
+    rnd = random.Random(seed)
+    return [
+        (rnd.choice(COLORS), rnd.choice(ITEMS), rnd.choice(SPECS), rnd.choice(REMARKS), rnd.choice(BRANDS))
+        for _ in range(count)
+    ]
+
+
+def run_pipeline(module, rows: list) -> list:
+    """행마다 품목명 전처리 + 품목코드 + 단위를 생성 (process_html_content 의 행 처리와 동일)"""
+    out = []
+    for color, item, spec, remarks, brand in rows:
+        out.append((
+            module.preprocess_color_for_product_name(color),
+            module.preprocess_item_name_for_product_name(item, spec),
+            module.preprocess_spec_for_product_name(spec),
+            module.generate_product_code(color, item, spec, remarks, brand),
+            module.generate_unit(item, spec, remarks),
+        ))
+    return out
+
+
+def check_equivalence(rows: list) -> int:
+    expected = run_pipeline(legacy_codegen, rows)
+    actual = run_pipeline(local_file_processor, rows)
+    mismatches = 0
+    for row, exp, act in zip(rows, expected, actual):
+        if exp != act:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"❌ 불일치: {row}\n   legacy={exp}\n   new   ={act}")
+    return mismatches
+
+
+def time_pipeline(module, rows: list) -> float:
+    start = time.perf_counter()
+    run_pipeline(module, rows)
+    return time.perf_counter() - start
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="품목코드 규칙 엔진 벤치마크")
+    parser.add_argument("--rows", type=int, default=100_000, help="합성 행 수")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드")
+    args = parser.parse_args(argv)
+
+    rows = make_rows(args.rows, args.seed)
+    print(f"합성 행 {len(rows):,}개")
+
+    mismatches = check_equivalence(rows)
+    if mismatches:
+        print(f"❌ 결과 불일치 {mismatches}건")
+        return 1
+    print("✅ legacy 결과와 완전히 일치")
+
+    code_rules.reset_rule_hit_stats()
+    legacy_sec = time_pipeline(legacy_codegen, rows)
+    new_sec = time_pipeline(local_file_processor, rows)
+    print(f"legacy : {legacy_sec:.3f}s ({len(rows) / legacy_sec:,.0f} rows/sec)")
+    print(f"engine : {new_sec:.3f}s ({len(rows) / new_sec:,.0f} rows/sec)")
+    print(f"속도 향상: x{legacy_sec / new_sec:.2f}")
+
+    print("\n규칙별 적중 횟수:")
+    for set_name, counts in code_rules.rule_hit_stats().items():
+        print(f"  [{set_name}]")
+        for rule_name, hits in counts.items():
+            print(f"    {rule_name:<20}{hits:>10,}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+회사명 탐지 동일성 검사 + 벤치마크
+==================================
+detect_company / should_add_company_prefix 가 legacy_codegen 과
+같은 결과를 내는지 확인하고, 큰 페이지에서의 탐지 시간을 비교 (전체 / 머리글 영역만)
+
+검사 대상:
+- fixture 주문서 (실제 파싱 행 포함)
+- 합성 페이지: 회사 키워드 위치(앞/뒤/행 데이터에만/없음)와 순서를 섞은 큰 HTML
+- 합성 (색상, 품명) 조합에 대한 접두어 판단
+
+사용법:
+    python benchmarks/bench_company_detect.py
+    python benchmarks/bench_company_detect.py --pages 2000 --page-kb 500
+"""
+
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import legacy_codegen  # noqa: E402
+import local_file_processor  # noqa: E402
+from bench_code_rules import COLORS, ITEMS  # noqa: E402
+
+DEFAULT_PATTERNS = [os.path.join(ROOT_DIR, "fixtures", "pages", "*.html")]
+KEYWORDS = ['영림', 'www.yl.co.kr', '우딘', '예림', '영', '림', 'www.yl', '우', '']
+FILLER = '<tr><td class="c">문틀 몰딩 도어 2100*900 화이트</td></tr>\n'
+
+
+def make_page(rnd: random.Random, size: int) -> tuple:
+    """(html, 행 목록) - 키워드를 임의 위치에 0~3개 삽입"""
+    body = FILLER * max(1, size // len(FILLER))
+    for _ in range(rnd.randint(0, 3)):
+        pos = rnd.choice([0, len(body) // 2, len(body)])
+        body = body[:pos] + rnd.choice(KEYWORDS) + body[pos:]
+    rows = [['1', '', rnd.choice(COLORS + KEYWORDS), rnd.choice(ITEMS + KEYWORDS)] + [''] * 5
+            for _ in range(rnd.randint(0, 5))]
+    return f"<html><body>{body}</body></html>", rows
+
+
+def load_fixture_pages(patterns: list) -> list:
+    pages = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            html = local_file_processor.read_order_html(path)
+            pages.append((html, local_file_processor.parse_html_table(html)))
+    return pages
+
+
+def compare(pages: list, rnd: random.Random) -> int:
+    mismatches = 0
+    for html, rows in pages:
+        expected = legacy_codegen.detect_company(html, rows)
+        actual = local_file_processor.detect_company(html, rows, scan_limit=0)
+        if expected != actual:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"❌ detect_company: legacy={expected} new={actual} (html {len(html)}자, 행 {len(rows)})")
+
+    names = COLORS + ITEMS + KEYWORDS
+    for _ in range(20_000):
+        color, item = rnd.choice(names), rnd.choice(names)
+        display = rnd.choice(['영림', '우딘', '예림'])
+        expected = legacy_codegen.should_add_company_prefix(color, item, display)
+        actual = local_file_processor.should_add_company_prefix(color, item, display)
+        if expected != actual:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"❌ should_add_company_prefix({color!r}, {item!r}, {display!r}): "
+                      f"legacy={expected} new={actual}")
+    return mismatches
+
+
+def time_detect(func, pages: list) -> float:
+    start = time.perf_counter()
+    for html, rows in pages:
+        func(html, rows)
+    return time.perf_counter() - start
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="회사명 탐지 벤치마크")
+    parser.add_argument("patterns", nargs="*", default=DEFAULT_PATTERNS, help="주문서 파일 glob 패턴")
+    parser.add_argument("--pages", type=int, default=500, help="합성 페이지 수")
+    parser.add_argument("--page-kb", type=int, default=200, help="합성 페이지 크기 (KB)")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드")
+    args = parser.parse_args(argv)
+
+    rnd = random.Random(args.seed)
+    pages = load_fixture_pages(args.patterns)
+    pages += [make_page(rnd, args.page_kb * 1024) for _ in range(args.pages)]
+    print(f"페이지 {len(pages):,}개 (fixture {len(pages) - args.pages})")
+
+    mismatches = compare(pages, rnd)
+    if mismatches:
+        print(f"❌ 결과 불일치 {mismatches}건")
+        return 1
+    print("✅ legacy 결과와 완전히 일치")
+
+    legacy_sec = time_detect(legacy_codegen.detect_company, pages)
+    new_sec = time_detect(lambda html, rows: local_file_processor.detect_company(html, rows, scan_limit=0), pages)
+    header_sec = time_detect(lambda html, rows: local_file_processor.detect_company(html, rows, scan_limit=4096),
+                             pages)
+    print(f"legacy          : {legacy_sec:.3f}s")
+    print(f"new (전체)      : {new_sec:.3f}s (x{legacy_sec / new_sec:.2f})")
+    print(f"new (앞 4KB)    : {header_sec:.3f}s (x{legacy_sec / header_sec:.2f}, 머리글 영역만)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
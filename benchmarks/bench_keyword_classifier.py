@@ -0,0 +1,116 @@
+"""
+키워드 오토마톤 분류기 동일성 검사 + 벤치마크
+=============================================
+fixture 주문서의 모든 품명 + 합성 품명에 대해
+classify_target / generate_flag_code / generate_molding_flag_code /
+generate_rail_code / generate_unit 결과가 legacy_codegen 과 같은지 확인하고
+품명당 분류 시간을 비교
+
+사용법:
+    python benchmarks/bench_keyword_classifier.py
+    python benchmarks/bench_keyword_classifier.py "data/downloads/*/*.html" --fuzz 50000
+"""
+
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import legacy_codegen  # noqa: E402
+import local_file_processor  # noqa: E402
+import table_parser  # noqa: E402
+from bench_code_rules import ITEMS, SPECS, REMARKS  # noqa: E402
+
+DEFAULT_PATTERNS = [os.path.join(ROOT_DIR, "fixtures", "pages", "*.html")]
+
+# 합성 품명 조각 (키워드 경계/겹침을 일부러 섞음)
+FRAGMENTS = [
+    '문틀', '발포', '분리형', '스토퍼', '문짝', 'ABS', '도어', 'M/D', '민무늬', '탈공', '미서기', '미닫이',
+    '몰딩', '평', '코너', '계단', '천정', '천장', '걸레', '문선', '보드', '루버', '루바', '기둥', '레일',
+    '방염', '비방염', '알루미늄', '슬림와이드', '와이드', '슬림', '초슬림', '차음', '일반형', '가변형',
+    '일체', '히든', '스텝', '무메', '무매', '상부', '하부', '템바보드', '템바루바', '소형반달', '대반달',
+    '직각대', '역반달', '프레임', 'YS-', 'YA-', 'YAT-', 'EZ-', 'SL-', 'A1', '가', '3', '12', '연동',
+    '-', ' ', '(9T)', '60MM', '２', '٣',
+]
+
+
+def load_item_names(patterns: list) -> list:
+    names = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                names.extend(row[3] for row in table_parser.parse_table(f.read()))
+    return names
+
+
+def make_fuzz_names(count: int, seed: int) -> list:
+    rnd = random.Random(seed)
+    return [''.join(rnd.choice(FRAGMENTS) for _ in range(rnd.randint(1, 6))) for _ in range(count)]
+
+
+def compare(names: list) -> int:
+    mismatches = 0
+    checks = [
+        ('classify_target', lambda m, n: m.classify_target(n)),
+        ('generate_flag_code', lambda m, n: m.generate_flag_code(n)),
+        ('generate_molding_flag_code', lambda m, n: m.generate_molding_flag_code(n)),
+        ('generate_rail_code', lambda m, n: m.generate_rail_code(n)),
+        ('generate_unit', lambda m, n: tuple(m.generate_unit(n, s, r) for s in SPECS[:4] for r in REMARKS[:2])),
+    ]
+    for name in names:
+        for func_name, call in checks:
+            expected = call(legacy_codegen, name)
+            actual = call(local_file_processor, name)
+            if expected != actual:
+                mismatches += 1
+                if mismatches <= 10:
+                    print(f"❌ {func_name}({name!r}): legacy={expected!r} new={actual!r}")
+    return mismatches
+
+
+def time_classifier(module, names: list) -> float:
+    start = time.perf_counter()
+    for name in names:
+        module.classify_target(name)
+        module.generate_flag_code(name)
+        module.generate_molding_flag_code(name)
+    return time.perf_counter() - start
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="키워드 오토마톤 분류기 검사")
+    parser.add_argument("patterns", nargs="*", default=DEFAULT_PATTERNS, help="주문서 파일 glob 패턴")
+    parser.add_argument("--fuzz", type=int, default=20_000, help="합성 품명 수")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드")
+    args = parser.parse_args(argv)
+
+    corpus_names = load_item_names(args.patterns)
+    names = corpus_names + ITEMS + make_fuzz_names(args.fuzz, args.seed)
+    print(f"품명 {len(names):,}개 (corpus {len(corpus_names)}, 합성 {len(names) - len(corpus_names)})")
+    print(f"오토마톤 구현: {local_file_processor.ITEM_KEYWORD_AUTOMATON.backend}")
+
+    mismatches = compare(names)
+    if mismatches:
+        print(f"❌ 결과 불일치 {mismatches}건")
+        return 1
+    print("✅ legacy 결과와 완전히 일치")
+
+    # 캐시 효과를 제외하고 순수 스캔 비용 비교
+    local_file_processor._item_keyword_hits.cache_clear()
+    unique_names = make_fuzz_names(args.fuzz, args.seed + 1)
+    legacy_sec = time_classifier(legacy_codegen, unique_names)
+    local_file_processor._item_keyword_hits.cache_clear()
+    new_sec = time_classifier(local_file_processor, unique_names)
+    print(f"legacy    : {legacy_sec:.3f}s")
+    print(f"automaton : {new_sec:.3f}s (x{legacy_sec / new_sec:.2f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
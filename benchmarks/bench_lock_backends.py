@@ -0,0 +1,147 @@
+"""
+락 저장소 백엔드 벤치마크 / 동시 획득 검사
+==========================================
+lock_backends 의 memory / sqlite 백엔드로 DistributedLockManager 연산 지연을 재고,
+여러 "PC"(스레드마다 DistributedLockManager + 백엔드 하나)가 같은 주문들을 동시에 잡게 해
+한 주문을 두 PC 이상이 획득한 경우(중복 획득)를 셈
+
+- memory : 모든 PC가 MemoryWorksheet 하나를 공유 (--latency 로 API 왕복 지연 흉내,
+           --settle: 획득 후 확인 읽기 전 대기, 획득 지연에 그대로 더해짐)
+- sqlite : 모든 PC가 같은 DB 파일을 각자 연결로 사용 (공유 디스크와 같은 상황)
+- sheets 백엔드는 실제 Google API 를 쓰므로 제외
+
+중복 획득이 있으면 종료 코드 1
+
+사용법:
+    python benchmarks/bench_lock_backends.py
+    python benchmarks/bench_lock_backends.py --backends sqlite --machines 16 --orders 2000
+    python benchmarks/bench_lock_backends.py --backends memory --latency 0.002
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import lock_backends  # noqa: E402
+from lock_manager import DistributedLockManager  # noqa: E402
+
+
+def make_backend_factory(name: str, workdir: str, latency: float, settle: float):
+    """PC 하나마다 새 백엔드를 만드는 함수 (저장소는 공유)"""
+    if name == 'memory':
+        worksheet = lock_backends.MemoryWorksheet(latency)
+        return lambda: lock_backends.MemoryLockBackend(worksheet=worksheet, settle=settle)
+    if name == 'sqlite':
+        db_path = os.path.join(workdir, 'locks.db')
+        return lambda: lock_backends.SqliteLockBackend(db_path)
+    raise ValueError(name)
+
+
+def make_manager(factory, machine_id: str) -> DistributedLockManager:
+    manager = DistributedLockManager(backend=factory(), machine_id=machine_id)
+    manager.connect()
+    return manager
+
+
+def _timed(func, items) -> list:
+    samples = []
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _format(samples: list) -> str:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return (f"median {statistics.median(samples) * 1e3:8.3f}ms  p95 {p95 * 1e3:8.3f}ms  "
+            f"({len(samples):,}회)")
+
+
+def bench_latency(factory, orders: int, page: int):
+    manager = make_manager(factory, "bench_pc")
+    ids = [f"L{i:07d}" for i in range(orders)]
+    print(f"  acquire_lock      {_format(_timed(manager.acquire_lock, ids))}")
+    print(f"  get_lock_status   {_format(_timed(manager.get_lock_status, ids))}")
+    print(f"  release_lock      {_format(_timed(lambda o: manager.release_lock(o, notes='done'), ids))}")
+    pages = [[f"P{p:04d}{i:04d}" for i in range(page)] for p in range(max(1, orders // page))]
+    print(f"  acquire_many({page})  {_format(_timed(manager.acquire_many, pages))}")
+    manager.close()
+
+
+def race(factory, machines: int, orders: int) -> int:
+    """machines 개 PC가 같은 주문 목록을 동시에 acquire_lock, 중복 획득 주문 수 반환"""
+    managers = [make_manager(factory, f"pc{m:02d}") for m in range(machines)]
+    ids = [f"R{i:07d}" for i in range(orders)]
+    wins = Counter()
+    wins_lock = threading.Lock()
+    barrier = threading.Barrier(machines)
+
+    def run(manager, offset):
+        barrier.wait()
+        # PC마다 시작 위치를 달리해 같은 주문에서 자주 부딪치게 함
+        order = ids[offset:] + ids[:offset]
+        won = [order_id for order_id in order if manager.acquire_lock(order_id)]
+        with wins_lock:
+            wins.update(won)
+
+    threads = [threading.Thread(target=run, args=(manager, i * orders // machines))
+               for i, manager in enumerate(managers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    doubles = sum(1 for count in wins.values() if count > 1)
+    missing = orders - len(wins)
+    attempts = machines * orders
+    print(f"  race {machines} PCs × {orders:,} 주문: {elapsed:.2f}s ({attempts / elapsed:,.0f} acquire/s), "
+          f"획득 {sum(wins.values()):,}, 중복 획득 주문 {doubles:,}, 아무도 못 잡은 주문 {missing:,}")
+    for manager in managers:
+        manager.close()
+    return doubles
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="락 저장소 백엔드 벤치마크")
+    parser.add_argument("--backends", nargs="+", choices=('memory', 'sqlite'), default=['memory', 'sqlite'])
+    parser.add_argument("--orders", type=int, default=500, help="지연 측정 주문 수")
+    parser.add_argument("--page", type=int, default=100, help="acquire_many 한 번의 주문 수")
+    parser.add_argument("--machines", type=int, default=8, help="동시 획득 PC(스레드) 수")
+    parser.add_argument("--race-orders", type=int, default=1000, help="동시 획득 주문 수")
+    parser.add_argument("--latency", type=float, default=0.0, help="memory: API 호출당 지연 (초)")
+    parser.add_argument("--settle", type=float, default=0.01, help="memory: 획득 후 확인 읽기 전 대기 (초)")
+    args = parser.parse_args(argv)
+
+    # 주문마다 나오는 INFO 로그는 끔
+    logging.disable(logging.INFO)
+
+    doubles = 0
+    for name in args.backends:
+        with tempfile.TemporaryDirectory() as workdir:
+            print(f"[{name}]")
+            bench_latency(make_backend_factory(name, workdir, args.latency, args.settle), args.orders, args.page)
+            doubles += race(make_backend_factory(name, os.path.join(workdir, 'race'), args.latency, args.settle),
+                            args.machines, args.race_orders)
+
+    if doubles:
+        print(f"\n❌ 중복 획득 {doubles:,}건")
+        return 1
+    print("\n✅ 중복 획득 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
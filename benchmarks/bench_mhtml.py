@@ -0,0 +1,213 @@
+"""
+MHTML 디코더 벤치마크 + 결과 일치 검사
+======================================
+fixture 주문서를 Chrome 형식 MHTML(quoted-printable HTML + base64 이미지 파트)로 감싸서
+- 기존 방식: 텍스트로 읽기 → extract_html_from_mhtml (정규식 + quopri)
+- 새 방식  : bytes 로 읽기 → mhtml_reader (경계 스캐너, text/html 파트만 디코딩)
+- mmap     : read_order_html (파일을 mmap 으로 열고 text/html 파트 구간만 복사/디코딩)
+경로별 파싱 결과가 같은지 확인하고 파일당 시간, 최대 메모리(tracemalloc),
+최대 RSS(경로마다 새 프로세스에서 측정, 기준 프로세스 대비 증가분)를 비교
+
+변형: utf-8 charset 선언 / charset 미선언(<meta> 로 판별) / euc-kr 선언
+
+사용법:
+    python benchmarks/bench_mhtml.py                      # 이미지 파트 20개 x 100KB
+    python benchmarks/bench_mhtml.py --images 200 --image-kb 200 --repeat 5
+    (RSS 는 resource 모듈이 있는 Linux/macOS 에서만, macOS 는 단위가 bytes 라 1024배로 표시됨)
+"""
+
+import argparse
+import base64
+import glob
+import os
+import quopri
+import multiprocessing
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import local_file_processor  # noqa: E402
+
+DEFAULT_PATTERNS = [os.path.join(ROOT_DIR, "fixtures", "pages", "*.html")]
+BOUNDARY = "----MultipartBoundary--bench0123456789abcdef----"
+
+VARIANTS = [
+    # (이름, 인코딩, 헤더에 charset 선언 여부)
+    ("utf-8", "utf-8", True),
+    ("no-charset", "utf-8", False),
+    ("euc-kr", "euc-kr", True),
+]
+
+
+def build_mhtml(html: str, encoding: str = "utf-8", declare_charset: bool = True,
+                image_parts: int = 0, image_size: int = 0, seed: int = 0) -> bytes:
+    """Chrome 'MHTML로 저장' 과 같은 구조의 MHTML 바이트 생성"""
+    rnd = random.Random(seed)
+    if encoding != "utf-8":
+        html = html.replace('charset="utf-8"', f'charset="{encoding}"').replace("charset=utf-8", f"charset={encoding}")
+    body = quopri.encodestring(html.encode(encoding, errors="replace")).replace(b"\n", b"\r\n")
+    content_type = f'text/html; charset="{encoding}"' if declare_charset else "text/html"
+
+    lines = [
+        b"From: <Saved by Blink>",
+        b"Snapshot-Content-Location: http://door.yl.co.kr/oms/ledger_view.jsp",
+        b"Subject: =?utf-8?Q?order?=",
+        b"MIME-Version: 1.0",
+        f'Content-Type: multipart/related; type="text/html"; boundary="{BOUNDARY}"'.encode(),
+        b"",
+        b"",
+        f"--{BOUNDARY}".encode(),
+        f"Content-Type: {content_type}".encode(),
+        b"Content-ID: <frame-0@mhtml.blink>",
+        b"Content-Transfer-Encoding: quoted-printable",
+        b"Content-Location: http://door.yl.co.kr/oms/ledger_view.jsp",
+        b"",
+        body,
+    ]
+    for i in range(image_parts):
+        blob = base64.encodebytes(rnd.randbytes(image_size)).replace(b"\n", b"\r\n")
+        lines += [
+            f"--{BOUNDARY}".encode(),
+            b"Content-Type: image/png",
+            b"Content-Transfer-Encoding: base64",
+            f"Content-Location: http://door.yl.co.kr/oms/img/{i}.png".encode(),
+            b"",
+            blob,
+        ]
+    lines.append(f"--{BOUNDARY}--".encode())
+    return b"\r\n".join(lines) + b"\r\n"
+
+
+def legacy_read(path: str) -> str:
+    """최적화 이전 read_order_html 과 같은 경로"""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        content = f.read()
+    return local_file_processor.extract_html_from_mhtml(content)
+
+
+def fast_read(path: str) -> str:
+    with open(path, 'rb') as f:
+        return local_file_processor.decode_order_bytes(f.read(), path)
+
+
+def mmap_read(path: str) -> str:
+    return local_file_processor.read_order_html(path)
+
+
+READERS = {
+    "legacy (text+regex+quopri)": legacy_read,
+    "bytes  (boundary scan)    ": fast_read,
+    "mmap   (boundary scan)    ": mmap_read,
+}
+
+
+def _peak_rss_self_kb() -> int:
+    """현재 프로세스의 최대 RSS(KB)
+
+    Linux 는 /proc 의 VmHWM 사용 (ru_maxrss 는 fork 한 부모의 값을 물려받아 부정확)
+    """
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _rss_child(reader_name, paths: list) -> int:
+    """새 프로세스에서 실행: 모든 파일을 읽은 뒤 최대 RSS(KB) 반환"""
+    if reader_name is not None:
+        reader = READERS[reader_name]
+        for path in paths:
+            reader(path)
+    return _peak_rss_self_kb()
+
+
+def peak_rss_kb(reader_name, paths: list) -> int:
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        return pool.apply(_rss_child, (reader_name, paths))
+
+
+def measure(func, paths: list, repeat: int) -> tuple:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for path in paths:
+            func(path)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for path in paths:
+        func(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / (repeat * len(paths)), peak
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="MHTML 디코더 벤치마크")
+    parser.add_argument("patterns", nargs="*", default=DEFAULT_PATTERNS, help="원본 HTML 파일 glob 패턴")
+    parser.add_argument("--images", type=int, default=20, help="MHTML 당 이미지 파트 수")
+    parser.add_argument("--image-kb", type=int, default=100, help="이미지 파트 크기 (KB)")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수")
+    args = parser.parse_args(argv)
+
+    sources = [p for pattern in args.patterns for p in sorted(glob.glob(pattern))]
+    if not sources:
+        print("원본 HTML 파일이 없습니다.")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = []
+        for source in sources:
+            with open(source, 'r', encoding='utf-8') as f:
+                html = f.read()
+            stem = os.path.splitext(os.path.basename(source))[0]
+            for name, encoding, declare in VARIANTS:
+                path = os.path.join(tmp_dir, f"{stem}.{name}.mhtml")
+                with open(path, 'wb') as f:
+                    f.write(build_mhtml(html, encoding, declare, args.images, args.image_kb * 1024))
+                paths.append(path)
+
+        size_mb = sum(os.path.getsize(p) for p in paths) / len(paths) / 1024 / 1024
+        print(f"MHTML {len(paths)}개 (평균 {size_mb:.1f}MB, 이미지 파트 {args.images}개)")
+
+        mismatches = 0
+        for path in paths:
+            expected = local_file_processor.parse_html_table(legacy_read(path))
+            actual = local_file_processor.parse_html_table(fast_read(path))
+            if expected != actual or not actual:
+                mismatches += 1
+                print(f"❌ 결과 불일치: {os.path.basename(path)} (legacy {len(expected)}행 / new {len(actual)}행)")
+        if mismatches:
+            return 1
+        print("✅ 파싱 결과 일치")
+
+        base_rss = peak_rss_kb(None, paths) if resource is not None else 0
+        legacy_sec = None
+        for name, reader in READERS.items():
+            sec, peak = measure(reader, paths, args.repeat)
+            legacy_sec = legacy_sec or sec
+            if resource is not None:
+                rss = f"RSS +{(peak_rss_kb(name, paths) - base_rss) / 1024:6.1f}MB"
+            else:
+                rss = "RSS 측정 미지원"
+            print(f"{name}: {sec * 1000:8.2f} ms/file, peak {peak / 1024 / 1024:6.1f}MB, {rss}"
+                  f"  (x{legacy_sec / sec:.2f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
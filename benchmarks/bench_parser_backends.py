@@ -0,0 +1,120 @@
+"""
+파서 백엔드 벤치마크 + 결과 일치(parity) 검사
+=============================================
+사용 가능한 모든 table_parser 백엔드로 같은 주문서 파일들을 파싱하여
+- BeautifulSoup 결과와 행 단위로 완전히 같은지 확인하고
+- 백엔드별 처리량(rows/sec)을 출력
+- --memory 옵션으로 백엔드별 최대 메모리(tracemalloc peak, Python 할당만)도 측정
+
+사용법:
+    python benchmarks/bench_parser_backends.py                       # fixtures/pages
+    python benchmarks/bench_parser_backends.py "data/downloads/*/*.html" --repeat 3
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import table_parser  # noqa: E402
+
+DEFAULT_PATTERNS = [os.path.join(ROOT_DIR, "fixtures", "pages", "*.html")]
+
+
+def load_pages(patterns: list) -> list:
+    pages = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                pages.append((path, f.read()))
+    return pages
+
+
+def check_parity(pages: list, backends: list) -> int:
+    """bs4 결과와 다른 파일 수 반환"""
+    mismatches = 0
+    for path, html in pages:
+        expected = table_parser.parse_with_bs4(html)
+        for name in backends:
+            if name == 'bs4':
+                continue
+            actual = table_parser.PARSER_BACKENDS[name](html)
+            if actual != expected:
+                mismatches += 1
+                print(f"❌ [{name}] 결과 불일치: {os.path.basename(path)} "
+                      f"(bs4 {len(expected)}행 / {name} {len(actual)}행)")
+    return mismatches
+
+
+def bench_backend(name: str, pages: list, repeat: int) -> dict:
+    parse = table_parser.PARSER_BACKENDS[name]
+    total_rows = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, html in pages:
+            total_rows += len(parse(html))
+    elapsed = time.perf_counter() - start
+    return {
+        "backend": name,
+        "files": len(pages) * repeat,
+        "rows": total_rows,
+        "seconds": elapsed,
+        "rows_per_sec": total_rows / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def measure_peak_memory(name: str, pages: list) -> int:
+    """파일 하나를 파싱할 때의 최대 메모리 사용량 (bytes, 전체 파일 중 최댓값)"""
+    parse = table_parser.PARSER_BACKENDS[name]
+    peak = 0
+    for _, html in pages:
+        tracemalloc.start()
+        parse(html)
+        _, file_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak = max(peak, file_peak)
+    return peak
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="table_parser 백엔드 벤치마크")
+    parser.add_argument("patterns", nargs="*", default=DEFAULT_PATTERNS, help="파일 glob 패턴")
+    parser.add_argument("--repeat", type=int, default=5, help="반복 횟수")
+    parser.add_argument("--memory", action="store_true", help="백엔드별 최대 메모리 측정")
+    parser.add_argument("--skip-parity", action="store_true", help="결과 일치 검사 생략")
+    args = parser.parse_args(argv)
+
+    pages = load_pages(args.patterns)
+    if not pages:
+        print("대상 파일이 없습니다.")
+        return 1
+
+    backends = table_parser.available_backends()
+    print(f"파일 {len(pages)}개, 백엔드: {', '.join(backends)}")
+
+    if not args.skip_parity:
+        mismatches = check_parity(pages, backends)
+        if mismatches:
+            print(f"❌ 결과 불일치 {mismatches}건")
+            return 1
+        print("✅ 모든 백엔드 결과 일치")
+
+    print(f"{'backend':<12}{'files':>8}{'rows':>10}{'sec':>10}{'rows/sec':>14}")
+    for name in backends:
+        r = bench_backend(name, pages, args.repeat)
+        print(f"{r['backend']:<12}{r['files']:>8}{r['rows']:>10}{r['seconds']:>10.3f}{r['rows_per_sec']:>14.0f}")
+
+    if args.memory:
+        print(f"{'backend':<12}{'peak KB':>12}")
+        for name in backends:
+            print(f"{name:<12}{measure_peak_memory(name, pages) / 1024:>12.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+행 모델 메모리/직렬화 벤치마크
+==============================
+10만 행 기준으로
+- 파싱 행: 9칸 리스트 vs table_parser.OrderLine (NamedTuple)
+- ERP 행 : 30/22칸 리스트 vs erp_layout.ErpRow (__slots__)
+의 메모리(tracemalloc, 행 객체만)와 TSV 직렬화 시간을 비교하고 직렬화 결과가 같은지 확인
+셀 안 탭/줄바꿈 정리와 최대 길이 조각 나누기(iter_tsv_chunks)도 검사
+
+사용법:
+    python benchmarks/bench_row_model.py
+    python benchmarks/bench_row_model.py --rows 500000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import erp_layout  # noqa: E402
+import table_parser  # noqa: E402
+from bench_code_rules import make_rows  # noqa: E402
+
+TODAY = '2026/01/01'
+
+
+def legacy_erp_row(target_type: str, name: str, code: str, quantity: str, amount: str, remarks: str) -> list:
+    """최적화 이전 _append_erp_rows 의 행 생성"""
+    if target_type == 'estimate':
+        row = [''] * 22
+        row[3], row[14], row[15], row[16] = TODAY, code, name, quantity
+        return row
+    row = [''] * 30
+    row[0], row[6], row[16], row[17], row[18], row[19], row[29] = TODAY, '100', name, code, quantity, amount, remarks
+    return row
+
+
+def legacy_tsv(rows: list) -> str:
+    return "\r\n".join("\t".join(str(cell) if cell is not None else "" for cell in row) for row in rows)
+
+
+def measure_alloc(build) -> tuple:
+    """build() 가 만든 객체가 차지하는 메모리(bytes)와 결과 반환"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def timed(func, *args) -> tuple:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="행 모델 메모리/직렬화 벤치마크")
+    parser.add_argument("--rows", type=int, default=100_000, help="행 수")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드")
+    args = parser.parse_args(argv)
+
+    # 셀 문자열은 미리 만들어 두고 행 컨테이너 비용만 측정
+    cells = [
+        (str(i + 1), color, item, spec, str(i % 50 + 1), '1000', str((i % 50 + 1) * 1000), remarks)
+        for i, (color, item, spec, remarks, _) in enumerate(make_rows(args.rows, args.seed))
+    ]
+    print(f"행 {len(cells):,}개\n")
+
+    print("[파싱 행]")
+    list_bytes, _ = measure_alloc(lambda: [[no, '', c, it, sp, q, up, am, rm]
+                                           for no, c, it, sp, q, up, am, rm in cells])
+    line_bytes, _ = measure_alloc(lambda: [table_parser.OrderLine(no, '', c, it, sp, q, up, am, rm)
+                                           for no, c, it, sp, q, up, am, rm in cells])
+    print(f"  list(9)   : {list_bytes / 1024 / 1024:7.2f}MB ({list_bytes / len(cells):.0f} B/행)")
+    print(f"  OrderLine : {line_bytes / 1024 / 1024:7.2f}MB ({line_bytes / len(cells):.0f} B/행)")
+
+    failed = 0
+    for target_type in ('ledger', 'estimate'):
+        layout = erp_layout.get_layout(target_type)
+        print(f"\n[ERP 행 - {layout.name} {layout.width}열]")
+        legacy_bytes, legacy_rows = measure_alloc(lambda: [
+            legacy_erp_row(target_type, it, c, q, am, rm) for _, c, it, _, q, _, am, rm in cells])
+        new_bytes, new_rows = measure_alloc(lambda: [
+            erp_layout.ErpRow(layout, TODAY, it, c, q, am, rm) for _, c, it, _, q, _, am, rm in cells])
+        print(f"  list({layout.width})  : {legacy_bytes / 1024 / 1024:7.2f}MB ({legacy_bytes / len(cells):.0f} B/행)")
+        print(f"  ErpRow    : {new_bytes / 1024 / 1024:7.2f}MB ({new_bytes / len(cells):.0f} B/행, "
+              f"x{legacy_bytes / new_bytes:.1f} 절감)")
+
+        legacy_sec, legacy_text = timed(legacy_tsv, legacy_rows)
+        new_sec, new_text = timed(erp_layout.rows_to_tsv, new_rows)
+        same = legacy_text == new_text
+        failed += not same
+        print(f"  TSV       : list {legacy_sec * 1000:.1f}ms / ErpRow {new_sec * 1000:.1f}ms "
+              f"(x{legacy_sec / new_sec:.2f}) {'✅ 동일' if same else '❌ 불일치'}")
+
+    # 셀 안 탭/줄바꿈 정리 + 최대 길이 조각 나누기
+    print("\n[청크/이스케이프]")
+    dirty = [erp_layout.ErpRow(erp_layout.LEDGER_LAYOUT, TODAY, f"{it}\t(탭)", c, q, am, f"{rm}\r\n줄바꿈")
+             for _, c, it, _, q, _, am, rm in cells[:10_000]]
+    text = erp_layout.rows_to_tsv(dirty)
+    columns_ok = all(line.count('\t') == erp_layout.LEDGER_LAYOUT.width - 1 for line in text.split('\r\n'))
+    chunks = list(erp_layout.iter_tsv_chunks(dirty, max_chars=64 * 1024))
+    chunks_ok = '\r\n'.join(chunks) == text and all(len(chunk) <= 64 * 1024 for chunk in chunks)
+    failed += not (columns_ok and chunks_ok)
+    print(f"  탭/줄바꿈 포함 {len(dirty):,}행: 열 수 {'✅ 유지' if columns_ok else '❌ 밀림'}, "
+          f"64KB 조각 {len(chunks)}개 {'✅ 원문과 동일' if chunks_ok else '❌ 불일치'}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+r"""
+GAS ↔ Python 품목코드 차등 검사 (Differential Harness)
+======================================================
+GAS_Source/code_generation.gs (원본 구현)와 local_file_processor (Python 이식본)에
+같은 (색상, 품명, 규격, 비고, 브랜드) 입력을 넣어 함수별 결과를 비교
+
+- .gs 는 로컬 Node.js 로 실행 (benchmarks/gas_runner.js)
+- 입력 코퍼스: fixture 주문서 행 + bench_code_rules 합성 행 + 품명 조각 퍼징
+- 함수별 불일치 수와 예시 출력, --report 로 전체 불일치 JSON 저장
+- 알려진 이식 차이(KNOWN_DIVERGENCE_CLASSES)에 해당하는 입력의 불일치는 따로 세고 실패로 보지 않음
+  (--strict: 알려진 차이도 실패)
+- --baseline 으로 이전 보고서를 주면 그때 없던 "새" 불일치만 실패로 판단
+  (이식 당시부터 있던 차이는 두고, 최적화로 생긴 회귀만 잡기 위함)
+- 설명되지 않는 불일치(또는 새 불일치)가 있으면 종료 코드 1
+- fixture 주문서는 파싱 캐시를 끄고 읽음 (data/parse_cache 에 쓰지 않음)
+- tests/test_gas_codegen_diff.py 가 작은 코퍼스로 실행 (Node.js 가 없으면 건너뜀)
+
+알려진 이식 차이 (현재 기준):
+- unicode_digit: JS 정규식 \d 는 ASCII 숫자만, Python \d 는 유니코드 숫자(전각 ２, 아랍 ٣ 등)도 매칭
+- replace_first: JS String.replace(문자열) 은 첫 번째만 치환, Python str.replace 는 전부 치환
+  (색상에 회사명이 두 번 이상 들어간 경우)
+
+사용법:
+    python benchmarks/diff_gas_codegen.py
+    python benchmarks/diff_gas_codegen.py --rows 100000 --report gas_diff.json
+    python benchmarks/diff_gas_codegen.py --baseline gas_diff.json      # 최적화 후 회귀 확인
+    python benchmarks/diff_gas_codegen.py --functions generateProductCode generateUnit
+    python benchmarks/diff_gas_codegen.py --strict                      # 알려진 차이까지 전부 실패
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import time
+from collections import OrderedDict
+from typing import Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import local_file_processor as lfp  # noqa: E402
+from bench_code_rules import BRANDS, make_rows  # noqa: E402
+from bench_keyword_classifier import FRAGMENTS  # noqa: E402
+
+GAS_SOURCE = os.path.join(ROOT_DIR, "GAS_Source", "code_generation.gs")
+GAS_RUNNER = os.path.join(BENCH_DIR, "gas_runner.js")
+DEFAULT_PATTERNS = [os.path.join(ROOT_DIR, "fixtures", "pages", "*.html")]
+
+# GAS 함수명 → (Python 함수, 입력 튜플에서 인자를 고르는 함수)
+# 입력 튜플: (color, item, spec, remarks, brand)
+FUNCTIONS = OrderedDict([
+    ('classifyTarget', (lfp.classify_target, lambda c, i, s, r, b: (i,))),
+    ('isValidSpecSize', (lfp.is_valid_spec_size, lambda c, i, s, r, b: (s,))),
+    ('preprocessColorForProductName', (lfp.preprocess_color_for_product_name, lambda c, i, s, r, b: (c,))),
+    ('preprocessItemNameForProductName', (lfp.preprocess_item_name_for_product_name, lambda c, i, s, r, b: (i, s))),
+    ('preprocessSpecForProductName', (lfp.preprocess_spec_for_product_name, lambda c, i, s, r, b: (s,))),
+    ('generateBrandColorCode', (lfp.generate_brand_color_code, lambda c, i, s, r, b: (c, b))),
+    ('generateFlagCode', (lfp.generate_flag_code, lambda c, i, s, r, b: (i,))),
+    ('generateModelCode', (lfp.generate_model_code, lambda c, i, s, r, b: (i,))),
+    ('generateRailCode', (lfp.generate_rail_code, lambda c, i, s, r, b: (i,))),
+    ('generateMoldingFlagCode', (lfp.generate_molding_flag_code, lambda c, i, s, r, b: (i,))),
+    ('generateMoldingSpecCode', (lfp.generate_molding_spec_code, lambda c, i, s, r, b: (i, s, r))),
+    ('generateSpecCode', (lfp.generate_spec_code, lambda c, i, s, r, b: (s,))),
+    ('generateUnit', (lfp.generate_unit, lambda c, i, s, r, b: (i, s, r))),
+    ('generateProductCode', (lfp.generate_product_code, lambda c, i, s, r, b: (c, i, s, r, b))),
+    ('shouldAddCompanyPrefix', (lfp.should_add_company_prefix,
+                                lambda c, i, s, r, b: (c, i, {'Y': '영림', 'W': '우딘'}.get(b, '예림')))),
+])
+
+
+_UNICODE_DIGIT_RE = re.compile(r'(?![0-9])\d')
+_COMPANY_NAMES = tuple(dict.fromkeys(info['display'] for info in lfp.COMPANY_MAPPING.values()))
+
+# 알려진 이식 차이 이름 → 함수에 넣은 문자열 인자 하나가 해당하는지
+KNOWN_DIVERGENCE_CLASSES = OrderedDict([
+    ('unicode_digit', lambda text: bool(_UNICODE_DIGIT_RE.search(text))),
+    ('replace_first', lambda text: any(text.count(name) >= 2 for name in _COMPANY_NAMES)),
+])
+
+
+def classify_divergence(call_args) -> Optional[str]:
+    """불일치한 호출 인자가 해당하는 알려진 이식 차이 이름 (없으면 None = 설명되지 않는 불일치)"""
+    texts = [arg for arg in call_args if isinstance(arg, str)]
+    for name, matches in KNOWN_DIVERGENCE_CLASSES.items():
+        if any(matches(text) for text in texts):
+            return name
+    return None
+
+
+def load_fixture_rows(patterns: list) -> list:
+    rows = []
+    # 검사 실행이 실제 파싱 캐시(data/parse_cache)를 채우지 않도록 끄고 읽음
+    enabled = lfp.PARSE_CACHE.enabled
+    lfp.PARSE_CACHE.enabled = False
+    try:
+        for pattern in patterns:
+            for path in sorted(glob.glob(pattern)):
+                raw_data, company = lfp.parse_order_file(path)
+                brand = company['brand'] if company else 'y'
+                rows.extend((line.color, line.item, line.spec, line.remarks, brand) for line in raw_data)
+    finally:
+        lfp.PARSE_CACHE.enabled = enabled
+    return rows
+
+
+def make_fuzz_rows(count: int, seed: int) -> list:
+    """품명/규격/비고를 조각으로 무작위 조합 (경계 사례 탐색용)"""
+    rnd = random.Random(seed)
+    spec_parts = ['2100', '900', '*', '/', 'N', 'S', 'Y', '(', ')', '60', '9', 'T', ' ', '문', '2400', '12']
+    color_parts = ['영림', '101', ' ', 'PS', '12', '화이트', '우딘', 'W-', 'LG', '7', '그레이', '예림']
+
+    def join(parts, low, high):
+        return ''.join(rnd.choice(parts) for _ in range(rnd.randint(low, high)))
+
+    return [
+        (join(color_parts, 0, 4), join(FRAGMENTS, 1, 6), join(spec_parts, 0, 7),
+         rnd.choice(['', '9T', '18*9', '70*9', '현장', '12t', join(spec_parts, 1, 4)]), rnd.choice(BRANDS))
+        for _ in range(count)
+    ]
+
+
+def run_gas(cases: list, node: str) -> list:
+    payload = json.dumps({"cases": cases}, ensure_ascii=False).encode('utf-8')
+    proc = subprocess.run([node, GAS_RUNNER, GAS_SOURCE], input=payload, capture_output=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"gas_runner 실패 (exit {proc.returncode}): {proc.stderr.decode('utf-8', 'replace')}")
+    return json.loads(proc.stdout.decode('utf-8'))["results"]
+
+
+def run_python(func, args: tuple) -> dict:
+    try:
+        return {"ok": True, "value": func(*args)}
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+
+def compare(rows: list, names: list, node: str):
+    """
+    각 함수에 모든 입력 행을 넣어 Python 과 GAS 결과 비교
+
+    Returns:
+        ({함수명: [{"args", "python", "gas", "known"}]}, Python 시간, GAS 시간)
+        known: 해당하는 알려진 이식 차이 이름 (없으면 None)
+    """
+    cases, py_results = [], []
+    start = time.perf_counter()
+    for name in names:
+        func, pick = FUNCTIONS[name]
+        for row in rows:
+            call_args = pick(*row)
+            cases.append((name, list(call_args)))
+            py_results.append(run_python(func, call_args))
+    py_sec = time.perf_counter() - start
+
+    start = time.perf_counter()
+    gas_results = run_gas(cases, node)
+    gas_sec = time.perf_counter() - start
+
+    divergences = OrderedDict((name, []) for name in names)
+    for (name, call_args), py, gas in zip(cases, py_results, gas_results):
+        if py != gas:
+            divergences[name].append({"args": call_args, "python": py, "gas": gas,
+                                      "known": classify_divergence(call_args)})
+    return divergences, py_sec, gas_sec
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="GAS ↔ Python 품목코드 차등 검사")
+    parser.add_argument("patterns", nargs="*", default=DEFAULT_PATTERNS, help="주문서 파일 glob 패턴")
+    parser.add_argument("--rows", type=int, default=20_000, help="bench_code_rules 합성 행 수")
+    parser.add_argument("--fuzz", type=int, default=20_000, help="조각 퍼징 행 수")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드")
+    parser.add_argument("--functions", nargs="+", choices=list(FUNCTIONS), help="비교할 GAS 함수 (기본: 전체)")
+    parser.add_argument("--examples", type=int, default=5, help="함수별로 출력할 불일치 예시 수")
+    parser.add_argument("--report", help="불일치 전체를 JSON 으로 저장할 경로")
+    parser.add_argument("--baseline", help="이전 --report 파일 (여기 없는 불일치만 실패로 판단)")
+    parser.add_argument("--strict", action="store_true", help="알려진 이식 차이도 실패로 판단")
+    parser.add_argument("--node", default=shutil.which("node") or shutil.which("nodejs"), help="Node.js 실행 파일")
+    args = parser.parse_args(argv)
+
+    if not args.node:
+        print("❌ Node.js 를 찾을 수 없습니다 (--node 로 경로 지정)")
+        return 2
+
+    # 중복 입력 제거 (순서 유지)
+    rows = list(OrderedDict.fromkeys(
+        load_fixture_rows(args.patterns) + make_rows(args.rows, args.seed) + make_fuzz_rows(args.fuzz, args.seed)))
+    names = args.functions or list(FUNCTIONS)
+    print(f"입력 {len(rows):,}개 × 함수 {len(names)}개")
+
+    divergences, py_sec, gas_sec = compare(rows, names, args.node)
+    print(f"Python {py_sec:.2f}s / GAS(node) {gas_sec:.2f}s")
+
+    known = set()
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            for name, items in json.load(f)["divergences"].items():
+                known.update((name, json.dumps(item["args"], ensure_ascii=False)) for item in items)
+
+    total = failed_total = 0
+    known_totals = OrderedDict((name, 0) for name in KNOWN_DIVERGENCE_CLASSES)
+    for name, items in divergences.items():
+        # 실패로 보는 불일치: 기준 보고서에 없고, 알려진 이식 차이가 아님 (--strict 면 알려진 차이도)
+        failed = [item for item in items
+                  if (name, json.dumps(item["args"], ensure_ascii=False)) not in known
+                  and (args.strict or item["known"] is None)]
+        classes = OrderedDict()
+        for item in items:
+            if item["known"]:
+                classes[item["known"]] = classes.get(item["known"], 0) + 1
+                known_totals[item["known"]] += 1
+        total += len(items)
+        failed_total += len(failed)
+        mark = '✅' if not failed else '❌'
+        detail = ", ".join(f"{cls} {count:,}" for cls, count in classes.items())
+        suffix = f" (실패 {len(failed):,}" + (f", 알려진 차이: {detail})" if detail else ")") if items else ""
+        print(f"{mark} {name:<34}{len(items):>8,} 불일치{suffix}")
+        # 실패한 불일치를 먼저 보여 줌
+        for item in (failed + [item for item in items if item not in failed])[:args.examples]:
+            py = item['python'].get('value', item['python'].get('error'))
+            gas = item['gas'].get('value', item['gas'].get('error'))
+            tag = f" [{item['known']}]" if item['known'] else ""
+            print(f"      {item['args']!r}: python={py!r} gas={gas!r}{tag}")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({"inputs": len(rows), "divergences": divergences}, f, ensure_ascii=False, indent=1)
+        print(f"보고서 저장: {args.report}")
+
+    if not total:
+        print("\n✅ GAS 와 완전히 일치")
+        return 0
+    detail = ", ".join(f"{cls} {count:,}" for cls, count in known_totals.items() if count)
+    print(f"\n총 불일치 {total:,}건 (알려진 이식 차이: {detail or '없음'}), 실패 {failed_total:,}건")
+    return 1 if failed_total else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
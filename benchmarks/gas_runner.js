@@ -0,0 +1,55 @@
+/**
+ * GAS code_generation.gs 실행기 (Node.js)
+ * =======================================
+ * Apps Script 전용 객체(Logger, Utilities 등)를 빈 객체로 대신하고
+ * code_generation.gs 를 vm 컨텍스트에서 불러온 뒤,
+ * stdin 으로 받은 호출 목록을 실행해 결과를 stdout 으로 반환
+ *
+ * 입력(JSON): {"cases": [["classifyTarget", ["ABS문틀"]], ...]}
+ * 출력(JSON): {"results": [{"ok": true, "value": "FRAME"}, {"ok": false, "error": "..."}, ...]}
+ *
+ * 사용법: node benchmarks/gas_runner.js GAS_Source/code_generation.gs < cases.json
+ * (benchmarks/diff_gas_codegen.py 가 호출)
+ */
+
+const fs = require('fs');
+const vm = require('vm');
+
+const gsPath = process.argv[2];
+if (!gsPath) {
+  process.stderr.write('사용법: node gas_runner.js <code_generation.gs>\n');
+  process.exit(2);
+}
+
+// Apps Script 서비스 대체 (코드 생성 함수는 Logger 만 사용)
+const unavailable = new Proxy({}, {
+  get(_, name) {
+    throw new Error(`Apps Script 서비스는 사용할 수 없음: ${String(name)}`);
+  },
+});
+const sandbox = {
+  Logger: { log() {} },
+  Utilities: unavailable,
+  DriveApp: unavailable,
+  SpreadsheetApp: unavailable,
+  XmlService: unavailable,
+};
+vm.createContext(sandbox);
+vm.runInContext(fs.readFileSync(gsPath, 'utf8'), sandbox, { filename: gsPath });
+
+const input = JSON.parse(fs.readFileSync(0, 'utf8'));
+const functions = {};
+const results = input.cases.map(([name, args]) => {
+  try {
+    if (!(name in functions)) {
+      functions[name] = vm.runInContext(`typeof ${name} === 'function' ? ${name} : null`, sandbox);
+    }
+    const fn = functions[name];
+    if (!fn) return { ok: false, error: `함수 없음: ${name}` };
+    return { ok: true, value: fn(...args) };
+  } catch (e) {
+    return { ok: false, error: String(e) };
+  }
+});
+
+process.stdout.write(JSON.stringify({ results }));
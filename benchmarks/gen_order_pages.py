@@ -0,0 +1,373 @@
+"""
+합성 주문서 페이지 생성기 (Synthetic Order Pages)
+================================================
+door.yl.co.kr 거래명세서(원장) / 견적서 상세 페이지와 같은 구조의 HTML/MHTML 을 생성
+부하 테스트·벤치마크용 코퍼스를 만들고, 파서가 기대값대로 읽는지 검사
+
+- 문서 종류: ledger (table.table-item + thead/tbody + <div> 셀) / estimate (클래스 없는 표)
+- 회사: 영림 / 우딘 / 예림 (머리글과 색상이 회사에 맞게 생성되어 detect_company 기대값이 정해짐)
+- 품목 구성: 문틀 / 도어 / 몰딩 / 레일 비율 지정 (--mix 문틀=4,도어=3,몰딩=2,레일=1)
+- 잡음(--noise 0~2): 셀 안 공백/줄바꿈/<span>/주석, &nbsp; 빈 셀, 반복 머리글 행, 합계/안내 행,
+  열이 모자란 행, 품목 표 사이의 안내 표, 스크립트/스타일 블록, 표 나눔
+- MHTML: bench_mhtml.build_mhtml 로 감쌈 (utf-8 / charset 미선언 / euc-kr, 이미지 파트)
+- 출력 폴더에 manifest.jsonl (파일별 문서 종류, 회사 브랜드, 기대 파싱 행) 기록
+
+저장소의 작은 코퍼스 (fixtures/corpus) 는 아래 명령으로 다시 만들 수 있음:
+    python benchmarks/gen_order_pages.py fixtures/corpus --count 24 --seed 2026 --images 1 --image-kb 2 --mhtml-ratio 0.4
+
+사용법:
+    python benchmarks/gen_order_pages.py /tmp/corpus --count 10000            # 1만 개 코퍼스
+    python benchmarks/gen_order_pages.py /tmp/corpus --count 20000 --rows 20:200 --mhtml-ratio 0.5
+    python benchmarks/gen_order_pages.py --verify fixtures/corpus             # 기대값과 파싱 결과 비교
+"""
+
+import argparse
+import html as html_lib
+import json
+import os
+import random
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_mhtml import VARIANTS, build_mhtml  # noqa: E402
+
+DOC_TYPES = ('ledger', 'estimate')
+MANIFEST_NAME = 'manifest.jsonl'
+
+# 회사별 머리글 표기 / 색상 후보 / 파일명 약어 (파일명은 대소문자 구분 없는 파일시스템을 고려)
+# 우딘/예림 페이지에는 우선순위가 높은 회사 키워드(영림, www.yl.co.kr, 우딘)가 들어가지 않게 구성
+COMPANIES = {
+    'Y': {
+        'display': '영림', 'slug': 'yl',
+        'header': '영림임업 (www.yl.co.kr)',
+        'colors': ['영림101', '영림101 화이트', '영림205 PS12', '영림301PS12', 'PS123', '화이트',
+                   '화이트 오크', '영림 12 그레이', '영림7 LG01', '그레이 88'],
+    },
+    'W': {
+        'display': '우딘', 'slug': 'wd',
+        'header': '우딘 (주)',
+        'colors': ['우딘 월넛', '우딘 화이트', 'PX77', '월넛', '화이트', 'W-303', '미색'],
+    },
+    'y': {
+        'display': '예림', 'slug': 'yr',
+        'header': '예림 인테리어',
+        'colors': ['예림 체리', '예림 화이트', '체리', '미색', '화이트 오크', '그레이 88'],
+    },
+}
+
+# 품목 분류별 (품명, 규격, 비고) 후보
+ITEM_GROUPS = {
+    '문틀': {
+        'items': ['ABS문틀 일반형', '발포 문틀 슬림', '방염 와이드문틀', '비방염 3연동 문틀', '분리형 문틀 스토퍼',
+                  '알루미늄 히든 문틀', '차음 문틀(식기X)', '일체형 문틀', '가변형 문틀 2100문', '스텝 문틀'],
+        'specs': ['2100*900*/N', '2100*900*/Y', '2100*800/S', '2100*900*', '2300*1000*/N', '2100문'],
+        'remarks': ['', '', '현장납품'],
+        'price': (30, 90),
+    },
+    '도어': {
+        'items': ['YS-100 ABS도어', 'YA-20A 미서기 도어', 'YAT-5 도어', 'M/D 민무늬 문짝', '탈공 문짝',
+                  '슬림 3연동 도어'],
+        'specs': ['2100*900', '2100*800/S', '2100*1500', '2300*1200', '2100*1500/ Y'],
+        'remarks': ['', '', '현장납품', '비고'],
+        'price': (80, 350),
+    },
+    '몰딩': {
+        'items': ['걸레받이몰딩 (80*9)', '60MM평판 몰딩(9T)', '40MM평 몰딩', '템바보드 방염 소반달',
+                  '템바루바 대형반달', '기둥 몰딩', '프레임몰딩 45', '천장몰딩', '코너몰딩 30번', '문선 70바용',
+                  '계단 몰딩', '루바 12*90'],
+        'specs': ['2400', '(2400*600)', '(100*100*9)', '2700', '(80*9)'],
+        'remarks': ['', '9T', '18*9', '70*9', '12t', '기둥용'],
+        'price': (2, 50),
+    },
+    '레일': {
+        'items': ['상부레일 슬림', '초슬림 2연동 레일', '하부레일'],
+        'specs': ['1800', '2400', '900'],
+        'remarks': ['', ''],
+        'price': (10, 40),
+    },
+}
+DEFAULT_MIX = {'문틀': 4, '도어': 3, '몰딩': 2, '레일': 1}
+
+ITEM_HEADER = ['NO', '색상', '품명', '규격', '수량', '단가', '금액', '비고']
+
+
+# =================================================================================================
+# 행 생성
+# =================================================================================================
+
+def make_lines(rnd: random.Random, brand: str, count: int, mix: dict) -> list:
+    """품목 행 (NO, 색상, 품명, 규격, 수량, 단가, 금액, 비고) 문자열 튜플 목록"""
+    groups = list(mix)
+    weights = [mix[g] for g in groups]
+    colors = COMPANIES[brand]['colors']
+    lines = []
+    for no in range(1, count + 1):
+        group = ITEM_GROUPS[rnd.choices(groups, weights)[0]]
+        quantity = rnd.randint(1, 50)
+        unit_price = rnd.randint(*group['price']) * 1000
+        lines.append((str(no), rnd.choice(colors), rnd.choice(group['items']), rnd.choice(group['specs']),
+                      str(quantity), f"{unit_price:,}", f"{quantity * unit_price:,}", rnd.choice(group['remarks'])))
+    return lines
+
+
+def expected_row(texts: list, width: int = 8) -> list:
+    """파서가 돌려줘야 하는 9열 행 [NO, '', 색상, 품명, 규격, 수량, 단가, 금액, 비고]"""
+    cells = list(texts[:width]) + [''] * (8 - width)
+    return [cells[0], ''] + cells[1:]
+
+
+# =================================================================================================
+# 셀/행 렌더링 (잡음 포함)
+# =================================================================================================
+
+def render_text(rnd: random.Random, text: str, noise: int) -> tuple:
+    """셀 텍스트 → (HTML, 파서가 읽을 텍스트)
+
+    파서는 텍스트 노드마다 strip 후 공백 없이 이어 붙이므로 <span> 으로 나눈 셀은 공백이 빠짐
+    """
+    if not text:
+        return (rnd.choice(['', '&nbsp;', ' ']) if noise else ''), ''
+    escaped = html_lib.escape(text, quote=False)
+    if noise < 1 or rnd.random() > 0.3:
+        return escaped, text
+    kind = rnd.randrange(4)
+    if kind == 0:
+        return f"\n      {escaped}  ", text
+    if kind == 1 and ' ' in text:
+        head, tail = text.split(' ', 1)
+        return (f"{html_lib.escape(head, quote=False)} <span>{html_lib.escape(tail, quote=False)}</span>",
+                head.strip() + tail.strip())
+    if kind == 2:
+        return f"<!-- {rnd.randint(1, 999)} -->{escaped}", text
+    return f" <b></b>{escaped} ", text
+
+
+def render_cells(rnd: random.Random, cells: list, noise: int, wrap_div: bool) -> tuple:
+    """td HTML 과 파서가 읽을 셀 텍스트 목록"""
+    out, texts = [], []
+    for cell in cells:
+        body, text = render_text(rnd, cell, noise)
+        out.append(f"<td><div>{body}</div></td>" if wrap_div else f"<td>{body}</td>")
+        texts.append(text)
+    return ''.join(out), texts
+
+
+def _noise_rows(rnd: random.Random, noise: int, wrap_div: bool) -> list:
+    """파서가 건너뛰어야 하는 행 (머리글 반복 / 빈 행 / 안내 행)"""
+    if noise < 1 or rnd.random() > 0.1:
+        return []
+    kind = rnd.randrange(3)
+    if kind == 0:
+        return ['<tr class="td-header">' + ''.join(f"<td>{h}</td>" for h in ITEM_HEADER[:4]) + '</tr>']
+    if kind == 1:
+        return ['<tr>' + '<td></td>' * 4 + '</tr>']
+    return [f'<tr><td>비고</td><td colspan="7">{"<div>" if wrap_div else ""}배송 전 연락 바랍니다'
+            f'{"</div>" if wrap_div else ""}</td></tr>']
+
+
+def render_item_rows(rnd: random.Random, lines: list, noise: int, wrap_div: bool) -> tuple:
+    """(tr HTML 목록, 기대 행 목록)"""
+    rows, expected = [], []
+    for line in lines:
+        rows.extend(_noise_rows(rnd, noise, wrap_div))
+        # 열이 모자란 행 (NO/색상/품명/규격만) - 견적서 끝 행에서 실제로 보이는 형태
+        width = 4 if noise >= 2 and rnd.random() < 0.05 else 8
+        cells_html, texts = render_cells(rnd, list(line[:width]), noise, wrap_div)
+        rows.append(f"<tr>{cells_html}</tr>")
+        expected.append(expected_row(texts, width))
+    return rows, expected
+
+
+def _total_row(lines: list, wrap_div: bool) -> str:
+    quantity = sum(int(line[4]) for line in lines)
+    amount = sum(int(line[6].replace(',', '')) for line in lines)
+    cells = ['합계', '', '', '', str(quantity), '', f"{amount:,}", '']
+    return '<tr>' + ''.join(f"<td><div>{c}</div></td>" if wrap_div else f"<td>{c}</td>" for c in cells) + '</tr>'
+
+
+def _head(title: str, noise: int) -> str:
+    parts = ['<head>', '<meta charset="utf-8">', f'<title>{title}</title>']
+    if noise:
+        parts.append('<style>.table-item td { padding: 2px; } .td-header { background: #eee; }</style>')
+        parts.append('<script>var orderView = { page: 1, rows: [] }; /* <td>99</td> */</script>')
+    parts.append('</head>')
+    return '\n'.join(parts)
+
+
+def _split(rnd: random.Random, items: list, parts: int) -> list:
+    if parts <= 1 or len(items) < parts:
+        return [items]
+    cuts = sorted(rnd.sample(range(1, len(items)), parts - 1))
+    return [items[a:b] for a, b in zip([0] + cuts, cuts + [len(items)])]
+
+
+def render_ledger(rnd: random.Random, order_id: str, brand: str, lines: list, noise: int) -> tuple:
+    """거래명세서(원장) 페이지 - table.table-item 이 1개 이상 (잡음이 있으면 여러 표로 나뉨)"""
+    company = COMPANIES[brand]
+    rows, expected = render_item_rows(rnd, lines, noise, wrap_div=True)
+    parts = rnd.randint(1, 3) if noise >= 2 else 1
+    thead = '<thead>\n    <tr>' + ''.join(f"<th>{h}</th>" for h in ITEM_HEADER) + '</tr>\n  </thead>'
+
+    tables = []
+    chunks = _split(rnd, rows, parts)
+    for index, chunk in enumerate(chunks):
+        body = list(chunk)
+        if index == len(chunks) - 1:
+            body.append(_total_row(lines, wrap_div=True))
+        tables.append('<table class="table table-item">\n  ' + thead + '\n  <tbody>\n    '
+                      + '\n    '.join(body) + '\n  </tbody>\n</table>')
+    separator = '\n<p>다음 페이지에 계속 &amp; 참고</p>\n' if noise else '\n'
+
+    page = [
+        '<!DOCTYPE html>', '<html>', _head(f"거래명세서 - {company['header']}", noise), '<body>',
+        '<div class="header">',
+        '  <table class="table-info">',
+        f'    <tr><th>출하번호</th><td>{order_id}</td><th>거래처</th><td>{company["header"]}</td></tr>',
+        '  </table>',
+        '</div>',
+        separator.join(tables),
+        '<div class="footer">door.yl.co.kr</div>',
+        '</body>', '</html>',
+    ]
+    return '\n'.join(page) + '\n', expected
+
+
+def render_estimate(rnd: random.Random, order_id: str, brand: str, lines: list, noise: int) -> tuple:
+    """견적서 페이지 - 클래스 없는 표들 (머리글 표/안내 표는 검증에서 걸러지는 행만 포함)"""
+    company = COMPANIES[brand]
+    rows, expected = render_item_rows(rnd, lines, noise, wrap_div=False)
+    header_row = '<tr>' + ''.join(f"<th>{h}</th>" for h in ITEM_HEADER) + '</tr>'
+    page = [
+        '<html>', _head('견적서', noise), '<body>',
+        f'<table width="100%"><tr><td>{company["header"]} 견적서</td><td>{order_id}</td></tr></table>',
+        '<table border="1">', '  ' + header_row, '  ' + '\n  '.join(rows), '</table>',
+    ]
+    if noise:
+        page.append('<table><tr><td>입금 계좌</td><td>기업은행</td><td>예금주</td></tr></table>')
+    page += ['</body>', '</html>']
+    return '\n'.join(page) + '\n', expected
+
+
+RENDERERS = {'ledger': render_ledger, 'estimate': render_estimate}
+
+
+def build_page(rnd: random.Random, doc_type: str = 'ledger', brand: str = 'Y', rows: int = 20,
+               mix: dict = None, noise: int = 1, order_id: str = None) -> tuple:
+    """주문서 HTML 한 개 생성 → (html, 기대 파싱 행 목록)"""
+    order_id = order_id or f"{'L' if doc_type == 'ledger' else 'E'}20260105-{rnd.randint(1, 999):03d}"
+    lines = make_lines(rnd, brand, rows, mix or DEFAULT_MIX)
+    return RENDERERS[doc_type](rnd, order_id, brand, lines, noise)
+
+
+# =================================================================================================
+# 코퍼스 생성 / 검사
+# =================================================================================================
+
+def parse_mix(text: str) -> dict:
+    """'문틀=4,도어=3' → {'문틀': 4, '도어': 3}"""
+    mix = {}
+    for part in filter(None, (p.strip() for p in text.split(','))):
+        name, _, weight = part.partition('=')
+        if name not in ITEM_GROUPS:
+            raise argparse.ArgumentTypeError(f"알 수 없는 품목 분류: {name} ({', '.join(ITEM_GROUPS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def parse_range(text: str) -> tuple:
+    """'5:60' → (5, 60), '30' → (30, 30)"""
+    low, _, high = text.partition(':')
+    return int(low), int(high or low)
+
+
+def generate_file(out_dir: str, index: int, args) -> dict:
+    """index 번째 파일 생성 (파일마다 시드가 정해져 있어 일부만 다시 만들어도 같은 내용)"""
+    rnd = random.Random(f"{args.seed}:{index}")
+    brand = args.companies[index % len(args.companies)]
+    doc_type = args.doc_types[(index // len(args.companies)) % len(args.doc_types)]
+    order_id = f"{'L' if doc_type == 'ledger' else 'E'}{20260101 + index // 1000:08d}-{index % 1000:03d}"
+    html, expected = build_page(rnd, doc_type, brand, rnd.randint(*args.rows), args.mix, args.noise, order_id)
+
+    stem = f"{index:06d}_{doc_type}_{COMPANIES[brand]['slug']}"
+    if rnd.random() < args.mhtml_ratio:
+        variant, encoding, declare = rnd.choice(VARIANTS)
+        name = f"{stem}.{variant}.mhtml"
+        data = build_mhtml(html, encoding, declare, rnd.randint(0, args.images), args.image_kb * 1024, seed=index)
+    else:
+        name = f"{stem}.html"
+        data = html.encode('utf-8')
+    with open(os.path.join(out_dir, name), 'wb') as f:
+        f.write(data)
+    return {"file": name, "doc_type": doc_type, "brand": brand, "rows": expected}
+
+
+def verify(corpus_dir: str, backends: list) -> int:
+    """manifest 기대값과 실제 파싱/회사 탐지 결과 비교, 불일치 수 반환"""
+    import local_file_processor as lfp
+
+    failures = 0
+    checked = 0
+    with open(os.path.join(corpus_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    for entry in entries:
+        html = lfp.read_order_html(os.path.join(corpus_dir, entry["file"]))
+        for backend in backends:
+            rows = [list(row) for row in lfp.parse_html_table(html, backend=backend)]
+            company = lfp.detect_company(html, rows, scan_limit=0)
+            checked += 1
+            if rows != entry["rows"] or company['brand'] != entry["brand"]:
+                failures += 1
+                if failures <= 10:
+                    print(f"❌ {entry['file']} [{backend}]: 행 {len(rows)}/{len(entry['rows'])}, "
+                          f"회사 {company['brand']}/{entry['brand']}")
+    print(f"{len(entries):,}개 파일 × 백엔드 {len(backends)}개 = {checked:,}건 검사, 불일치 {failures}건")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="합성 주문서 페이지 생성기")
+    parser.add_argument("out_dir", nargs="?", help="출력 폴더")
+    parser.add_argument("--count", type=int, default=100, help="파일 수")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드")
+    parser.add_argument("--rows", type=parse_range, default=(5, 60), help="파일당 품목 행 수 범위 (예: 5:60)")
+    parser.add_argument("--companies", default="YWy", help="회사 브랜드 코드 (Y=영림, W=우딘, y=예림)")
+    parser.add_argument("--doc-types", nargs="+", choices=DOC_TYPES, default=list(DOC_TYPES), help="문서 종류")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="품목 구성 비율 (예: 문틀=4,도어=3,몰딩=2,레일=1)")
+    parser.add_argument("--noise", type=int, choices=(0, 1, 2), default=2, help="잡음 수준")
+    parser.add_argument("--mhtml-ratio", type=float, default=0.3, help="MHTML 로 저장할 비율")
+    parser.add_argument("--images", type=int, default=5, help="MHTML 당 최대 이미지 파트 수")
+    parser.add_argument("--image-kb", type=int, default=20, help="이미지 파트 크기 (KB)")
+    parser.add_argument("--verify", metavar="DIR", help="생성 대신 DIR 코퍼스를 manifest 와 비교")
+    parser.add_argument("--backends", nargs="+", help="검사할 파서 백엔드 (기본: 사용 가능한 전체)")
+    args = parser.parse_args(argv)
+
+    if args.verify:
+        import table_parser
+        return 1 if verify(args.verify, args.backends or table_parser.available_backends()) else 0
+    if not args.out_dir:
+        parser.error("출력 폴더를 지정하세요 (또는 --verify DIR)")
+    unknown = set(args.companies) - set(COMPANIES)
+    if unknown:
+        parser.error(f"알 수 없는 회사 코드: {''.join(sorted(unknown))}")
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    start = time.perf_counter()
+    total_bytes = 0
+    with open(os.path.join(args.out_dir, MANIFEST_NAME), 'w', encoding='utf-8') as manifest:
+        for index in range(args.count):
+            entry = generate_file(args.out_dir, index, args)
+            total_bytes += os.path.getsize(os.path.join(args.out_dir, entry["file"]))
+            manifest.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            if (index + 1) % 1000 == 0:
+                print(f"  {index + 1:,}/{args.count:,}")
+    elapsed = time.perf_counter() - start
+    print(f"✅ {args.count:,}개 생성 ({total_bytes / 1024 / 1024:.1f}MB, {elapsed:.1f}s) → {args.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
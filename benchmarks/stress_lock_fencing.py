@@ -0,0 +1,287 @@
+"""
+락 Compare-and-Set / 펜싱 토큰 스트레스 검사
+============================================
+여러 "PC"(스레드마다 DistributedLockManager + 백엔드 하나)가 같은 주문들을 목록 페이지 단위로
+동시에 잡고, 처리(업로드)하고, 해제하는 과정을 반복
+일부 PC는 락을 잡은 채 멈춤(--stall-rate, 락 기한보다 오래) → 다른 PC가 기한 지난 락을 다시 가져감
+→ 멈췄던 PC가 깨어나 낡은 토큰으로 업로드/해제를 시도
+
+--heartbeat 를 주면 PC마다 기한 갱신 스레드를 돌림 → 멈춘 PC(느린 업로드)의 락은 빼앗기지 않아야 함
+--crash-rate 로 일부 PC가 락을 잡은 채 죽음(하트비트도 멈춤) → 다른 PC가 기한 뒤 회수해 끝까지 처리해야 함
+(회수까지 걸린 최대 시간을 출력)
+
+가짜 ERP 는 주문별로 지금까지 본 가장 큰 토큰보다 작은 토큰의 업로드를 거부 (펜싱 토큰을 확인하는 저장소)
+
+검사 (하나라도 어기면 종료 코드 1):
+- 중복 획득: 같은 주문에 같은 토큰이 두 PC에 발급됨 (Compare-and-Set 실패)
+- 토큰 역행: 한 주문의 토큰이 발급 순서대로 증가하지 않음
+- 중복 업로드: 가짜 ERP 가 한 주문을 두 번 이상 받음
+- 낡은 해제: 최종 행의 토큰/PC가 ERP 에 마지막으로 업로드한 토큰/PC와 다름
+- 미완료: 제한 시간 안에 모든 주문이 completed 가 되지 않음
+
+--lock-timeout 은 한 페이지 처리 시간보다 길어야 함 (짧으면 업로드 뒤 해제 전에 기한이 지나
+다른 PC가 다시 가져가 올리므로 중복 업로드로 잡힘 = 기한 갱신 없이 고정 기한만 쓸 때의 한계)
+
+--clock-skew 로 PC마다 시계를 -S/2 ~ +S/2 초 어긋나게 함 (기한은 잡은 PC의 시계로 기록됨)
+다른 PC는 기한 + --skew-margin(기본: --clock-skew) 뒤에 가져감 → 여유가 오차보다 작으면 잃은 락/중복 업로드가 생김
+
+백엔드:
+- memory : MemoryWorksheet 하나를 모든 PC가 공유 (--latency/--jitter 로 API 지연, --settle 로 확인 읽기 대기)
+           --settle 0 으로 돌리면 확인 읽기 전 대기가 없어 중복 획득이 생길 수 있음 (settle 의 필요성 확인용)
+- sqlite : 같은 DB 파일을 PC마다 다른 연결로 사용
+
+사용법:
+    python benchmarks/stress_lock_fencing.py
+    python benchmarks/stress_lock_fencing.py --machines 16 --orders 500 --stall-rate 0.1
+    python benchmarks/stress_lock_fencing.py --backend sqlite
+    python benchmarks/stress_lock_fencing.py --heartbeat 0.1 --crash-rate 0.05
+    python benchmarks/stress_lock_fencing.py --heartbeat 0.1 --clock-skew 0.9 --skew-margin 0
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import lock_backends  # noqa: E402
+from lock_manager import DistributedLockManager  # noqa: E402
+
+
+class FakeErp:
+    """펜싱 토큰을 확인하는 가짜 ERP (주문별 최대 토큰보다 작으면 거부)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.max_token = {}
+        self.uploads = defaultdict(list)   # order_id → [(machine_id, token)]
+        self.rejected = 0
+
+    def upload(self, order_id: str, machine_id: str, token: int) -> bool:
+        with self._lock:
+            if token < self.max_token.get(order_id, 0):
+                self.rejected += 1
+                return False
+            self.max_token[order_id] = token
+            self.uploads[order_id].append((machine_id, token))
+            return True
+
+
+def simulate(args) -> dict:
+    """스트레스 실행 후 결과 {violations: {검사 이름: [order_id]}, counters, grants, ...} (출력 없음)"""
+    workdir = tempfile.mkdtemp(prefix="lock_stress_")
+    worksheet = None
+    if args.backend == 'memory':
+        worksheet = lock_backends.MemoryWorksheet(args.latency, args.jitter)
+
+        def factory():
+            return lock_backends.MemoryLockBackend(worksheet=worksheet, settle=args.settle)
+    else:
+        db_path = os.path.join(workdir, 'locks.db')
+
+        def factory():
+            return lock_backends.SqliteLockBackend(db_path)
+
+    skew_margin = args.clock_skew if args.skew_margin is None else args.skew_margin
+    clock_rnd = random.Random(args.machines)
+    managers = []
+    for m in range(args.machines):
+        manager = DistributedLockManager(backend=factory(), machine_id=f"pc{m:02d}")
+        manager.LOCK_TIMEOUT_SEC = args.lock_timeout
+        manager.CLOCK_SKEW_SEC = skew_margin
+        offset = (clock_rnd.random() - 0.5) * args.clock_skew
+        manager.clock = lambda offset=offset: time.time() + offset
+        manager.connect()
+        if args.heartbeat:
+            manager.start_heartbeat(args.heartbeat)
+        managers.append(manager)
+
+    order_ids = [f"S{i:06d}" for i in range(args.orders)]
+    remaining = set(order_ids)
+    remaining_lock = threading.Lock()
+    grants = defaultdict(list)          # order_id → [(token, machine_id)]
+    grants_lock = threading.Lock()
+    counters = defaultdict(int)
+    crashed = {}                        # 죽은 PC가 잡고 있던 order_id → 죽은 시각
+    recovery = []                       # 죽은 PC의 주문을 다른 PC가 다시 잡기까지 걸린 시간
+    alive = [args.machines]
+    erp = FakeErp()
+    deadline = time.monotonic() + args.duration
+    barrier = threading.Barrier(args.machines)
+
+    def count(name):
+        with grants_lock:
+            counters[name] += 1
+
+    def machine(manager, seed):
+        rnd = random.Random(seed)
+        barrier.wait()
+        while time.monotonic() < deadline:
+            with remaining_lock:
+                candidates = list(remaining)
+            if not candidates:
+                return
+            page = rnd.sample(candidates, min(args.page, len(candidates)))
+            won = manager.acquire_many(page)
+            with grants_lock:
+                now = time.monotonic()
+                for order_id, token in won.items():
+                    grants[order_id].append((token, manager.machine_id))
+                    if order_id in crashed:
+                        recovery.append(now - crashed.pop(order_id))
+
+                # 락을 잡은 채 죽음 (하트비트도 멈춤), 마지막 한 PC는 남겨 둠
+                if won and alive[0] > 1 and rnd.random() < args.crash_rate:
+                    alive[0] -= 1
+                    counters["crashes"] += 1
+                    crashed.update((order_id, now) for order_id in won)
+                    manager.stop_heartbeat()
+                    return
+
+            if not won:
+                # 잡을 주문이 없음 (다른 PC가 처리 중) → 서버처럼 잠시 뒤 목록을 다시 조회
+                # (바로 다시 시도하면 sqlite 쓰기 잠금을 계속 잡아 락을 잡은 PC의 갱신/해제가 밀림)
+                time.sleep(args.poll)
+                continue
+
+            for order_id, token in won.items():
+                if rnd.random() < args.stall_rate:
+                    count("stalls")
+                    time.sleep((args.lock_timeout + skew_margin) * 1.5)  # 락을 잡은 채 멈춤 → 기한 지남
+                else:
+                    time.sleep(rnd.random() * args.work)
+
+                if not manager.validate_token(order_id, token):
+                    count("fenced_before_upload")
+                    # 기한만 지나고 아무도 안 가져갔으면 failed 로 돌려놓음 (가져갔으면 낡은 토큰이라 거부됨)
+                    if not manager.release_lock(order_id, DistributedLockManager.STATUS_FAILED, token=token):
+                        count("stale_release_rejected")
+                    continue
+
+                if not erp.upload(order_id, manager.machine_id, token):
+                    count("erp_rejected")
+                    continue
+                if manager.release_lock(order_id, DistributedLockManager.STATUS_COMPLETED, token=token):
+                    with remaining_lock:
+                        remaining.discard(order_id)
+                else:
+                    count("stale_release_rejected")
+
+    threads = [threading.Thread(target=machine, args=(manager, i)) for i, manager in enumerate(managers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    # ---- 검사 ----
+    violations = defaultdict(list)
+    for order_id, granted in grants.items():
+        tokens = [token for token, _ in granted]
+        if len(set(tokens)) != len(tokens):
+            violations["중복 획득"].append(order_id)
+        # 발급 기록 순서는 스레드 사이에서 뒤섞일 수 있으므로 PC별 순서만 확인
+        by_machine = defaultdict(list)
+        for token, machine_id in granted:
+            by_machine[machine_id].append(token)
+        if any(t != sorted(t) for t in by_machine.values()):
+            violations["토큰 역행"].append(order_id)
+
+    for order_id, uploads in erp.uploads.items():
+        if len(uploads) > 1:
+            violations["중복 업로드"].append(order_id)
+
+    checker = managers[0]
+    for order_id in order_ids:
+        row = checker.backend.read(order_id)
+        if not row or row[3] != DistributedLockManager.STATUS_COMPLETED:
+            violations["미완료"].append(order_id)
+            continue
+        last_machine, last_token = erp.uploads[order_id][-1] if erp.uploads.get(order_id) else ("", 0)
+        if row[4] != last_machine or lock_backends.as_int(row[7]) != last_token:
+            violations["낡은 해제"].append(order_id)
+
+    beats = [manager.heartbeat_stats() for manager in managers] if args.heartbeat else []
+    for manager in managers:
+        manager.close()
+
+    return {
+        "violations": dict(violations),
+        "counters": dict(counters),
+        "grants": sum(len(g) for g in grants.values()),
+        "erp_rejected": erp.rejected,
+        "elapsed": elapsed,
+        "recovery": recovery,
+        "heartbeats": beats,
+        "api_calls": worksheet.calls if worksheet is not None else None,
+    }
+
+
+def run(args) -> int:
+    result = simulate(args)
+    counters = defaultdict(int, result["counters"])
+    violations = result["violations"]
+
+    print(f"[{args.backend}] {args.machines} PCs × {args.orders:,} 주문, {result['elapsed']:.1f}s")
+    print(f"  획득 {result['grants']:,}회, 멈춤 {counters['stalls']:,}, 업로드 전 펜싱 거부 "
+          f"{counters['fenced_before_upload']:,}, 낡은 해제 거부 {counters['stale_release_rejected']:,}, "
+          f"ERP 거부 {result['erp_rejected']:,}")
+    if result["heartbeats"]:
+        beats = result["heartbeats"]
+        print(f"  하트비트 갱신 {sum(b['renewed'] for b in beats):,}건, 잃은 락 {sum(b['lost'] for b in beats):,}, "
+              f"갱신 오류 {sum(b['errors'] for b in beats):,}")
+    if counters["crashes"]:
+        recovery = result["recovery"]
+        print(f"  죽은 PC {counters['crashes']:,}대, 회수 {len(recovery):,}건, "
+              f"최대 {max(recovery, default=0):.2f}s (기한 {args.lock_timeout}s)")
+    if result["api_calls"] is not None:
+        print(f"  시트 API 호출 {result['api_calls']:,}회")
+
+    if violations:
+        for name, items in violations.items():
+            print(f"  ❌ {name}: {len(items):,}건 (예: {items[:5]})")
+        return 1
+    print("  ✅ 위반 없음")
+    return 0
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="락 Compare-and-Set / 펜싱 토큰 스트레스 검사")
+    parser.add_argument("--backend", choices=('memory', 'sqlite'), default='memory')
+    parser.add_argument("--machines", type=int, default=8, help="PC(스레드) 수")
+    parser.add_argument("--orders", type=int, default=200, help="주문 수")
+    parser.add_argument("--page", type=int, default=10, help="acquire_many 한 번의 주문 수")
+    parser.add_argument("--latency", type=float, default=0.002, help="memory: API 호출당 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.004, help="memory: API 호출당 추가 무작위 지연 (초)")
+    parser.add_argument("--settle", type=float, default=0.05, help="memory: 확인 읽기 전 대기 (초)")
+    parser.add_argument("--lock-timeout", type=float, default=0.5, help="락 기한 (초)")
+    parser.add_argument("--stall-rate", type=float, default=0.05, help="락을 잡은 채 멈추는 비율")
+    parser.add_argument("--heartbeat", type=float, default=0.0, help="기한 갱신 간격 (초, 0: 갱신 안 함)")
+    parser.add_argument("--clock-skew", type=float, default=0.0, help="PC 사이 최대 시계 차이 (초)")
+    parser.add_argument("--skew-margin", type=float, default=None,
+                        help="다른 PC의 락을 가져가기 전 기한 뒤 여유 (초, 기본: --clock-skew)")
+    parser.add_argument("--crash-rate", type=float, default=0.0, help="페이지를 잡은 뒤 PC가 죽는 비율")
+    parser.add_argument("--work", type=float, default=0.005, help="주문 하나 처리 시간 최대 (초)")
+    parser.add_argument("--poll", type=float, default=0.02, help="잡은 주문이 없을 때 다시 조회까지 대기 (초)")
+    parser.add_argument("--duration", type=float, default=60.0, help="제한 시간 (초)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    # 주문마다 나오는 로그(경합/거부 경고 포함)는 끔, 결과는 집계로 확인
+    logging.disable(logging.WARNING)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+품목명/품목코드 LRU 캐시 (Code Generation Cache)
+===============================================
+실제 주문은 같은 문틀/도어/몰딩 행이 반복되므로
+원시 셀 값 튜플 → (품목명, 품목코드) 결과를 크기 제한 LRU 로 보관
+
+- 스레드 안전 (원장/견적 업로드 스레드가 동시에 사용)
+- 적중/미스 통계 제공 (서버 /api/stats)
+- 선택적 디스크 저장: 규칙 버전이 다르면 불러오지 않음
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Hashable
+
+
+class LRUCache:
+    """크기 제한 LRU 캐시 (maxsize <= 0 이면 캐시 비활성)"""
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key: Hashable):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    # ---- 디스크 저장/복원 ----
+    def save(self, path, version: str) -> bool:
+        """JSON 으로 저장 (임시 파일 작성 후 교체하여 중간 실패 시 기존 파일 보존)"""
+        path = Path(path)
+        with self._lock:
+            entries = [[list(key), list(value)] for key, value in self._data.items()]
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": version, "entries": entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            return True
+        except OSError:
+            return False
+
+    def load(self, path, version: str) -> int:
+        """저장된 캐시 복원, 불러온 항목 수 반환 (버전 불일치/손상 시 0)"""
+        path = Path(path)
+        if not path.exists():
+            return 0
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if not isinstance(data, dict) or data.get("version") != version:
+            return 0
+
+        loaded = 0
+        for entry in data.get("entries", []):
+            try:
+                key, value = entry
+            except (TypeError, ValueError):
+                continue
+            self.put(tuple(key), tuple(value))
+            loaded += 1
+        return loaded
+
+
+def cache_size_from_env(default: int = 10000) -> int:
+    try:
+        return int(os.getenv("CODE_CACHE_SIZE", default))
+    except ValueError:
+        return default
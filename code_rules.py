@@ -0,0 +1,107 @@
+"""
+품목코드 규칙 엔진 (Code Rule Engine)
+====================================
+local_file_processor 의 우선순위 if/re.search 체인을
+"미리 컴파일된 정규식 + 동작" 규칙 표로 표현하고 하나의 작은 엔진으로 평가
+
+- 규칙은 선언 순서대로 평가, 처음으로 값을 반환한 규칙의 결과 사용
+- 동작(action)이 None 을 반환하면 다음 규칙으로 진행 (GAS의 fall-through 와 동일)
+- 규칙별 적중(hit) 횟수를 기록하여 어떤 우선순위 분기가 실제로 쓰이는지 확인 가능
+"""
+
+import re
+from typing import Callable, Dict, List, Optional
+
+# 공통 정규식 (여러 규칙 표에서 재사용)
+WHITESPACE_RE = re.compile(r'\s+')
+DIGITS_RE = re.compile(r'\d+')
+HANGUL_ONLY_RE = re.compile(r'^[가-힣\s]+$')
+
+
+class Rule:
+    """단일 규칙: source 필드에 pattern 을 적용하고, 일치하면 action 실행
+
+    Args:
+        name: 규칙 이름 (통계 키)
+        pattern: 정규식 문자열/컴파일 객체, 또는 None (항상 action 실행)
+        action: action(match, ctx) -> 결과 문자열 또는 None(다음 규칙으로)
+        source: ctx 에서 pattern 을 적용할 키
+        method: 'search' 또는 'match'
+        when: when(ctx) -> bool, False 면 정규식 평가 없이 건너뜀
+        flags: pattern 이 문자열일 때 컴파일 플래그
+    """
+
+    __slots__ = ('name', 'pattern', 'action', 'source', 'when', '_apply', 'hits')
+
+    def __init__(self, name: str, pattern, action: Callable, source: str = None,
+                 method: str = 'search', when: Callable = None, flags: int = 0):
+        self.name = name
+        if isinstance(pattern, str):
+            pattern = re.compile(pattern, flags)
+        self.pattern = pattern
+        self.action = action
+        self.source = source
+        self.when = when
+        self._apply = getattr(pattern, method) if pattern is not None else None
+        self.hits = 0
+
+    def evaluate(self, ctx: dict) -> Optional[str]:
+        if self.when is not None and not self.when(ctx):
+            return None
+        if self._apply is None:
+            result = self.action(None, ctx)
+        else:
+            match = self._apply(ctx[self.source])
+            if match is None:
+                return None
+            result = self.action(match, ctx)
+        if result is not None:
+            self.hits += 1
+        return result
+
+
+class RuleSet:
+    """우선순위 규칙 표 (선언 순서대로 평가)"""
+
+    def __init__(self, name: str, rules: List[Rule], default: Callable = None):
+        self.name = name
+        self.rules = rules
+        self.default = default
+        self.default_hits = 0
+
+    def apply(self, ctx: dict) -> str:
+        for rule in self.rules:
+            result = rule.evaluate(ctx)
+            if result is not None:
+                return result
+        self.default_hits += 1
+        return self.default(ctx) if self.default is not None else ''
+
+    def stats(self) -> Dict[str, int]:
+        counts = {rule.name: rule.hits for rule in self.rules}
+        counts['(default)'] = self.default_hits
+        return counts
+
+    def reset_stats(self):
+        for rule in self.rules:
+            rule.hits = 0
+        self.default_hits = 0
+
+
+# 등록된 규칙 표 (통계 조회용)
+_REGISTRY: Dict[str, RuleSet] = {}
+
+
+def register(rule_set: RuleSet) -> RuleSet:
+    _REGISTRY[rule_set.name] = rule_set
+    return rule_set
+
+
+def rule_hit_stats() -> Dict[str, Dict[str, int]]:
+    """모든 규칙 표의 규칙별 적중 횟수"""
+    return {name: rule_set.stats() for name, rule_set in _REGISTRY.items()}
+
+
+def reset_rule_hit_stats():
+    for rule_set in _REGISTRY.values():
+        rule_set.reset_stats()
@@ -0,0 +1,187 @@
+"""
+완료 주문 필터 (Completed Order Bloom Filter)
+=============================================
+목록 페이지의 주문마다 Google Sheets 락 조회를 하기 전에
+"이미 어디선가 완료된 주문" 을 로컬에서 걸러내는 확률적 필터
+
+- 블룸 필터: 아니라고 하면 확실히 처음 보는 주문 → 락 시트로 확인
+              맞다고 하면 완료된 주문 (error_rate 확률로 오탐 → 새 주문을 건너뛸 수 있으므로 낮게 설정)
+- 용량이 차면 두 배 크기의 층을 추가 (Scalable Bloom Filter) → 재구성 없이 계속 추가 가능,
+  락 시트에서 정리(cleanup_old_locks)된 오래된 주문도 필터에는 남음
+- 로컬 이력 + 락 시트(완료 상태)로 채우고, 파일로 저장해 재시작 후에도 유지 (임시 파일 → 교체)
+"""
+
+import hashlib
+import math
+import os
+import struct
+import threading
+from pathlib import Path
+
+_MAGIC = b'BLM2'                          # 해시 위치 규칙이 바뀌면 올림 (예전 파일은 빈 필터로 시작 → 다시 채움)
+_HEADER = struct.Struct('<4sI')          # magic, 층 수
+_LAYER = struct.Struct('<QIQQd')         # 비트 수, 해시 수, 용량, 추가 수, 오탐률
+
+
+def _hashes(key: str) -> tuple:
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+
+class BloomFilter:
+    """고정 크기 블룸 필터 (이중 해싱)"""
+
+    def __init__(self, capacity: int, error_rate: float, bits: bytearray = None, count: int = 0):
+        self.capacity = max(1, int(capacity))
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / self.capacity * math.log(2))))
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.count = count
+
+    def _positions(self, key: str):
+        # 개선된 이중 해싱 (h1 + i*h2 + (i^3 - i)/6): 단순 이중 해싱은 h2 가 같은 키끼리 위치가 거의 겹쳐
+        # 작은 층에서 오탐률이 목표의 10배 이상이 됨
+        h1, h2 = _hashes(key)
+        m = self.num_bits
+        return [(h1 + i * h2 + (i * i * i - i) // 6) % m for i in range(self.num_hashes)]
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def add(self, key: str) -> bool:
+        """추가 (이미 있던 것으로 보이면 False)"""
+        bits = self.bits
+        added = False
+        for p in self._positions(key):
+            mask = 1 << (p & 7)
+            if not bits[p >> 3] & mask:
+                bits[p >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+
+class CompletedOrderFilter:
+    """완료된 주문번호 필터 (층을 늘려 가는 블룸 필터 + 파일 저장)"""
+
+    def __init__(self, path=None, capacity: int = 100_000, error_rate: float = 1e-6):
+        self.path = Path(path) if path else None
+        self.initial_capacity = capacity
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._layers = []
+        self._dirty = False
+        self.skips = 0
+        if self.path is not None:
+            self.load()
+        if not self._layers:
+            self._layers.append(BloomFilter(capacity, error_rate / 2))
+
+    def __repr__(self):
+        return f"<CompletedOrderFilter {self.count}건, {len(self._layers)}층, {self.size_bytes // 1024}KB>"
+
+    @property
+    def count(self) -> int:
+        return sum(layer.count for layer in self._layers)
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(len(layer.bits) for layer in self._layers)
+
+    def might_contain(self, order_id: str) -> bool:
+        """완료된 주문일 가능성 (False 면 확실히 필터에 없음)"""
+        return any(order_id in layer for layer in self._layers)
+
+    def add(self, order_id: str) -> bool:
+        with self._lock:
+            if self.might_contain(order_id):
+                return False
+            layer = self._layers[-1]
+            if layer.full:
+                # 전체 오탐률이 error_rate 를 넘지 않도록 층마다 절반씩 (1/2 + 1/4 + ... < 1)
+                layer = BloomFilter(layer.capacity * 2, layer.error_rate / 2)
+                self._layers.append(layer)
+            layer.add(order_id)
+            self._dirty = True
+            return True
+
+    def add_many(self, order_ids) -> int:
+        return sum(self.add(order_id) for order_id in order_ids)
+
+    def record_skip(self):
+        with self._lock:
+            self.skips += 1
+
+    def stats(self) -> dict:
+        return {
+            "count": self.count,
+            "layers": len(self._layers),
+            "size_kb": round(self.size_bytes / 1024, 1),
+            "error_rate": self.error_rate,
+            "skips": self.skips,
+        }
+
+    # ---- 저장/복원 ----
+    def load(self) -> bool:
+        """저장된 필터 복원 (없거나 손상되면 빈 필터로 시작하고 False)"""
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            magic, num_layers = _HEADER.unpack_from(data, 0)
+            if magic != _MAGIC:
+                raise ValueError("magic 불일치")
+            offset = _HEADER.size
+            layers = []
+            for _ in range(num_layers):
+                num_bits, num_hashes, capacity, count, error_rate = _LAYER.unpack_from(data, offset)
+                offset += _LAYER.size
+                size = (num_bits + 7) // 8
+                layer = BloomFilter(capacity, error_rate, bytearray(data[offset:offset + size]), count)
+                if (layer.num_bits, layer.num_hashes, len(layer.bits)) != (num_bits, num_hashes, size):
+                    raise ValueError("층 크기 불일치")
+                offset += size
+                layers.append(layer)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, struct.error) as e:
+            print(f"[CompletedFilter] 저장된 필터를 읽을 수 없어 새로 시작: {e}")
+            return False
+        with self._lock:
+            self._layers = layers
+            self._dirty = False
+        return True
+
+    def save(self, force: bool = False) -> bool:
+        """변경이 있으면 파일로 저장 (임시 파일 → 교체)"""
+        if self.path is None:
+            return False
+        with self._lock:
+            if not (self._dirty or force):
+                return False
+            parts = [_HEADER.pack(_MAGIC, len(self._layers))]
+            for layer in self._layers:
+                parts.append(_LAYER.pack(layer.num_bits, layer.num_hashes, layer.capacity, layer.count,
+                                         layer.error_rate))
+                parts.append(bytes(layer.bits))
+            self._dirty = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp_path, 'wb') as f:
+                f.write(b''.join(parts))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            return True
+        except OSError as e:
+            print(f"[CompletedFilter] 저장 실패: {e}")
+            with self._lock:
+                self._dirty = True
+            return False
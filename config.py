@@ -35,6 +35,14 @@ class Config:
         self.LOGS_DIR = self.base_dir / "logs"
         self.UPLOADER_LOGS_DIR = self.LOGS_DIR / "uploader"
         self.HISTORY_FILE = self.base_dir / os.getenv("HISTORY_FILE", "v10_history.json")  # V10: Updated history file
+        self.HISTORY_DB = self.base_dir / os.getenv("HISTORY_DB", "v10_history.db")  # SQLite history (HISTORY_FILE is imported once)
+
+        # History Store (sqlite: HISTORY_DB / journal: HISTORY_FILE snapshot + .journal JSONL /
+        #                json: HISTORY_FILE written atomically, one group commit per window)
+        self.HISTORY_BACKEND = os.getenv("HISTORY_BACKEND", "sqlite").lower()
+        self.HISTORY_FSYNC_INTERVAL_SEC = float(os.getenv("HISTORY_FSYNC_INTERVAL_SEC", 1.0))
+        self.HISTORY_COMPACT_EVERY = int(os.getenv("HISTORY_COMPACT_EVERY", 1000))
+        self.HISTORY_COMMIT_WINDOW_SEC = float(os.getenv("HISTORY_COMMIT_WINDOW_SEC", 0.05))
         self.GOOGLE_TOKEN_PATH = self.base_dir / "google_token.pickle"
         self.GOOGLE_CREDENTIALS_PATH = self.base_dir / "google_oauth_credentials.json"
         self.ECOUNT_SESSION_PATH = self.base_dir / "ecount_session.json"
@@ -56,9 +64,42 @@ class Config:
         self.RETRY_DELAY_SEC = int(os.getenv("RETRY_DELAY_SEC", 2))
 
         # V10: Distributed Lock Settings
-        self.LOCK_TIMEOUT_SEC = int(os.getenv("LOCK_TIMEOUT_SEC", 1800))  # 30 minutes default
+        # 락 기한: 하트비트가 LOCK_HEARTBEAT_SEC 마다 갱신, 갱신이 끊긴(죽은) PC의 락은 이 시간 뒤 다른 PC가 가져감
+        # (기한은 행의 expires_at = 잡은 PC의 UTC 시각 + 기한, 다른 PC는 LOCK_CLOCK_SKEW_SEC 만큼 더 기다린 뒤 가져감)
+        # 기본 45 + 10 = 55초 → 죽은 PC의 주문은 1분 안에 회수
+        self.LOCK_TIMEOUT_SEC = int(os.getenv("LOCK_TIMEOUT_SEC", 45))
+        self.LOCK_CLOCK_SKEW_SEC = float(os.getenv("LOCK_CLOCK_SKEW_SEC", 10))  # PC 사이 시계 오차 허용 범위
+        self.LOCK_HEARTBEAT_SEC = float(os.getenv("LOCK_HEARTBEAT_SEC", 15))  # 기한의 1/3 이하
         self.LOCK_SHEET_NAME = os.getenv("LOCK_SHEET_NAME", "processing_lock")
         self.ENABLE_DISTRIBUTED_LOCK = os.getenv("ENABLE_DISTRIBUTED_LOCK", "true").lower() == "true"
+        # 락 저장소: sheets (Google Sheets, 기본) | sqlite (공유 디스크의 LOCK_DB_PATH) | memory (프로세스 안, 테스트용)
+        self.LOCK_BACKEND = os.getenv("LOCK_BACKEND", "sheets").lower()
+        self.LOCK_DB_PATH = self.base_dir / os.getenv("LOCK_DB_PATH", "data/v10_locks.db")
+        self.LOCK_DB_TIMEOUT_SEC = float(os.getenv("LOCK_DB_TIMEOUT_SEC", 30))  # 다른 PC 트랜잭션 대기
+        # 시트 락 획득 후 확인 읽기까지 대기 (다른 PC의 읽기→쓰기 간격보다 길어야 중복 획득을 걸러냄)
+        self.LOCK_CAS_SETTLE_SEC = float(os.getenv("LOCK_CAS_SETTLE_SEC", 1.0))
+        # 락 시트 로컬 캐시: TTL 이 지나면 새로 추가된 행만 읽고, FULL_REFRESH 마다 시트 전체를 다시 읽음
+        self.LOCK_CACHE_TTL_SEC = float(os.getenv("LOCK_CACHE_TTL_SEC", 5))
+        self.LOCK_CACHE_FULL_REFRESH_SEC = float(os.getenv("LOCK_CACHE_FULL_REFRESH_SEC", 60))
+
+        # Code Generation Cache (품목명/품목코드 LRU)
+        self.CODE_CACHE_SIZE = int(os.getenv("CODE_CACHE_SIZE", 10000))
+        self.CODE_CACHE_PERSIST = os.getenv("CODE_CACHE_PERSIST", "true").lower() == "true"
+        self.CODE_CACHE_PATH = self.DATA_DIR / "code_cache.json"
+
+        # Parse Cache (파일 내용 SHA-256 → 파싱 결과, 재시도 시 재파싱 생략)
+        self.PARSE_CACHE_ENABLED = os.getenv("PARSE_CACHE_ENABLED", "true").lower() == "true"
+        self.PARSE_CACHE_DIR = self.base_dir / os.getenv("PARSE_CACHE_DIR", self.DATA_DIR / "parse_cache")
+
+        # Completed Order Filter (블룸 필터로 완료 주문을 락 시트 조회 전에 건너뜀)
+        self.COMPLETED_FILTER_ENABLED = os.getenv("COMPLETED_FILTER_ENABLED", "true").lower() == "true"
+        self.COMPLETED_FILTER_PATH = self.DATA_DIR / "completed_orders.bloom"
+        self.COMPLETED_FILTER_CAPACITY = int(os.getenv("COMPLETED_FILTER_CAPACITY", 100000))
+        self.COMPLETED_FILTER_ERROR_RATE = float(os.getenv("COMPLETED_FILTER_ERROR_RATE", 1e-6))
+        self.COMPLETED_FILTER_RESEED_SEC = int(os.getenv("COMPLETED_FILTER_RESEED_SEC", 3600))
+
+        # Parallel Parsing (업로드 대상 파일이 많을 때 프로세스 풀 사용, 0 = CPU 수, 1 = 직렬)
+        self.PARALLEL_WORKERS = int(os.getenv("PARALLEL_WORKERS", 0))
 
     def __repr__(self):
         return f"<Config V10 Ports={self.FLASK_PORT} Interval={self.DOWNLOAD_INTERVAL_SEC} DistLock={self.ENABLE_DISTRIBUTED_LOCK}>"
@@ -0,0 +1,233 @@
+"""
+ERP 업로드 행 레이아웃 (ERP Row Layouts)
+========================================
+이카운트 붙여넣기 양식의 열 위치를 한 곳에서 정의
+
+- ErpLayout: 양식별 열 수 + 필드 → 열 번호 + 고정값 열
+    - LEDGER_LAYOUT  : 구매입력(원장) 30열
+    - ESTIMATE_LAYOUT: 견적서입력 22열 (A~V)
+- ErpRow: 값이 있는 필드만 보관하는 __slots__ 행 (30칸 리스트를 행마다 만들지 않음)
+  순회하면 양식 전체 칸을 내보내므로 기존 리스트 행처럼 사용 가능
+- 탭 구분(TSV) 텍스트는 양식별로 미리 만든 템플릿에 값만 채워 생성
+- TSV 는 행마다 템플릿 한 번으로 만들어 바로 이어 붙이거나 StringIO/파일에 써 내려감 (셀 리스트 없음),
+  셀 안의 탭/줄바꿈은 공백으로 바꿔 열이 밀리지 않게 하고,
+  최대 길이 단위로 나눠 내보내기(iter_tsv_chunks) 지원
+"""
+
+import io
+import re
+from typing import Iterable, Iterator, TextIO
+
+# 셀 안에 들어가면 붙여넣기 시 열/행이 밀리는 문자 (연속된 경우 공백 하나로)
+_CELL_BREAK_RE = re.compile(r'[\t\r\n]+')
+
+
+def escape_cell(value) -> str:
+    """셀 값을 문자열로 (None → '', 탭/줄바꿈 → 공백)"""
+    if value is None:
+        return ''
+    text = value if isinstance(value, str) else str(value)
+    if '\t' in text or '\n' in text or '\r' in text:
+        return _CELL_BREAK_RE.sub(' ', text)
+    return text
+
+# 행 필드 (ErpRow 속성 이름, 템플릿 채우는 순서)
+ERP_FIELDS = ('date', 'product_name', 'product_code', 'quantity', 'amount', 'remarks')
+
+
+class ErpLayout:
+    """ERP 양식 열 정의 (columns: 필드명 → 열 번호, constants: 열 번호 → 고정값)"""
+
+    def __init__(self, name: str, width: int, columns: dict, constants: dict = None):
+        unknown = set(columns) - set(ERP_FIELDS)
+        if unknown:
+            raise ValueError(f"알 수 없는 필드: {sorted(unknown)}")
+        constants = constants or {}
+        used = list(columns.values()) + list(constants)
+        if len(set(used)) != len(used) or any(not 0 <= i < width for i in used):
+            raise ValueError(f"{name}: 열 번호가 겹치거나 범위({width}열)를 벗어남")
+
+        self.name = name
+        self.width = width
+        self.columns = dict(columns)
+        self.constants = dict(constants)
+
+        # 열 번호 → 필드명 (필드가 없는 열은 None)
+        self._cell_fields = [None] * width
+        for field, index in columns.items():
+            self._cell_fields[index] = field
+
+        # TSV 템플릿: 빈 칸/고정값은 그대로, 필드 칸은 {필드 순번}
+        cells = []
+        for index in range(width):
+            field = self._cell_fields[index]
+            if field is not None:
+                cells.append('{%d}' % ERP_FIELDS.index(field))
+            else:
+                cells.append(str(constants.get(index, '')).replace('{', '{{').replace('}', '}}'))
+        self._template = '\t'.join(cells)
+
+    def __repr__(self):
+        return f"<ErpLayout {self.name} {self.width}열>"
+
+    def __reduce__(self):
+        # 프로세스 간 전달(pickle) 후에도 등록된 레이아웃은 같은 객체로 복원
+        if LAYOUTS.get(self.name) is self:
+            return (get_layout, (self.name,))
+        return object.__reduce__(self)
+
+    def cells(self, row: 'ErpRow') -> list:
+        """행을 양식 전체 칸 리스트로"""
+        out = [''] * self.width
+        for index, value in self.constants.items():
+            out[index] = value
+        for field, index in self.columns.items():
+            out[index] = getattr(row, field)
+        return out
+
+    def format_row(self, row: 'ErpRow') -> str:
+        """행 하나를 탭 구분 문자열로 (셀 안의 탭/줄바꿈은 공백으로)"""
+        line = self._template.format(row.date, row.product_name, row.product_code,
+                                     row.quantity, row.amount, row.remarks)
+        # 대부분의 행은 그대로 통과, 탭 개수가 다르거나 줄바꿈이 있을 때만 셀 단위로 정리
+        if line.count('\t') == self.width - 1 and '\n' not in line and '\r' not in line:
+            return line
+        return self._template.format(*(escape_cell(getattr(row, f)) for f in ERP_FIELDS))
+
+
+class ErpRow:
+    """ERP 업로드 행 한 줄 (값은 문자열, 빈 값은 '')"""
+
+    __slots__ = ('layout',) + ERP_FIELDS
+
+    def __init__(self, layout: ErpLayout, date: str = '', product_name: str = '', product_code: str = '',
+                 quantity: str = '', amount: str = '', remarks: str = ''):
+        self.layout = layout
+        self.date = date
+        self.product_name = product_name
+        self.product_code = product_code
+        self.quantity = quantity
+        self.amount = amount
+        self.remarks = remarks
+
+    # ---- 기존 리스트 행 호환 (for cell in row / row[i] / len(row)) ----
+    def __iter__(self):
+        return iter(self.layout.cells(self))
+
+    def __len__(self):
+        return self.layout.width
+
+    def __getitem__(self, index):
+        return self.layout.cells(self)[index]
+
+    def __eq__(self, other):
+        if isinstance(other, ErpRow):
+            return self.layout is other.layout and all(
+                getattr(self, f) == getattr(other, f) for f in ERP_FIELDS)
+        if isinstance(other, (list, tuple)):
+            return self.layout.cells(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        values = ', '.join(f"{f}={getattr(self, f)!r}" for f in ERP_FIELDS if getattr(self, f))
+        return f"ErpRow({self.layout.name}, {values})"
+
+    def to_list(self) -> list:
+        return self.layout.cells(self)
+
+    def to_tsv(self) -> str:
+        return self.layout.format_row(self)
+
+
+# 기본 구매입력 (Ledger) 레이아웃 - 30열
+LEDGER_LAYOUT = ErpLayout('ledger', 30, {
+    'date': 0,              # 날짜 (A)
+    'product_name': 16,     # 품목명 (Q) - 기존 V6 기준
+    'product_code': 17,     # 품목코드 (R)
+    'quantity': 18,         # 수량 (S)
+    'amount': 19,           # 공급가액 (T)
+    'remarks': 29,          # 비고 (AD)
+}, constants={6: '100'})
+
+# 견적서입력 팝업 - 실제 엑셀 양식 22열 (A~V)
+# A열(0): 순번, B열(1): 거래처코드, C열(2): 거래처명, D열(3): 일자
+# E열(4): 출하창고, F열(5): 전표담당자, G열(6): 거래처담당팀, H열(7): 거래처연락처
+# I열(8): 거래유형, J열(9): 결제조건, K열(10): 견적유효기간, L열(11): 내부용기밀
+# M열(12): 수령고객정보, N열(13): NO., O열(14): 품목코드, P열(15): 품목명
+# Q열(16): 수량, R열(17): 단가, S열(18): 공급가액, T열(19): 부가세
+# U열(20): 합계, V열(21): 비고
+ESTIMATE_LAYOUT = ErpLayout('estimate', 22, {
+    'date': 3,              # 일자 (D)
+    'product_code': 14,     # 품목코드 (O)
+    'product_name': 15,     # 품목명 (P)
+    'quantity': 16,         # 수량 (Q)
+})
+
+LAYOUTS = {
+    'ledger': LEDGER_LAYOUT,
+    'estimate': ESTIMATE_LAYOUT,
+}
+
+
+def get_layout(target_type: str) -> ErpLayout:
+    """target_type → 레이아웃 ('estimate' 외에는 기존과 같이 원장 양식)"""
+    return LAYOUTS.get(target_type, LEDGER_LAYOUT)
+
+
+def format_tsv_row(row) -> str:
+    """ErpRow 는 템플릿으로, 리스트 행은 셀마다 escape_cell 후 탭으로 연결"""
+    if isinstance(row, ErpRow):
+        return row.layout.format_row(row)
+    return "\t".join(escape_cell(cell) for cell in row)
+
+
+def write_tsv(rows: Iterable, out: TextIO, line_sep: str = "\r\n", batch_rows: int = 1024) -> int:
+    """행들을 out(StringIO/파일)에 TSV 로 기록, 기록한 행 수 반환
+
+    batch_rows 행씩 모아 한 번에 write (행마다 write 호출하는 비용 절감, 메모리는 배치 크기로 제한)
+    """
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(format_tsv_row(row))
+        if len(batch) >= batch_rows:
+            if count:
+                out.write(line_sep)
+            out.write(line_sep.join(batch))
+            count += len(batch)
+            batch = []
+    if batch:
+        if count:
+            out.write(line_sep)
+        out.write(line_sep.join(batch))
+        count += len(batch)
+    return count
+
+
+def rows_to_tsv(rows: Iterable, line_sep: str = "\r\n") -> str:
+    """여러 행을 클립보드 붙여넣기용 TSV 텍스트로 (행 문자열을 바로 이어 붙임)"""
+    return line_sep.join(map(format_tsv_row, rows))
+
+
+def iter_tsv_chunks(rows: Iterable, max_chars: int, line_sep: str = "\r\n") -> Iterator[str]:
+    """TSV 를 max_chars 이하 조각으로 나눠 생성 (행 중간에서 자르지 않음)
+
+    한 행이 max_chars 보다 길면 그 행만 단독 조각으로 내보냄
+    """
+    buffer = io.StringIO()
+    size = 0
+    for row in rows:
+        line = format_tsv_row(row)
+        if size and size + len(line_sep) + len(line) > max_chars:
+            yield buffer.getvalue()
+            buffer = io.StringIO()
+            size = 0
+        if size:
+            buffer.write(line_sep)
+            size += len(line_sep)
+        buffer.write(line)
+        size += len(line)
+    if size:
+        yield buffer.getvalue()
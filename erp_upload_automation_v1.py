@@ -11,6 +11,7 @@ import time
 import pyperclip
 # Import centralized config
 from config import config
+import erp_layout
 
 # ============================================================
 # 설정 (V8.1: 중앙 설정 관리 도입)
@@ -114,12 +115,8 @@ class ErpUploadAutomation:
         
         self.log(f"📋 {len(self.erp_data)}건 데이터 클립보드 복사 중...")
         
-        lines = []
-        for row in self.erp_data:
-            row_str = [str(cell) if cell is not None else "" for cell in row]
-            lines.append("\t".join(row_str))
-        
-        clipboard_text = "\r\n".join(lines)
+        # ErpRow 는 레이아웃 템플릿으로, 시트에서 읽은 리스트 행은 셀 단위로 직렬화 (셀 안 탭/줄바꿈은 공백)
+        clipboard_text = erp_layout.rows_to_tsv(self.erp_data)
         
         # 클래스 변수에 저장 (브라우저에서 JavaScript로 사용하기 위해)
         self.clipboard_text = clipboard_text
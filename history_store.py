@@ -0,0 +1,528 @@
+"""
+처리 이력 저장소 (History Store)
+================================
+v10_history.json 을 대신하는 처리 완료 주문번호 저장소
+
+공통 (모든 백엔드):
+- 프로세스 전체에서 하나의 객체를 공유 (다운로더/업로더/대시보드, 내부 Lock)
+- 문서 종류별 주문번호를 메모리에 유지 (추가 순서 유지 dict) → 포함 여부 확인은 O(1), 디스크를 읽지 않음
+- add_many 로 여러 건을 한 번에 기록
+
+백엔드 (HISTORY_BACKEND):
+- sqlite : SQLite WAL 모드, (doc_type, order_id) 고유 인덱스 → 건별 추가가 작은 트랜잭션 하나
+           처음 열 때 기존 JSON 이력({"ledger": [...], "estimate": [...]} 또는 예전 리스트 형식)을 한 번만 가져옴
+           (JSON 이 손상된 경우 가져오지 않고 HistoryCorruptError)
+           (JSON 파일은 그대로 두므로 이전 버전으로 되돌려도 이력 유지)
+- journal: 스냅샷(JSON, 기존 v10_history.json 과 같은 형식) + 추가분만 적는 JSONL 저널
+           fsync 는 fsync_interval 초마다 한 번 (그 사이 추가분을 묶어서), 저널이 compact_every 줄을 넘으면
+           스냅샷으로 합치고 저널을 비움 (백그라운드 스레드)
+- json   : 스냅샷(JSON) 하나만 사용, 동시에 들어온 추가를 commit_window 동안 모아 파일 전체를 한 번에 기록
+           (그룹 커밋, 임시 파일 → os.replace 이므로 쓰다 죽어도 이전 파일이 온전히 남음)
+           add 는 자기 변경이 디스크에 기록된 뒤 메모리에 반영하고 반환 (기록 실패는 예외), 커밋 지연/묶음 크기 지표 제공
+
+스냅샷 파일이 손상된 경우 빈 이력으로 시작하지 않고 HistoryCorruptError
+(빈 이력으로 시작하면 모든 주문을 다시 다운로드/업로드함)
+"""
+
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DOC_TYPES = ('ledger', 'estimate')
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    doc_type TEXT NOT NULL,
+    order_id TEXT NOT NULL,
+    added_at TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_history_doc_order ON history (doc_type, order_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class HistoryCorruptError(ValueError):
+    """이력 스냅샷 파일을 읽을 수 없음 (빈 이력으로 대체하지 않음)"""
+
+
+def read_legacy_json(path, strict: bool = False) -> dict:
+    """기존 JSON 이력 읽기 (예전 리스트 형식은 원장 이력)
+
+    파일이 없으면 빈 이력, 손상된 경우 strict 이면 HistoryCorruptError, 아니면 빈 이력
+    """
+    history = {doc_type: [] for doc_type in DOC_TYPES}
+    if not path or not os.path.exists(path):
+        return history
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        if strict:
+            raise HistoryCorruptError(f"이력 파일을 읽을 수 없음: {path} ({e})") from e
+        print(f"[History] 이력 파일을 읽을 수 없어 건너뜀: {path} ({e})")
+        return history
+    if isinstance(data, list):
+        data = {"ledger": data}
+    if isinstance(data, dict):
+        for doc_type, ids in data.items():
+            if isinstance(ids, list):
+                history.setdefault(doc_type, []).extend(str(i) for i in ids)
+    return history
+
+
+def write_json_atomic(path: Path, data):
+    """임시 파일에 쓰고 fsync 후 교체 (중간에 죽어도 기존 파일 또는 새 파일 중 하나만 보임)"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class _HistoryIndex:
+    """메모리 이력 (문서 종류 → 추가 순서를 유지하는 dict), 기록은 하위 클래스의 _write"""
+
+    backend = ''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = {doc_type: {} for doc_type in DOC_TYPES}
+
+    def __repr__(self):
+        counts = ', '.join(f"{k}={len(v)}" for k, v in self._ids.items())
+        return f"<{type(self).__name__} {counts}>"
+
+    def _load(self, doc_type: str, order_ids):
+        self._ids.setdefault(doc_type, {}).update(dict.fromkeys(order_ids))
+
+    # ---- 조회 ----
+    def contains(self, doc_type: str, order_id: str) -> bool:
+        ids = self._ids.get(doc_type)
+        return ids is not None and order_id in ids
+
+    def ids(self, doc_type: str) -> set:
+        """문서 종류의 주문번호 집합 (복사본)"""
+        with self._lock:
+            return set(self._ids.get(doc_type, ()))
+
+    def count(self, doc_type: str) -> int:
+        return len(self._ids.get(doc_type, ()))
+
+    def counts(self) -> dict:
+        return {doc_type: len(ids) for doc_type, ids in self._ids.items()}
+
+    def as_dict(self) -> dict:
+        """기존 JSON 과 같은 형태 {"ledger": [...], "estimate": [...]} (추가 순서)"""
+        with self._lock:
+            return {doc_type: list(ids) for doc_type, ids in self._ids.items()}
+
+    def stats(self) -> dict:
+        return {"backend": self.backend, "counts": self.counts()}
+
+    # ---- 추가 ----
+    def add(self, doc_type: str, order_id: str) -> bool:
+        """주문번호 추가 (이미 있으면 False)"""
+        return self.add_many(doc_type, [order_id]) > 0
+
+    def add_many(self, doc_type: str, order_ids) -> int:
+        """여러 주문번호를 한 번에 기록, 새로 추가된 건수 반환"""
+        with self._lock:
+            known = self._ids.setdefault(doc_type, {})
+            new_ids = [order_id for order_id in dict.fromkeys(order_ids) if order_id not in known]
+            if not new_ids:
+                return 0
+            self._write(doc_type, new_ids)
+            known.update(dict.fromkeys(new_ids))
+            return len(new_ids)
+
+    def _write(self, doc_type: str, new_ids: list):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+# =================================================================================================
+# SQLite 백엔드
+# =================================================================================================
+
+class SqliteHistoryStore(_HistoryIndex):
+    """SQLite(WAL) 이력 - 추가 한 번이 트랜잭션 하나"""
+
+    backend = 'sqlite'
+
+    def __init__(self, db_path, legacy_json_path=None):
+        super().__init__()
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        self.migrated = 0
+        if legacy_json_path:
+            try:
+                self.migrated = self._migrate_json(legacy_json_path)
+            except Exception:
+                self._conn.close()
+                raise
+
+        for doc_type, order_id in self._conn.execute("SELECT doc_type, order_id FROM history ORDER BY id"):
+            self._load(doc_type, (order_id,))
+
+    def _get_meta(self, key: str):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _migrate_json(self, json_path) -> int:
+        """JSON 이력을 한 번만 가져옴 (meta 에 기록), 가져온 건수 반환
+
+        JSON 파일이 손상된 경우 HistoryCorruptError (meta 에 기록하지 않으므로 파일을 고친 뒤 다시 가져옴)
+        """
+        if self._get_meta("migrated_from") is not None:
+            return 0
+        history = read_legacy_json(json_path, strict=True)
+        now = _now()
+        rows = [(doc_type, order_id, now) for doc_type, ids in history.items() for order_id in ids]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO history (doc_type, order_id, added_at) VALUES (?, ?, ?)", rows)
+                inserted = self._conn.total_changes - before
+                self._conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", [
+                    ("migrated_from", str(json_path)),
+                    ("schema_version", str(SCHEMA_VERSION)),
+                ])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return inserted
+
+    def _write(self, doc_type: str, new_ids: list):
+        now = _now()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO history (doc_type, order_id, added_at) VALUES (?, ?, ?)",
+                [(doc_type, order_id, now) for order_id in new_ids])
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# =================================================================================================
+# 스냅샷 + JSONL 저널 백엔드
+# =================================================================================================
+
+class JournalHistoryStore(_HistoryIndex):
+    """스냅샷(JSON) + 추가분 저널(JSONL), fsync 묶음 처리와 주기적 압축
+
+    저널 한 줄: {"t": "ledger", "id": "L20260105-001"}
+    프로세스가 죽어도 저널에 쓴(flush 된) 내용은 남고, 전원 장애에는 마지막 fsync 이후 분만 잃음
+    """
+
+    backend = 'journal'
+
+    def __init__(self, snapshot_path, journal_path=None, fsync_interval: float = 1.0, compact_every: int = 1000):
+        super().__init__()
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = Path(journal_path) if journal_path else Path(str(snapshot_path) + '.journal')
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+
+        self.journal_lines = 0
+        self.fsyncs = 0
+        self.compactions = 0
+        self._dirty = False
+
+        for doc_type, ids in read_legacy_json(self.snapshot_path, strict=True).items():
+            self._load(doc_type, ids)
+        self._replay_journal()
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+
+        self._stop = threading.Event()
+        self._flusher = None
+        if fsync_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_loop, name="HistoryJournalFlusher", daemon=True)
+            self._flusher.start()
+
+    def _replay_journal(self):
+        """저널을 메모리에 반영 (쓰다 만 마지막 줄 등 읽을 수 없는 줄은 건너뜀)
+
+        읽을 수 없는 줄이 있으면 읽은 줄만으로 저널을 다시 씀 (임시 파일 → 교체)
+        그대로 두면 다음 추가가 쓰다 만 줄 뒤에 이어 붙어 그 줄까지 읽을 수 없게 됨
+        """
+        if not self.journal_path.exists():
+            return
+        good_lines = []
+        bad_lines = 0
+        with open(self.journal_path, 'rb') as f:
+            for raw in f:
+                try:
+                    if not raw.endswith(b'\n'):
+                        raise ValueError("쓰다 만 줄")
+                    entry = json.loads(raw.decode('utf-8'))
+                    self._load(entry["t"], (str(entry["id"]),))
+                except (ValueError, KeyError, TypeError):
+                    bad_lines += 1
+                    continue
+                good_lines.append(raw)
+                self.journal_lines += 1
+        if bad_lines:
+            print(f"[History] 저널에서 읽을 수 없는 줄 {bad_lines}개를 버리고 다시 씀: {self.journal_path}")
+            tmp_path = self.journal_path.with_name(self.journal_path.name + '.tmp')
+            with open(tmp_path, 'wb') as f:
+                f.writelines(good_lines)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.journal_path)
+
+    def _write(self, doc_type: str, new_ids: list):
+        self._journal.write(''.join(
+            json.dumps({"t": doc_type, "id": order_id}, ensure_ascii=False) + '\n' for order_id in new_ids))
+        self._journal.flush()
+        self.journal_lines += len(new_ids)
+        self._dirty = True
+        if self.fsync_interval <= 0:
+            self._fsync()
+
+    def _fsync(self):
+        if self._dirty:
+            os.fsync(self._journal.fileno())
+            self._dirty = False
+            self.fsyncs += 1
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.fsync_interval):
+            try:
+                self.flush()
+                if self.journal_lines >= self.compact_every:
+                    self.compact()
+            except OSError as e:
+                print(f"[History] 저널 기록 실패: {e}")
+
+    def flush(self):
+        """마지막 fsync 이후 추가분을 디스크에 확정"""
+        with self._lock:
+            self._fsync()
+
+    def compact(self):
+        """현재 이력을 스냅샷으로 쓰고 (임시 파일 → 교체) 저널을 비움
+
+        교체 후 저널을 비우기 전에 죽어도 다시 읽을 때 중복은 무시되므로 안전
+        """
+        with self._lock:
+            write_json_atomic(self.snapshot_path, {doc_type: list(ids) for doc_type, ids in self._ids.items()})
+
+            self._journal.close()
+            self._journal = open(self.journal_path, 'w', encoding='utf-8')
+            self.journal_lines = 0
+            self._dirty = False
+            self.compactions += 1
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats.update({
+            "journal_lines": self.journal_lines,
+            "fsyncs": self.fsyncs,
+            "compactions": self.compactions,
+        })
+        return stats
+
+    def close(self):
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        if self.journal_lines:
+            self.compact()
+        with self._lock:
+            self._fsync()
+            self._journal.close()
+
+
+# =================================================================================================
+# 그룹 커밋 JSON 백엔드
+# =================================================================================================
+
+class GroupCommitter:
+    """동시에 들어온 커밋 요청을 모아 commit_fn 한 번으로 처리 (리더/팔로워)
+
+    처음 도착한 스레드가 리더가 되어 window 초 동안 다른 요청을 기다린 뒤 commit_fn 실행,
+    그동안 도착한 스레드는 같은 커밋이 끝날 때까지 대기
+    commit_fn 이 실패하면 리더는 예외를 받고, 대기 중인 스레드 중 하나가 다시 커밋을 시도
+    """
+
+    def __init__(self, commit_fn, window: float = 0.05):
+        self.commit_fn = commit_fn
+        self.window = window
+        self._cond = threading.Condition()
+        self._requested = 0     # 요청 번호 (증가만)
+        self._committed = 0     # 이 번호까지 기록 완료
+        self._pending = 0       # 다음 커밋에 들어갈 항목 수
+        self._leader = False
+
+        # 지표
+        self.commits = 0
+        self.entries = 0
+        self.max_batch = 0
+        self.last_batch = 0
+        self.commit_sec_total = 0.0
+        self.commit_sec_max = 0.0
+        self.wait_sec_total = 0.0
+        self.wait_sec_max = 0.0
+        self.waits = 0
+
+    def submit(self, count: int = 1):
+        """요청을 등록하고 그 요청이 포함된 커밋이 끝날 때까지 대기"""
+        start = time.perf_counter()
+        with self._cond:
+            self._requested += 1
+            ticket = self._requested
+            self._pending += count
+            while self._committed < ticket:
+                if self._leader:
+                    self._cond.wait()
+                    continue
+                self._leader = True
+                try:
+                    deadline = time.perf_counter() + self.window
+                    while (remaining := deadline - time.perf_counter()) > 0:
+                        self._cond.wait(remaining)
+                    upto, batch = self._requested, self._pending
+                    self._pending = 0
+
+                    self._cond.release()
+                    commit_start = time.perf_counter()
+                    try:
+                        self.commit_fn()
+                    except Exception:
+                        self._cond.acquire()
+                        # 리더 자신의 항목은 호출자가 되돌리므로 대기 중인 팔로워 몫만 다음 커밋으로
+                        self._pending += batch - count
+                        raise
+                    commit_sec = time.perf_counter() - commit_start
+                    self._cond.acquire()
+
+                    self._committed = upto
+                    self.commits += 1
+                    self.entries += batch
+                    self.last_batch = batch
+                    self.max_batch = max(self.max_batch, batch)
+                    self.commit_sec_total += commit_sec
+                    self.commit_sec_max = max(self.commit_sec_max, commit_sec)
+                finally:
+                    self._leader = False
+                    self._cond.notify_all()
+
+            wait_sec = time.perf_counter() - start
+            self.waits += 1
+            self.wait_sec_total += wait_sec
+            self.wait_sec_max = max(self.wait_sec_max, wait_sec)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "commits": self.commits,
+                "entries": self.entries,
+                "batch_avg": round(self.entries / self.commits, 2) if self.commits else 0,
+                "batch_max": self.max_batch,
+                "batch_last": self.last_batch,
+                "commit_ms_avg": round(self.commit_sec_total / self.commits * 1000, 2) if self.commits else 0,
+                "commit_ms_max": round(self.commit_sec_max * 1000, 2),
+                "wait_ms_avg": round(self.wait_sec_total / self.waits * 1000, 2) if self.waits else 0,
+                "wait_ms_max": round(self.wait_sec_max * 1000, 2),
+            }
+
+
+class JsonHistoryStore(_HistoryIndex):
+    """JSON 스냅샷 하나 (기존 v10_history.json 형식), 커밋 창 단위 그룹 커밋"""
+
+    backend = 'json'
+
+    def __init__(self, path, commit_window: float = 0.05):
+        super().__init__()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        for doc_type, ids in read_legacy_json(self.path, strict=True).items():
+            self._load(doc_type, ids)
+        # 커밋을 기다리는 주문번호 (문서 종류 → {주문번호: 기다리는 호출 수}), 조회에는 보이지 않음
+        self._staged = {}
+        self._committer = GroupCommitter(self._commit, commit_window)
+
+    def add_many(self, doc_type: str, order_ids) -> int:
+        """그룹 커밋에 참여, 파일에 기록된 뒤 메모리에 반영하고 반환 (기록 실패는 호출자에게 예외)"""
+        with self._lock:
+            known = self._ids.setdefault(doc_type, {})
+            new_ids = [order_id for order_id in dict.fromkeys(order_ids) if order_id not in known]
+            staged = self._staged.setdefault(doc_type, {})
+            for order_id in new_ids:
+                staged[order_id] = staged.get(order_id, 0) + 1
+        if not new_ids:
+            return 0
+        committed = False
+        try:
+            self._committer.submit(len(new_ids))
+            committed = True
+        finally:
+            with self._lock:
+                for order_id in new_ids:
+                    if staged[order_id] > 1:
+                        staged[order_id] -= 1
+                    else:
+                        del staged[order_id]
+                if committed:
+                    # 같은 주문번호를 동시에 추가한 경우 먼저 끝난 쪽만 새로 추가한 것으로 셈
+                    new_ids = [order_id for order_id in new_ids if order_id not in known]
+                    known.update(dict.fromkeys(new_ids))
+        return len(new_ids)
+
+    def _commit(self):
+        # 커밋 시점의 전체 이력 + 커밋을 기다리는 주문번호 (창 안에서 들어온 변경이 모두 포함됨)
+        with self._lock:
+            data = {doc_type: list(ids) for doc_type, ids in self._ids.items()}
+            for doc_type, staged in self._staged.items():
+                known = self._ids.get(doc_type, {})
+                data.setdefault(doc_type, []).extend(order_id for order_id in staged if order_id not in known)
+        write_json_atomic(self.path, data)
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats.update(self._committer.stats())
+        return stats
+
+
+def open_history_store(backend: str, db_path=None, json_path=None, fsync_interval: float = 1.0,
+                       compact_every: int = 1000, commit_window: float = 0.05) -> _HistoryIndex:
+    """설정값(HISTORY_BACKEND)에 맞는 이력 저장소 생성"""
+    backend = (backend or 'sqlite').lower()
+    if backend == 'sqlite':
+        return SqliteHistoryStore(db_path, legacy_json_path=json_path)
+    if backend == 'journal':
+        return JournalHistoryStore(json_path, fsync_interval=fsync_interval, compact_every=compact_every)
+    if backend == 'json':
+        return JsonHistoryStore(json_path, commit_window=commit_window)
+    raise ValueError(f"알 수 없는 HISTORY_BACKEND: {backend} (sqlite | journal | json)")
+
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat(timespec='seconds')
@@ -0,0 +1,97 @@
+"""
+다중 키워드 매처 (Aho-Corasick)
+==============================
+품명 문자열 한 번의 순회로 등록된 모든 키워드의 출현 위치를 찾음
+
+- pyahocorasick 이 설치되어 있으면 C 구현 사용
+- 없으면 순수 Python Aho-Corasick 오토마톤으로 대체
+- 겹치는 키워드도 모두 보고 (예: '비방염' 안의 '방염')
+"""
+
+from typing import Dict, Iterable, List
+
+try:
+    import ahocorasick as _ahocorasick
+except ImportError:
+    _ahocorasick = None
+
+
+class KeywordAutomaton:
+    """키워드 집합으로 한 번 빌드하고, scan() 으로 {키워드: [시작 위치, ...]} 반환"""
+
+    def __init__(self, keywords: Iterable[str], use_native: bool = True):
+        self.keywords = sorted(set(k for k in keywords if k))
+        self._native = None
+        if use_native and _ahocorasick is not None:
+            automaton = _ahocorasick.Automaton()
+            for keyword in self.keywords:
+                automaton.add_word(keyword, keyword)
+            automaton.make_automaton()
+            self._native = automaton
+        else:
+            self._build()
+
+    @property
+    def backend(self) -> str:
+        return 'pyahocorasick' if self._native is not None else 'python'
+
+    def _build(self):
+        # goto: 상태별 {문자: 다음 상태}, fail: 실패 링크, out: 상태에서 끝나는 키워드들
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[str]] = [[]]
+        for keyword in self.keywords:
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append(keyword)
+
+        # BFS 로 실패 링크 계산 (루트의 자식은 초기값 0 = 루트로 실패)
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] = out[nxt] + out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def scan(self, text: str) -> Dict[str, List[int]]:
+        """text 를 한 번 순회하며 키워드별 시작 위치 목록 반환 (출현 순서)"""
+        hits: Dict[str, List[int]] = {}
+        if self._native is not None:
+            for end, keyword in self._native.iter(text):
+                start = end - len(keyword) + 1
+                positions = hits.get(keyword)
+                if positions is None:
+                    hits[keyword] = [start]
+                else:
+                    positions.append(start)
+            return hits
+
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for keyword in out[state]:
+                    start = i - len(keyword) + 1
+                    positions = hits.get(keyword)
+                    if positions is None:
+                        hits[keyword] = [start]
+                    else:
+                        positions.append(start)
+        return hits
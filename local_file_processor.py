@@ -1,8 +1,25 @@
 import re
 import os
+import contextlib
 import datetime
-from bs4 import BeautifulSoup
+import mmap
 import quopri
+import time
+from pathlib import Path
+
+import concurrent.futures
+import functools
+import multiprocessing
+
+import code_cache
+import code_rules
+import erp_layout
+import keyword_matcher
+import mhtml_reader
+import parse_cache
+import table_parser
+from config import config
+from code_rules import Rule, WHITESPACE_RE, DIGITS_RE, HANGUL_ONLY_RE
 
 # =================================================================================================
 # 전역 상수 & 매핑 (GAS: COMPANY_MAPPING)
@@ -14,6 +31,74 @@ COMPANY_MAPPING = {
     '예림': {'display': '예림', 'brand': 'y'}
 }
 
+# 코드 생성 규칙 버전 - 전처리/코드 규칙을 바꾸면 올려서 저장된 캐시를 무효화
+CODEGEN_VERSION = "VER12-1"
+
+# (색상, 품명, 규격, 비고, 브랜드, 회사명) → (품목명, 품목코드)
+CODE_CACHE = code_cache.LRUCache(maxsize=code_cache.cache_size_from_env())
+
+# 회사명 탐색 범위 (문서 앞부분 N자, 0 = 전체) - 큰 주문서에서 머리글 영역만 보고 싶을 때
+COMPANY_SCAN_LIMIT = int(os.getenv("COMPANY_SCAN_LIMIT", 0))
+
+# 파싱 결과 캐시 버전 - 파서/회사 감지 로직을 바꾸면 올림 (코드 규칙 버전과 함께 스탬프로 저장)
+# HTML 파서 백엔드도 스탬프에 포함 (깨진 마크업에서 백엔드마다 행이 다르므로 바꾸면 다시 파싱)
+PARSER_VERSION = "P3"
+PARSE_CACHE = parse_cache.ParseCache(
+    config.PARSE_CACHE_DIR,
+    version=f"{PARSER_VERSION}/{CODEGEN_VERSION}/company{COMPANY_SCAN_LIMIT}/{table_parser.resolve_backend()}",
+    enabled=config.PARSE_CACHE_ENABLED,
+)
+
+# 일괄 재처리 병렬 설정 (PARALLEL_WORKERS=0 이면 CPU 수)
+PARALLEL_WORKERS = int(os.getenv("PARALLEL_WORKERS", 0))
+PARALLEL_MIN_FILES = int(os.getenv("PARALLEL_MIN_FILES", 32))
+PARALLEL_CHUNK_SIZE = int(os.getenv("PARALLEL_CHUNK_SIZE", 16))
+
+# 미리 컴파일된 정규식 (행마다 재컴파일/캐시 조회 방지)
+_HANGUL_RE = re.compile(r'[가-힣]')
+_PYEONG_RE = re.compile(r'(\d+)MM평')
+_PYEONG_PLATE_RE = re.compile(r'\d+MM평판?')
+_SIKGI_RE = re.compile(r'\(식기[XO]\)')
+_LEADING_NUMBER_RE = re.compile(r'^(\d+)')
+_FIRST_NUMBER_PATTERNS = {}  # 규격 첫 숫자별 컴파일된 제거 패턴
+_PAIR_PAREN_RE = re.compile(r'\((\d+)\*(\d+)\)')
+_TRIPLE_PAREN_RE = re.compile(r'\((\d+)\*(\d+)\*(\d+)\)')
+_PAIR_RE = re.compile(r'(\d+)\*(\d+)')
+_MM_RE = re.compile(r'(\d+)MM')
+_MM_SPACE_RE = re.compile(r'\d+MM\s*')
+_PAREN_GROUP_RE = re.compile(r'\([^)]*\)')
+_LEADING_NUMBER_SPACE_RE = re.compile(r'^\d+\s*')
+_SPEC_SUFFIX_RE = re.compile(r'\/\s*([A-Za-z]+)')
+_FRAME_PIECE_SPEC_RE = re.compile(r'^\d+\*\/?$')
+_FRAME_PIECE_SPEC2_RE = re.compile(r'^\d+\*\d+\*\/?$')
+
+# 품명 키워드 (classify_target / generate_*_code 가 한 번의 스캔 결과로 판단)
+FRAME_KEYWORDS = ('문틀', '발포', '분리형', '스토퍼')
+DOOR_KEYWORDS = ('문짝', 'ABS', '도어', 'M/D', '민무늬', '탈공', '미서기', '미닫이')
+MOLDING_KEYWORDS = ('몰딩', '평', '코너', '계단', '천정', '천장', '걸레', '문선', '보드', '루버', '루바', '기둥')
+# 도어 모델 접두어 (뒤에 영문대문자/숫자가 와야 함: YS-[A-Z0-9]+ 등)
+DOOR_MODEL_PREFIXES = ('YS-', 'YA-', 'YAT-', 'EZ-', 'LS-', 'YM-', 'YAL-', 'YV-', 'YFL-', 'SW-', 'TD-', 'SL-')
+YEONDONG_KEYWORD = '연동'
+
+# 문틀 상단 플래그 (순서대로 첫 번째 일치)
+UPPER_FLAG_CODES = (('발포', 'B'), ('방염', 'F'), ('비방염', 'N'), ('알루미늄', 'A'))
+# 문틀 하단 플래그 (순서대로 첫 번째 일치)
+LOWER_FLAG_CODES = (
+    (('슬림와이드',), 'I'), (('와이드',), 'W'), (('슬림',), 'S'), (('차음',), 'E'),
+    (('일반형',), 'G'), (('가변형',), 'K'), (('분리형', '스토퍼'), 'D'), (('일체',), 'B'),
+    (('히든',), 'H'), (('스텝',), 'T'), (('무메', '무매'), 'M'), (('미서기', '미닫이'), 'L'),
+)
+MOLDING_FLAG_KEYWORDS = ('천장', '프레임', '기둥', '템바보드', '템바루바')
+RAIL_KEYWORDS = ('레일', '초슬림', '상부', '하부')
+
+ITEM_KEYWORD_AUTOMATON = keyword_matcher.KeywordAutomaton(
+    FRAME_KEYWORDS + DOOR_KEYWORDS + MOLDING_KEYWORDS + DOOR_MODEL_PREFIXES + (YEONDONG_KEYWORD,)
+    + tuple(k for k, _ in UPPER_FLAG_CODES) + tuple(k for ks, _ in LOWER_FLAG_CODES for k in ks)
+    + MOLDING_FLAG_KEYWORDS + RAIL_KEYWORDS
+)
+
+_MODEL_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789')
+
 # =================================================================================================
 # MHTML / HTML 파싱 관련 함수
 # =================================================================================================
@@ -23,8 +108,9 @@ def extract_html_from_mhtml(mhtml_content: str) -> str:
     try:
         # 1. HTML Content 찾기 (단순화된 패턴 매칭)
         # Content-Type: text/html 아래의 빈 줄 다음부터 경계선 전까지
+        # (QP 소프트 줄바꿈 '=' 다음 줄이 '-->' 로 시작하는 경우는 경계선이 아님)
         patterns = [
-            r'Content-Type:\s*text\/html[\s\S]*?\r?\n\r?\n([\s\S]*?)(?=\r?\n--|Content-Type:|$)',
+            r'Content-Type:\s*text\/html[\s\S]*?\r?\n\r?\n([\s\S]*?)(?=(?<![=\r])\n--|(?<!=)\r\n--|Content-Type:|$)',
             r'(<html[\s\S]*?<\/html>)',
             r'(<\!DOCTYPE[\s\S]*?<\/html>)'
         ]
@@ -58,218 +144,253 @@ def extract_html_from_mhtml(mhtml_content: str) -> str:
         print(f"MHTML 추출 오류: {e}")
         return ""
 
-def parse_html_table(html_content: str) -> list:
-    """HTML에서 테이블 데이터 파싱 (GAS: parseHtmlTable + parseTableBody)"""
-    soup = BeautifulSoup(html_content, 'html.parser')
-    all_result_data = []
-    
-    # 1. table.table-item 찾기
-    tables = soup.find_all('table', class_='table-item')
-    
-    if not tables:
-        # 대안: 모든 테이블 검색
-        tables = soup.find_all('table')
-    
-    for table in tables:
-        # 데이터가 있는지 확인 (간단한 체크: td 안에 숫자가 있는지)
-        if not table.find('td'):
-            continue
-            
-        # 헤더 건너뛰기 로직은 row 루프에서 처리
-        rows = table.find_all('tr')
-        if not rows:
-            continue
-            
-        # tbody가 있으면 tbody 우선
-        tbody = table.find('tbody')
-        if tbody:
-            rows = tbody.find_all('tr')
-            
-        for row in rows:
-            # 헤더 체크 (th가 있거나 class가 td-header 등)
-            if row.find('th') or 'td-header' in row.get('class', []):
-                continue
-                
-            cols = row.find_all(['td', 'th'])
-            row_data_raw = []
-            
-            for col in cols:
-                # div가 있으면 div 내용 사용, 아니면 셀 텍스트
-                div = col.find('div')
-                text = div.get_text(strip=True) if div else col.get_text(strip=True)
-                row_data_raw.append(text)
-                
-            # 유효성 검사
-            # 1. 데이터가 하나라도 있어야 함
-            if not any(row_data_raw): 
-                continue
-            # 2. 첫 열이 '합계'가 아니어야 함
-            if row_data_raw and row_data_raw[0] == '합계':
-                continue
-            # 3. 열 개수가 최소 4개 이상 (NO, 색상, 품명, 규격...)
-            if len(row_data_raw) < 4:
-                continue
-            # 4. 첫 열(NO)이 숫자여야 함
-            if row_data_raw[0] and not row_data_raw[0].isdigit():
-                continue
-                
-            # 데이터 매핑 (GAS 로직 참조)
-            # rowDataRaw[1]: 색상
-            # rowDataRaw[2]: 품명
-            # rowDataRaw[3]: 규격
-            # rowDataRaw[4]: 수량
-            # rowDataRaw[5]: 단가
-            # rowDataRaw[6]: 금액
-            # rowDataRaw[7]: 비고
-            
-            color_val = row_data_raw[1] if len(row_data_raw) > 1 else ''
-            item_name = row_data_raw[2] if len(row_data_raw) > 2 else ''
-            spec_val = row_data_raw[3] if len(row_data_raw) > 3 else ''
-            
-            # 품목명 조합 (GAS: productName) - 사실 로직에서는 개별 필드로 처리함
-            # resultData 구조: [NO, 품목명(조합), 색상, 품명, 규격, 수량, 단가, 금액, 비고]
-            
-            new_row = [
-                row_data_raw[0], # NO
-                '',              # 품목명 (나중에 조합)
-                color_val,       # 색상
-                item_name,       # 품명
-                spec_val,        # 규격
-                row_data_raw[4] if len(row_data_raw) > 4 else '', # 수량
-                row_data_raw[5] if len(row_data_raw) > 5 else '', # 단가
-                row_data_raw[6] if len(row_data_raw) > 6 else '', # 금액
-                row_data_raw[7] if len(row_data_raw) > 7 else '', # 비고
-            ]
-            all_result_data.append(new_row)
-            
-    return all_result_data
+def parse_html_table(html_content: str, backend: str = None) -> list:
+    """HTML에서 테이블 데이터 파싱 (GAS: parseHtmlTable + parseTableBody)
+
+    backend: 'auto' | 'lxml' | 'selectolax' | 'stream' | 'bs4' (None이면 HTML_PARSER_BACKEND 설정)
+    """
+    return table_parser.parse_table(html_content, backend=backend)
+
+def iter_html_table_rows(source, stop_after_item_table: bool = True):
+    """DOM 없이 테이블 행을 하나씩 반환 (문자열 또는 열린 파일 객체)
+
+    </tr> 이 닫힐 때마다 parse_html_table 과 같은 9열 행을 반환하며,
+    기본적으로 첫 table.table-item 이 끝나면 나머지 문서는 읽지 않음
+    """
+    return table_parser.iter_table_rows(source, stop_after_item_table=stop_after_item_table)
 
 # =================================================================================================
 # 코드 생성 및 전처리 로직 (GAS 포팅)
 # =================================================================================================
 
-def detect_company(html_content: str, all_data: list) -> dict:
-    """회사명 탐지"""
-    # 1. HTML 내용에서 찾기
-    for keyword, info in COMPANY_MAPPING.items():
-        if keyword in html_content:
+# 회사 키워드 우선순위 = COMPANY_MAPPING 정의 순서
+# (단일 정규식/전방탐색 패턴도 측정했으나 str.__contains__ 키워드별 검색이 큰 페이지에서 1.7배 이상 빠름)
+_COMPANY_KEYWORD_INFOS = tuple(COMPANY_MAPPING.items())
+# should_add_company_prefix 용: 회사 표시명 중 하나라도 포함되는지
+_COMPANY_DISPLAY_RE = re.compile('|'.join(re.escape(d) for d in {info['display'] for info in COMPANY_MAPPING.values()}))
+_DEFAULT_COMPANY = {'display': '예림', 'brand': 'y'}
+
+def _find_company(text: str):
+    """우선순위 순으로 키워드 검색, 처음 찾은 회사 정보 반환"""
+    for keyword, info in _COMPANY_KEYWORD_INFOS:
+        if keyword in text:
             return info
-            
-    # 2. 데이터에서 찾기
+    return None
+
+def detect_company(html_content: str, all_data: list, scan_limit: int = None) -> dict:
+    """회사명 탐지
+
+    scan_limit: HTML 앞부분 몇 자까지만 볼지 (None 이면 COMPANY_SCAN_LIMIT, 0 이면 전체)
+    머리글에서 못 찾으면 기존과 같이 행 데이터(색상/품명)에서 찾음
+    """
+    if scan_limit is None:
+        scan_limit = COMPANY_SCAN_LIMIT
+
+    # 1. HTML 내용에서 찾기 (scan_limit 이 있으면 머리글 영역만)
+    info = _find_company(html_content[:scan_limit] if scan_limit else html_content)
+    if info is not None:
+        return info
+
+    # 2. 데이터에서 찾기 (행 순서대로, 색상/품명)
     for row in all_data:
-        color = str(row[2])
-        item = str(row[3])
-        combined = color + ' ' + item
-        for keyword, info in COMPANY_MAPPING.items():
-            if keyword in combined:
-                return info
-                
-    return {'display': '예림', 'brand': 'y'} # 기본값
+        info = _find_company(str(row[2]) + ' ' + str(row[3]))
+        if info is not None:
+            return info
+
+    return _DEFAULT_COMPANY # 기본값
 
 def should_add_company_prefix(color: str, item_name: str, company_display: str) -> bool:
     if company_display in color or company_display in item_name:
         return False
-        
-    for info in COMPANY_MAPPING.values():
-        if info['display'] in color or info['display'] in item_name:
-            return False
-            
-    return True
 
-def preprocess_color_for_product_name(color: str) -> str:
-    if not color: return ''
-    color_str = str(color).strip()
-    
+    # 어떤 회사 표시명이든 이미 들어 있으면 접두어 생략
+    return not (_COMPANY_DISPLAY_RE.search(color) or _COMPANY_DISPLAY_RE.search(item_name))
+
+def _strip_company_keywords(text: str) -> str:
+    # 회사명 키워드 제거
+    for keyword in COMPANY_MAPPING.keys():
+        text = text.replace(keyword, '').strip()
+    return text
+
+def _group1(match, ctx) -> str:
+    return match.group(1)
+
+# -------------------------------------------------------------------------------------------------
+# 규칙 표 (GAS 우선순위 순서 그대로, code_rules 엔진으로 평가)
+# -------------------------------------------------------------------------------------------------
+
+COLOR_NAME_RULES = code_rules.register(code_rules.RuleSet('color_name', [
     # 1순위: 영림{숫자} + 영문{숫자}
-    if re.search(r'영림\d+\s+[A-Za-z]+\d+', color_str):
-        return re.sub(r'\s+', '', color_str)
-        
+    Rule('영림숫자+영문숫자', r'영림\d+\s+[A-Za-z]+\d+', lambda m, c: WHITESPACE_RE.sub('', c['color']), source='color'),
     # 2순위: 영림{숫자} + 한글
-    match = re.match(r'(영림\d+)\s+[가-힣]', color_str)
-    if match:
-        return match.group(1)
-        
+    Rule('영림숫자+한글', r'(영림\d+)\s+[가-힣]', _group1, source='color', method='match'),
     # 3순위: 영림{숫자}
-    if re.match(r'^영림\d+$', color_str):
-        return color_str
-        
-    # 회사명 키워드 제거
-    for keyword in COMPANY_MAPPING.keys():
-        color_str = color_str.replace(keyword, '').strip()
-        
-    # 4순위: 한글만 -> 공백제거
-    if re.match(r'^[가-힣\s]+$', color_str):
-        return re.sub(r'\s+', '', color_str)
-        
-    return color_str
+    Rule('영림숫자', r'^영림\d+$', lambda m, c: c['color'], source='color', method='match'),
+    # 4순위: (회사명 제거 후) 한글만 -> 공백제거
+    Rule('한글만', HANGUL_ONLY_RE, lambda m, c: WHITESPACE_RE.sub('', c['stripped']), source='stripped', method='match'),
+], default=lambda c: c['stripped']))
+
+SPEC_NAME_RULES = code_rules.register(code_rules.RuleSet('spec_name', [
+    # 끝이 '/'+문자 인 경우 (검색 위치 이후를 치환 - 문자열 끝 고정 패턴이라 re.sub 과 동일)
+    Rule('/N 식기무', r'\/\s*N$', lambda m, c: c['spec'][:m.start()] + '식기무', source='spec', flags=re.IGNORECASE),
+    Rule('/S,Y 식기유', r'\/\s*[SY]$', lambda m, c: c['spec'][:m.start()] + '식기유', source='spec', flags=re.IGNORECASE),
+    Rule('/영문', r'\/\s*([A-Za-z])$', lambda m, c: c['spec'][:m.start()] + m.group(1), source='spec', flags=re.IGNORECASE),
+    Rule('/ 제거', r'\/\s*$', lambda m, c: c['spec'][:m.start()].strip(), source='spec'),
+], default=lambda c: c['spec']))
+
+BRAND_COLOR_RULES = code_rules.register(code_rules.RuleSet('brand_color', [
+    # 1. 영림{숫자}PS{숫자}
+    Rule('영림숫자PS', r'영림(\d+)PS\d+', lambda m, c: c['brand'] + m.group(1), source='color'),
+    # 2. PS...
+    Rule('PS', r'^PS(.+)$', lambda m, c: c['brand'] + 'S' + m.group(1), source='color', method='match'),
+    # 3. PX...
+    Rule('PX', r'^PX(.+)$', lambda m, c: c['brand'] + 'X' + m.group(1), source='color', method='match'),
+    # 4. 영림{숫자}
+    Rule('영림숫자', r'영림(\d+)', lambda m, c: c['brand'] + m.group(1), source='color'),
+    # 5. 한글만
+    Rule('한글만', HANGUL_ONLY_RE, lambda m, c: c['brand'] + WHITESPACE_RE.sub('', c['color'])[:2], source='color', method='match'),
+    # 6. 숫자 포함
+    Rule('숫자', r'(\d+)', lambda m, c: c['brand'] + m.group(1), source='color'),
+]))
+
+def _model_prefix_suffix(match, ctx) -> str:
+    prefix = match.group(1)
+    suffix = match.group(2)
+    hangul_search = _HANGUL_RE.search(suffix)
+    if hangul_search:
+        suffix = suffix[:hangul_search.start()]
+    return prefix + suffix
+
+MODEL_RULES = code_rules.register(code_rules.RuleSet('model', [
+    Rule('영문-모델', r'([A-Z]+)-([A-Z0-9]+)', _model_prefix_suffix, source='item'),
+    Rule('탈공', None, lambda m, c: '탈', when=lambda c: '탈공' in c['item']),
+    Rule('M/D 민무늬', None, lambda m, c: 'MD', when=lambda c: 'M/D' in c['item'] and '민무늬' in c['item']),
+    Rule('~도어', r'(\S+)도어', _group1, source='item'),
+]))
+
+def _pair_code(match, ctx) -> str:
+    num1, num2 = match.groups()
+    if num2 == '9': return num1
+    return num1 + num2
+
+def _pillar_code(match, ctx):
+    match = _TRIPLE_PAREN_RE.search(ctx['spec']) or _TRIPLE_PAREN_RE.search(ctx['item'])
+    if not match: return None
+    num1, num2, num3 = match.groups()
+    if num3 == '9': return num1 + num2
+    return num1 + num2 + num3
+
+def _thickness_code(match, ctx):
+    mm_match = _MM_RE.search(ctx['item'])
+    if not mm_match: return None
+    return mm_match.group(1) + match.group(1)
+
+MOLDING_SPEC_RULES = code_rules.register(code_rules.RuleSet('molding_spec', [
+    Rule('프레임', r'프레임[^\d]*(\d+)', _group1, source='item', when=lambda c: '프레임' in c['item']),
+    Rule('기둥', None, _pillar_code, when=lambda c: '기둥' in c['item']),
+    # 1순위: 규격열 () *패턴
+    Rule('규격(a*b)', _PAIR_PAREN_RE, _pair_code, source='spec'),
+    # 2순위: 품명 () *패턴
+    Rule('품명(a*b)', _PAIR_PAREN_RE, _pair_code, source='item'),
+    # 3순위: 비고열 *패턴
+    Rule('비고a*b', _PAIR_RE, _pair_code, source='remarks'),
+    # 4순위: 품명 (숫자T)
+    Rule('품명(숫자T)', r'\((\d+)T\)', _thickness_code, source='item', flags=re.IGNORECASE),
+    # 5순위: 비고 숫자T
+    Rule('비고숫자T', r'(\d+)T', _thickness_code, source='remarks', flags=re.IGNORECASE),
+    # 6순위: 템바
+    Rule('템바', _PAIR_RE, lambda m, c: m.group(1) + m.group(2), source='item', when=lambda c: '템바' in c['item']),
+    # 7순위: 숫자바/번
+    Rule('숫자바용/번', r'(\d+)(?:바용|번)', _group1, source='item'),
+    # 8순위: MM평판
+    Rule('MM평판', r'(\d+)MM평판?', _group1, source='item'),
+    # 9순위: 단순숫자
+    Rule('단순숫자', r'^(\d+)$', _group1, source='spec'),
+]))
+
+# -------------------------------------------------------------------------------------------------
+
+def preprocess_color_for_product_name(color: str) -> str:
+    if not color: return ''
+    color_str = str(color).strip()
+    return COLOR_NAME_RULES.apply({'color': color_str, 'stripped': _strip_company_keywords(color_str)})
+
+def _first_number_pattern(first_num: str):
+    pattern = _FIRST_NUMBER_PATTERNS.get(first_num)
+    if pattern is None:
+        pattern = re.compile(re.escape(first_num) + r'[가-힣]+')
+        _FIRST_NUMBER_PATTERNS[first_num] = pattern
+    return pattern
 
 def preprocess_item_name_for_product_name(item_name: str, spec: str) -> str:
     item_str = str(item_name).strip()
     
     # VER12: "평+숫자" -> "평숫자" 변환
-    pyeong_match = re.search(r'(\d+)MM평', item_str)
+    pyeong_match = _PYEONG_RE.search(item_str)
     if pyeong_match:
-        item_str = re.sub(r'\d+MM평판?', f"평{pyeong_match.group(1)}", item_str)
+        item_str = _PYEONG_PLATE_RE.sub(f"평{pyeong_match.group(1)}", item_str)
         
     item_str = item_str.replace('문틀', '').strip()
-    item_str = re.sub(r'\(식기[XO]\)', '', item_str).strip()
+    item_str = _SIKGI_RE.sub('', item_str).strip()
     
     # 규격 첫번째 숫자 + 붙어있는 문자 패턴 제거
     spec_str = str(spec).strip()
-    first_number_match = re.match(r'^(\d+)', spec_str)
+    first_number_match = _LEADING_NUMBER_RE.match(spec_str)
     if first_number_match:
-        first_num = first_number_match.group(1)
-        # item_str = re.sub(f"{first_num}[가-힣]+", '', item_str).strip() # Python f-string regex handling careful
-        pattern = re.compile(re.escape(first_num) + r'[가-힣]+')
-        item_str = pattern.sub('', item_str).strip()
+        item_str = _first_number_pattern(first_number_match.group(1)).sub('', item_str).strip()
         
     return item_str
 
 def preprocess_spec_for_product_name(spec: str) -> str:
-    spec_str = str(spec).strip()
-    
-    if re.search(r'\/\s*N$', spec_str, re.IGNORECASE):
-        return re.sub(r'\/\s*N$', '식기무', spec_str, flags=re.IGNORECASE)
-        
-    if re.search(r'\/\s*[SY]$', spec_str, re.IGNORECASE):
-        return re.sub(r'\/\s*[SY]$', '식기유', spec_str, flags=re.IGNORECASE)
-        
-    if re.search(r'\/\s*([A-Za-z])$', spec_str, re.IGNORECASE):
-        return re.sub(r'\/\s*([A-Za-z])$', r'\1', spec_str, flags=re.IGNORECASE) # group check
-        
-    if re.search(r'\/\s*$', spec_str):
-        return re.sub(r'\/\s*$', '', spec_str).strip()
-        
-    return spec_str
+    return SPEC_NAME_RULES.apply({'spec': str(spec).strip()})
 
 def is_valid_spec_size(spec: str) -> bool:
     if not spec: return False
-    numbers = re.findall(r'\d+', str(spec))
+    numbers = DIGITS_RE.findall(str(spec))
     if not numbers: return False
     max_num = max(int(n) for n in numbers)
     return max_num > 999
 
+@functools.lru_cache(maxsize=4096)
+def _item_keyword_hits(item_str: str) -> dict:
+    """품명 1회 스캔 결과 {키워드: [시작 위치]} (캐시 공유 - 수정 금지)"""
+    return ITEM_KEYWORD_AUTOMATON.scan(item_str)
+
+def _has_any(hits: dict, keywords) -> bool:
+    for keyword in keywords:
+        if keyword in hits:
+            return True
+    return False
+
+def _has_door_model(hits: dict, item_str: str) -> bool:
+    # GAS: /YS-[A-Z0-9]+/ 등 12개 패턴
+    for prefix in DOOR_MODEL_PREFIXES:
+        for start in hits.get(prefix, ()):
+            end = start + len(prefix)
+            if end < len(item_str) and item_str[end] in _MODEL_CHARS:
+                return True
+    return False
+
+def _yeondong_number(hits: dict, item_str: str) -> str:
+    # GAS: /(\d+)연동/ 의 첫 번째 일치 숫자
+    for start in hits.get(YEONDONG_KEYWORD, ()):
+        begin = start
+        while begin > 0 and item_str[begin - 1].isdecimal():
+            begin -= 1
+        if begin < start:
+            return item_str[begin:start]
+    return ''
+
 def classify_target(item_name: str) -> str:
     item_str = str(item_name).strip()
+    hits = _item_keyword_hits(item_str)
     
-    frame_keywords = ['문틀', '발포', '분리형', '스토퍼']
-    has_frame = any(kw in item_str for kw in frame_keywords)
-    
-    door_keywords = ['문짝', 'ABS', '도어', 'M/D', '민무늬', '탈공', '미서기', '미닫이']
-    has_door = any(kw in item_str for kw in door_keywords)
-    
-    door_patterns = [
-        r'YS-[A-Z0-9]+', r'YA-[A-Z0-9]+', r'YAT-[A-Z0-9]+', r'EZ-[A-Z0-9]+', 
-        r'LS-[A-Z0-9]+', r'YM-[A-Z0-9]+', r'YAL-[A-Z0-9]+', r'YV-[A-Z0-9]+',
-        r'YFL-[A-Z0-9]+', r'SW-[A-Z0-9]+', r'TD-[A-Z0-9]+', r'SL-[A-Z0-9]+'
-    ]
-    has_door_pattern = any(re.search(pat, item_str) for pat in door_patterns)
-    
-    has_yeondong = bool(re.search(r'\d+연동', item_str))
-    has_rail = '레일' in item_str
-    
-    molding_keywords = ['몰딩', '평', '코너', '계단', '천정', '천장', '걸레', '문선', '보드', '루버', '루바', '기둥']
-    has_molding = any(kw in item_str for kw in molding_keywords)
+    has_frame = _has_any(hits, FRAME_KEYWORDS)
+    has_door = _has_any(hits, DOOR_KEYWORDS)
+    has_door_pattern = _has_door_model(hits, item_str)
+    has_yeondong = bool(_yeondong_number(hits, item_str))
+    has_rail = '레일' in hits
+    has_molding = _has_any(hits, MOLDING_KEYWORDS)
     
     if has_frame: return 'FRAME'
     if has_rail and not has_door and not has_door_pattern: return 'RAIL'
@@ -278,121 +399,70 @@ def classify_target(item_name: str) -> str:
     return 'NONE'
 
 def generate_brand_color_code(color: str, brand_code: str) -> str:
-    color_str = str(color).strip()
-    brand = brand_code
-    
-    for keyword in COMPANY_MAPPING.keys():
-        color_str = color_str.replace(keyword, '').strip()
-        
-    # 1. 영림{숫자}PS{숫자}
-    match = re.search(r'영림(\d+)PS\d+', color_str)
-    if match: return brand + match.group(1)
-    
-    # 2. PS...
-    match = re.match(r'^PS(.+)$', color_str)
-    if match: return brand + 'S' + match.group(1)
-    
-    # 3. PX...
-    match = re.match(r'^PX(.+)$', color_str)
-    if match: return brand + 'X' + match.group(1)
-    
-    # 4. 영림{숫자}
-    match = re.search(r'영림(\d+)', color_str)
-    if match: return brand + match.group(1)
-    
-    # 5. 한글만
-    if re.match(r'^[가-힣\s]+$', color_str):
-        cleaned = re.sub(r'\s+', '', color_str)
-        return brand + cleaned[:2]
-        
-    # 6. 숫자 포함
-    match = re.search(r'(\d+)', color_str)
-    if match: return brand + match.group(1)
-    
-    return ''
+    color_str = _strip_company_keywords(str(color).strip())
+    return BRAND_COLOR_RULES.apply({'color': color_str, 'brand': brand_code})
 
 def generate_flag_code(item_name: str) -> str:
     item_str = str(item_name).strip()
+    hits = _item_keyword_hits(item_str)
+    
     upper_code = ''
-    if '발포' in item_str: upper_code = 'B'
-    elif '방염' in item_str: upper_code = 'F'
-    elif '비방염' in item_str: upper_code = 'N'
-    elif '알루미늄' in item_str: upper_code = 'A'
+    for keyword, code in UPPER_FLAG_CODES:
+        if keyword in hits:
+            upper_code = code
+            break
     
     lower_code = ''
-    if '슬림와이드' in item_str: lower_code = 'I'
-    elif '와이드' in item_str: lower_code = 'W'
-    elif '슬림' in item_str: lower_code = 'S'
-    elif '차음' in item_str: lower_code = 'E'
-    elif '일반형' in item_str: lower_code = 'G'
-    elif '가변형' in item_str: lower_code = 'K'
-    elif '분리형' in item_str or '스토퍼' in item_str: lower_code = 'D'
-    elif '일체' in item_str: lower_code = 'B'
-    elif '히든' in item_str: lower_code = 'H'
-    elif '스텝' in item_str: lower_code = 'T'
-    elif '무메' in item_str or '무매' in item_str: lower_code = 'M'
-    elif '미서기' in item_str or '미닫이' in item_str: lower_code = 'L'
+    for keywords, code in LOWER_FLAG_CODES:
+        if _has_any(hits, keywords):
+            lower_code = code
+            break
     
     if not upper_code and lower_code: upper_code = 'N'
     if not upper_code: return ''
     
-    yeondong_match = re.search(r'(\d+)연동', item_str)
-    if (upper_code in ['F', 'N', 'A']) and yeondong_match:
-        return upper_code + yeondong_match.group(1) + 'C'
+    yeondong_num = _yeondong_number(hits, item_str)
+    if (upper_code in ['F', 'N', 'A']) and yeondong_num:
+        return upper_code + yeondong_num + 'C'
         
     return upper_code + lower_code
 
 def generate_model_code(item_name: str) -> str:
-    item_str = str(item_name).strip()
-    
-    match = re.search(r'([A-Z]+)-([A-Z0-9]+)', item_str)
-    if match:
-        prefix = match.group(1)
-        suffix = match.group(2)
-        hangul_search = re.search(r'[가-힣]', suffix)
-        if hangul_search:
-            suffix = suffix[:hangul_search.start()]
-        return prefix + suffix
-        
-    if '탈공' in item_str: return '탈'
-    if 'M/D' in item_str and '민무늬' in item_str: return 'MD'
-    
-    match = re.search(r'(\S+)도어', item_str)
-    if match: return match.group(1)
-    
-    return ''
+    return MODEL_RULES.apply({'item': str(item_name).strip()})
 
 def generate_rail_code(item_name: str) -> str:
     item_str = str(item_name).strip()
-    match = re.search(r'(\d+)연동', item_str)
-    yeondong_num = match.group(1) if match else ''
+    hits = _item_keyword_hits(item_str)
+    yeondong_num = _yeondong_number(hits, item_str)
     
     if yeondong_num:
         slim_code = ''
-        if '초슬림' in item_str: slim_code = 'SS'
-        elif '슬림' in item_str: slim_code = 'S'
+        if '초슬림' in hits: slim_code = 'SS'
+        elif '슬림' in hits: slim_code = 'S'
         return slim_code + yeondong_num + '레일'
         
     prefix = ''
-    if '초슬림' in item_str: prefix += 'SS'
-    elif '슬림' in item_str: prefix += 'S'
+    if '초슬림' in hits: prefix += 'SS'
+    elif '슬림' in hits: prefix += 'S'
     
-    if '상부' in item_str: prefix += '상'
-    elif '하부' in item_str: prefix += '하'
+    if '상부' in hits: prefix += '상'
+    elif '하부' in hits: prefix += '하'
     
     return prefix + '레일'
 
 def generate_molding_flag_code(item_name: str) -> str:
     item_str = str(item_name).strip()
+    hits = _item_keyword_hits(item_str)
     
-    if '천장' in item_str: return '천장'
-    if '프레임몰딩' in item_str or '프레임' in item_str: return '프레임'
-    if '기둥' in item_str: return '기둥'
+    if '천장' in hits: return '천장'
+    if '프레임' in hits: return '프레임'
+    if '기둥' in hits: return '기둥'
     
-    if '템바보드' in item_str or '템바루바' in item_str:
+    if '템바보드' in hits or '템바루바' in hits:
         code = ''
-        if '방염' in item_str and '비방염' not in item_str: code += 'F'
+        if '방염' in hits and '비방염' not in hits: code += 'F'
         
+        # '형' 제거 후 비교하므로 원문 스캔 결과 대신 문자열 검사
         clean_str = item_str.replace('형', '')
         if '소반달' in clean_str or '소형반달' in clean_str: code += '소반달'
         elif '대반달' in clean_str or '대형반달' in clean_str: code += '대반달'
@@ -400,94 +470,33 @@ def generate_molding_flag_code(item_name: str) -> str:
         elif '직각대' in clean_str or '대형직각' in clean_str: code += '직각대'
         elif '역반달' in clean_str: code += '역반달'
         
-        if '템바보드' in item_str: code += 'TB'
-        elif '템바루바' in item_str: code += 'TL'
+        if '템바보드' in hits: code += 'TB'
+        elif '템바루바' in hits: code += 'TL'
         return code
         
     code = item_str
     code = code.replace('몰딩', '').replace('받이', '').replace('평판', '평').strip()
-    code = re.sub(r'\d+MM\s*', '', code)
-    code = re.sub(r'\([^)]*\)', '', code)
-    code = re.sub(r'^\d+\s*', '', code).strip()
+    code = _MM_SPACE_RE.sub('', code)
+    code = _PAREN_GROUP_RE.sub('', code)
+    code = _LEADING_NUMBER_SPACE_RE.sub('', code).strip()
     
     return code
 
 def generate_molding_spec_code(item_name: str, spec: str, remarks: str) -> str:
-    item_str = str(item_name).strip()
-    spec_str = str(spec).strip()
-    remarks_str = str(remarks).strip()
-    
-    if '프레임몰딩' in item_str or '프레임' in item_str:
-        match = re.search(r'프레임[^\d]*(\d+)', item_str)
-        if match: return match.group(1)
-        
-    if '기둥' in item_str:
-        match = re.search(r'\((\d+)\*(\d+)\*(\d+)\)', spec_str) or re.search(r'\((\d+)\*(\d+)\*(\d+)\)', item_str)
-        if match:
-            num1, num2, num3 = match.groups()
-            if num3 == '9': return num1 + num2
-            return num1 + num2 + num3
-            
-    # 1순위: 규격열 () *패턴
-    match = re.search(r'\((\d+)\*(\d+)\)', spec_str)
-    if match:
-        num1, num2 = match.groups()
-        if num2 == '9': return num1
-        return num1 + num2
-        
-    # 2순위: 품명 () *패턴
-    match = re.search(r'\((\d+)\*(\d+)\)', item_str)
-    if match:
-        num1, num2 = match.groups()
-        if num2 == '9': return num1
-        return num1 + num2
-        
-    # 3순위: 비고열 *패턴
-    match = re.search(r'(\d+)\*(\d+)', remarks_str)
-    if match:
-        num1, num2 = match.groups()
-        if num2 == '9': return num1
-        return num1 + num2
-        
-    # 4순위: 품명 (숫자T)
-    match_t = re.search(r'\((\d+)T\)', item_str, re.IGNORECASE)
-    if match_t:
-        mm_match = re.search(r'(\d+)MM', item_str)
-        if mm_match: return mm_match.group(1) + match_t.group(1)
-        
-    # 5순위: 비고 숫자T
-    match_rem_t = re.search(r'(\d+)T', remarks_str, re.IGNORECASE)
-    if match_rem_t:
-        mm_match = re.search(r'(\d+)MM', item_str)
-        if mm_match: return mm_match.group(1) + match_rem_t.group(1)
-        
-    # 6순위: 템바
-    if '템바' in item_str:
-         match = re.search(r'(\d+)\*(\d+)', item_str)
-         if match: return match.group(1) + match.group(2)
-         
-    # 7순위: 숫자바/번
-    match = re.search(r'(\d+)(?:바용|번)', item_str)
-    if match: return match.group(1)
-    
-    # 8순위: MM평판
-    match = re.search(r'(\d+)MM평판?', item_str)
-    if match: return match.group(1)
-    
-    # 9순위: 단순숫자
-    match = re.search(r'^(\d+)$', spec_str)
-    if match: return match.group(1)
-    
-    return ''
+    return MOLDING_SPEC_RULES.apply({
+        'item': str(item_name).strip(),
+        'spec': str(spec).strip(),
+        'remarks': str(remarks).strip(),
+    })
 
 def generate_spec_code(spec: str) -> str:
     if not spec: return ''
     spec_str = str(spec).strip()
-    numbers = re.findall(r'\d+', spec_str)
+    numbers = DIGITS_RE.findall(spec_str)
     if not numbers: return ''
     
     result = "".join(numbers)
-    match = re.search(r'\/\s*([A-Za-z]+)', spec_str)
+    match = _SPEC_SUFFIX_RE.search(spec_str)
     if match: result += match.group(1).strip()
     return result
 
@@ -505,7 +514,7 @@ def generate_unit(item_name: str, spec: str, remarks: str) -> str:
     if classification == 'RAIL': return '개'
     
     if classification == 'FRAME':
-        if re.search(r'^\d+\*\/?$', spec_str) or re.search(r'^\d+\*\d+\*\/?$', spec_str):
+        if _FRAME_PIECE_SPEC_RE.search(spec_str) or _FRAME_PIECE_SPEC2_RE.search(spec_str):
             return '개'
         return '틀'
         
@@ -547,10 +556,50 @@ def generate_product_code(color: str, item_name: str, spec: str, remarks: str, b
         print(f"코드 생성 오류: {e}")
         return ''
         
+def _build_product_fields(color_raw: str, item_name_raw: str, spec_raw: str, remarks_raw: str,
+                          company_display: str, brand_code: str) -> tuple:
+    # 품목명 생성
+    color_processed = preprocess_color_for_product_name(color_raw)
+    item_name_processed = preprocess_item_name_for_product_name(item_name_raw, spec_raw)
+    spec_processed = preprocess_spec_for_product_name(spec_raw)
+    
+    needs_prefix = should_add_company_prefix(color_processed, item_name_processed, company_display)
+    prefix = company_display if needs_prefix else ''
+    product_name = f"{prefix}{color_processed} {item_name_processed} {spec_processed}".strip()
+    
+    # 코드 생성
+    product_code = generate_product_code(color_raw, item_name_raw, spec_raw, remarks_raw, brand_code)
+    return (product_name, product_code)
+
+def generate_product_fields(color: str, item_name: str, spec: str, remarks: str, company_info: dict) -> tuple:
+    """(품목명, 품목코드) 반환 - 같은 원시 셀 조합은 CODE_CACHE 에서 재사용"""
+    key = (color, item_name, spec, remarks, company_info['brand'], company_info['display'])
+    return CODE_CACHE.get_or_compute(key, lambda: _build_product_fields(
+        color, item_name, spec, remarks, company_info['display'], company_info['brand']))
+
+def load_code_cache(path) -> int:
+    """저장된 코드 캐시 복원 (규칙 버전이 다르면 무시)"""
+    return CODE_CACHE.load(path, CODEGEN_VERSION)
+
+def save_code_cache(path) -> bool:
+    return CODE_CACHE.save(path, CODEGEN_VERSION)
+
 # =================================================================================================
 # 메인 처리 로직
 # =================================================================================================
 
+def _append_erp_rows(erp_rows: list, target_type: str, today: str, product_name: str, product_code: str,
+                     quantity_raw: str, amount_raw: str, remarks_raw: str):
+    """ERP 행 생성 (열 위치는 erp_layout 의 원장 30열 / 견적 22열 레이아웃)"""
+    layout = erp_layout.get_layout(target_type)
+    erp_row = erp_layout.ErpRow(layout, today, product_name, product_code, quantity_raw, amount_raw, remarks_raw)
+
+    if layout is erp_layout.ESTIMATE_LAYOUT:
+        # V7 사용자 요청: 견적서입력 팝업
+        erp_rows.append(erp_row)
+
+    erp_rows.append(erp_row)
+
 def process_html_content(html_content: str, file_path_hint: str = "", target_type: str = 'ledger') -> list:
     """HTML 문자열을 직접 처리하여 ERP 데이터 반환 (In-Memory)"""
     
@@ -565,78 +614,302 @@ def process_html_content(html_content: str, file_path_hint: str = "", target_typ
     print(f"[{file_path_hint}] 회사 감지: {company_info['display']} ({company_info['brand']})")
     
     erp_rows = []
+    today = datetime.datetime.now().strftime('%Y/%m/%d')
     
     for row in raw_data:
-        # row: [NO, 품목명(공백), 색상, 품명, 규격, 수량, 단가, 금액, 비고]
-        color_raw = row[2]
-        item_name_raw = row[3]
-        spec_raw = row[4]
-        quantity_raw = row[5]
-        amount_raw = row[7] # Index 7 is Amount
-        remarks_raw = row[8]
-        
-        # 품목명 생성
-        color_processed = preprocess_color_for_product_name(color_raw)
-        item_name_processed = preprocess_item_name_for_product_name(item_name_raw, spec_raw)
-        spec_processed = preprocess_spec_for_product_name(spec_raw)
-        
-        needs_prefix = should_add_company_prefix(color_processed, item_name_processed, company_info['display'])
-        prefix = company_info['display'] if needs_prefix else ''
-        product_name = f"{prefix}{color_processed} {item_name_processed} {spec_processed}".strip()
+        # row: OrderLine(NO, 품목명(공백), 색상, 품명, 규격, 수량, 단가, 금액, 비고)
+        color_raw = row.color
+        item_name_raw = row.item
+        spec_raw = row.spec
+        quantity_raw = row.quantity
+        amount_raw = row.amount
+        remarks_raw = row.remarks
         
-        # 코드 생성
-        product_code = generate_product_code(color_raw, item_name_raw, spec_raw, remarks_raw, company_info['brand'])
+        # 품목명 / 품목코드 생성 (반복 행은 캐시 사용)
+        product_name, product_code = generate_product_fields(
+            color_raw, item_name_raw, spec_raw, remarks_raw, company_info)
         
-        # ERP 행 생성 (최근 업로드 엔진은 탭 구분을 선호하므로 충분한 열 확보)
-        erp_row = [''] * 30
-        today = datetime.datetime.now().strftime('%Y/%m/%d')
-        
-        if target_type == 'estimate':
-            # V7 사용자 요청: 견적서입력 팝업
-            # 실제 엑셀 양식: 22열 (A~V)
-            # A열(0): 순번, B열(1): 거래처코드, C열(2): 거래처명, D열(3): 일자
-            # E열(4): 출하창고, F열(5): 전표담당자, G열(6): 거래처담당팀, H열(7): 거래처연락처
-            # I열(8): 거래유형, J열(9): 결제조건, K열(10): 견적유효기간, L열(11): 내부용기밀
-            # M열(12): 수령고객정보, N열(13): NO., O열(14): 품목코드, P열(15): 품목명
-            # Q열(16): 수량, R열(17): 단가, S열(18): 공급가액, T열(19): 부가세
-            # U열(20): 합계, V열(21): 비고
-            erp_row = [''] * 22  # ← 22열로 변경!
-            erp_row[3] = today           # 일자 (D)
-            erp_row[14] = product_code   # 품목코드 (O)
-            erp_row[15] = product_name   # 품목명 (P)
-            erp_row[16] = quantity_raw   # 수량 (Q)
-            erp_rows.append(erp_row)
-        else:
-            # 기본 구매입력 (Ledger) 레이아웃
-            erp_row[0] = today          # 날짜
-            erp_row[6] = '100'          # 100
-            erp_row[16] = product_name  # 품목명 (Q) - 기존 V6 기준
-            erp_row[17] = product_code  # 품목코드 (R)
-            erp_row[18] = quantity_raw  # 수량 (S)
-            erp_row[19] = amount_raw    # 공급가액 (T)
-            erp_row[29] = remarks_raw   # 비고 (AD)
-        
-        erp_rows.append(erp_row)
+        _append_erp_rows(erp_rows, target_type, today, product_name, product_code,
+                         quantity_raw, amount_raw, remarks_raw)
         
     return erp_rows
 
+def decode_order_bytes(data, file_path: str) -> str:
+    """주문서 파일 바이트(bytes 또는 mmap)를 HTML 문자열로 변환 (MHTML이면 HTML 부분 추출)"""
+    # MHTML인 경우: 바이트 오프셋으로 text/html 파트를 찾아 그 구간만 디코딩
+    if file_path.lower().endswith('.mhtml') or file_path.lower().endswith('.mht'):
+        html_content = mhtml_reader.extract_html(data)
+        if html_content is not None:
+            return _normalize_newlines(html_content)
+        # MIME 구조가 아닌 파일은 기존 정규식 방식
+        return extract_html_from_mhtml(_normalize_newlines(str(data, 'utf-8', 'replace')))
+
+    # 텍스트 모드 open() 과 같은 결과 (UTF-8, 줄바꿈 통일)
+    return _normalize_newlines(str(data, 'utf-8', 'replace'))
+
+def _normalize_newlines(text: str) -> str:
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+@contextlib.contextmanager
+def _mapped_file(file_path: str):
+    """파일을 읽기 전용 mmap 으로 열기 (빈 파일 등 mmap 불가 시 bytes)
+
+    이미지가 포함된 수십 MB MHTML 도 전체를 메모리로 복사하지 않고
+    필요한 구간(헤더, text/html 파트)만 페이지 단위로 읽음
+    """
+    with open(file_path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            yield f.read()
+            return
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+def read_order_html(file_path: str) -> str:
+    """저장된 주문서 파일을 읽어 HTML 반환 (MHTML이면 HTML 부분 추출)"""
+    file_path = str(file_path)
+    with _mapped_file(file_path) as data:
+        return decode_order_bytes(data, file_path)
+
+def parse_order_file(file_path: str) -> tuple:
+    """주문서 파일 파싱 → (원본 행 목록, 회사 정보)
+
+    파일 바이트의 SHA-256 으로 PARSE_CACHE 를 먼저 조회하고,
+    처음 보는 파일만 실제로 파싱한 뒤 결과를 저장
+    """
+    file_path = str(file_path)
+    is_mhtml = file_path.lower().endswith(('.mhtml', '.mht'))
+    with _mapped_file(file_path) as data:
+        # 같은 바이트라도 HTML/MHTML 로 다르게 해석되므로 형식을 키에 포함
+        key = parse_cache.content_hash(data, b'\0mhtml' if is_mhtml else b'\0html')
+
+        cached = PARSE_CACHE.get(key)
+        if cached is not None:
+            return [table_parser.OrderLine(*row) for row in cached["rows"]], cached["company"]
+
+        html_content = decode_order_bytes(data, file_path)
+
+    raw_data = parse_html_table(html_content)
+    company_info = detect_company(html_content, raw_data) if raw_data else None
+    PARSE_CACHE.put(key, {"rows": raw_data, "company": company_info})
+    return raw_data, company_info
+
 def process_html_file(file_path: str, target_type: str = 'ledger') -> list:
     """단일 HTML 파일을 처리하여 ERP 업로드용 데이터 반환"""
     print(f"처리 중: {file_path} ({target_type})")
-    
-    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-        content = f.read()
-        
-    # MHTML인 경우
-    if file_path.lower().endswith('.mhtml') or file_path.lower().endswith('.mht'):
-        html_content = extract_html_from_mhtml(content)
-    else:
-        html_content = content
-        
+    html_content = read_order_html(file_path)
     return process_html_content(html_content, file_path_hint=os.path.basename(file_path), target_type=target_type)
 
+def process_many(paths: list, target_type: str = 'ledger') -> dict:
+    """여러 주문서 파일을 한 번에 처리 (일괄 업로드용)
+
+    1. 모든 파일을 파싱하고 파일별 회사 감지 (내용이 같은 파일은 PARSE_CACHE 결과 사용)
+    2. 전체 행을 열(column) 단위 배치로 모아, 고유한 (색상, 품명, 규격, 비고, 회사) 조합만
+       품목명/품목코드 생성
+    3. 파일별 ERP 행과 전체를 이어 붙인 ERP 행 블록 반환
+
+    Returns:
+        {
+            "files": [{"path", "order_id", "company", "row_count", "erp_rows", "error"}, ...],
+            "erp_rows": 모든 파일의 ERP 행 (파일 순서대로),
+            "row_count": 원본 행 수,
+            "unique_count": 실제로 코드 생성을 수행한 고유 조합 수,
+        }
+    """
+    today = datetime.datetime.now().strftime('%Y/%m/%d')
+    files = []
+
+    # 열 단위 배치 (row_file 로 원래 파일을 추적)
+    row_file, colors, items, specs, remarks, quantities, amounts = [], [], [], [], [], [], []
+    companies = []
+
+    # 1. 파싱 + 회사 감지 (파일별)
+    for path in paths:
+        path = str(path)
+        result = {
+            "path": path,
+            "order_id": os.path.splitext(os.path.basename(path))[0],
+            "company": None,
+            "row_count": 0,
+            "erp_rows": [],
+            "error": None,
+        }
+        files.append(result)
+        try:
+            raw_data, company_info = parse_order_file(path)
+        except Exception as e:
+            result["error"] = str(e)
+            continue
+        if not raw_data:
+            continue
+
+        result["company"] = company_info
+        result["row_count"] = len(raw_data)
+        file_index = len(files) - 1
+        for row in raw_data:
+            row_file.append(file_index)
+            colors.append(row.color)
+            items.append(row.item)
+            specs.append(row.spec)
+            quantities.append(row.quantity)
+            amounts.append(row.amount)
+            remarks.append(row.remarks)
+            companies.append(company_info)
+
+    # 2. 고유 조합만 코드 생성
+    keys = [
+        (color, item, spec, remark, company['brand'], company['display'])
+        for color, item, spec, remark, company in zip(colors, items, specs, remarks, companies)
+    ]
+    fields = {}
+    for key, company in zip(keys, companies):
+        if key not in fields:
+            fields[key] = generate_product_fields(key[0], key[1], key[2], key[3], company)
+
+    # 3. 파일별 ERP 행 조립
+    for i, key in enumerate(keys):
+        product_name, product_code = fields[key]
+        _append_erp_rows(files[row_file[i]]["erp_rows"], target_type, today, product_name, product_code,
+                         quantities[i], amounts[i], remarks[i])
+
+    erp_rows = []
+    for result in files:
+        erp_rows.extend(result["erp_rows"])
+
+    return {
+        "files": files,
+        "erp_rows": erp_rows,
+        "row_count": len(keys),
+        "unique_count": len(fields),
+    }
+
+def _init_worker(parse_cache_dir: str, parse_cache_enabled: bool, code_cache_size: int):
+    """워커 프로세스 초기화: 부모 프로세스(서버/CLI)의 캐시 설정을 그대로 적용"""
+    PARSE_CACHE.directory = Path(parse_cache_dir)
+    PARSE_CACHE.enabled = parse_cache_enabled
+    CODE_CACHE.maxsize = code_cache_size
+
+def _process_chunk(args) -> dict:
+    """워커 프로세스 진입점 (pickle 가능하도록 모듈 최상위 함수)"""
+    paths, target_type = args
+    return process_many(paths, target_type=target_type)
+
+def process_many_parallel(paths: list, target_type: str = 'ledger', workers: int = None,
+                          chunk_size: int = PARALLEL_CHUNK_SIZE, progress=None) -> dict:
+    """process_many 를 프로세스 풀로 분산 실행 (지난 주문서 일괄 재처리용)
+
+    - 파일을 chunk_size 개씩 묶어 제출하고, 결과는 입력 순서대로 합침
+    - 파일 수가 PARALLEL_MIN_FILES 미만이거나 workers <= 1 이면 직렬 처리
+    - 프로세스 풀을 만들 수 없는 환경이면 직렬 처리로 대체
+    - progress(done, total, elapsed_sec) 콜백으로 진행률/처리량 보고
+
+    Returns:
+        process_many 와 같은 형식 (+ "workers", "elapsed_sec")
+    """
+    paths = [str(p) for p in paths]
+    total = len(paths)
+    if workers is None:
+        workers = PARALLEL_WORKERS or os.cpu_count() or 1
+    chunk_size = max(1, chunk_size)
+    start = time.perf_counter()
+
+    def run_serial() -> dict:
+        result = process_many(paths, target_type=target_type)
+        result["workers"] = 1
+        result["elapsed_sec"] = round(time.perf_counter() - start, 3)
+        if progress:
+            progress(total, total, result["elapsed_sec"])
+        return result
+
+    if workers <= 1 or total < PARALLEL_MIN_FILES:
+        return run_serial()
+
+    chunks = [paths[i:i + chunk_size] for i in range(0, total, chunk_size)]
+    workers = min(workers, len(chunks))
+    try:
+        # spawn: 서버의 업로드 스레드가 잡고 있던 잠금이 fork 로 복제되어 워커가 멈추는 것 방지
+        # (워커는 __main__ 을 다시 import 하므로 실행 스크립트는 import 시 부작용이 없어야 함)
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker,
+            initargs=(str(PARSE_CACHE.directory), PARSE_CACHE.enabled, CODE_CACHE.maxsize))
+    except (OSError, NotImplementedError, ImportError):
+        return run_serial()
+
+    merged = {"files": [], "erp_rows": [], "row_count": 0, "unique_count": 0}
+    done = 0
+    with executor:
+        futures = [executor.submit(_process_chunk, (chunk, target_type)) for chunk in chunks]
+        # 제출 순서대로 결과를 받아 입력 순서 유지
+        for chunk, future in zip(chunks, futures):
+            part = future.result()
+            merged["files"].extend(part["files"])
+            merged["erp_rows"].extend(part["erp_rows"])
+            merged["row_count"] += part["row_count"]
+            merged["unique_count"] += part["unique_count"]  # 청크별 고유 조합 수의 합
+            done += len(chunk)
+            if progress:
+                progress(done, total, time.perf_counter() - start)
+
+    merged["workers"] = workers
+    merged["elapsed_sec"] = round(time.perf_counter() - start, 3)
+    return merged
+
+def _print_progress(done: int, total: int, elapsed: float):
+    rate = done / elapsed if elapsed > 0 else 0.0
+    end = '\n' if done >= total else ''
+    print(f"\r[진행] {done}/{total} 파일 ({rate:,.1f} files/s, {elapsed:.1f}s)", end=end, flush=True)
+
+def main(argv=None) -> int:
+    """저장된 주문서 일괄 재처리 CLI
+
+    사용법:
+        python local_file_processor.py "data/downloads/ledger/*.html" --type ledger --workers 8
+        python local_file_processor.py "data/downloads/estimate/*" --type estimate -o estimate.tsv
+    """
+    import argparse
+    import glob
+
+    parser = argparse.ArgumentParser(description="저장된 주문서 HTML/MHTML 일괄 재처리")
+    parser.add_argument("patterns", nargs="+", help="주문서 파일 경로 또는 glob 패턴")
+    parser.add_argument("--type", dest="target_type", choices=["ledger", "estimate"], default="ledger",
+                        help="ERP 양식 (ledger=원장 30열, estimate=견적 22열)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="워커 프로세스 수 (기본: PARALLEL_WORKERS 또는 CPU 수, 1=직렬)")
+    parser.add_argument("--chunk-size", type=int, default=PARALLEL_CHUNK_SIZE, help="워커당 한 번에 넘기는 파일 수")
+    parser.add_argument("-o", "--output", help="ERP 행을 TSV 로 저장할 경로")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for pattern in args.patterns:
+        matched = sorted(glob.glob(pattern))
+        paths.extend(matched if matched else [pattern])
+    if not paths:
+        print("처리할 파일이 없습니다.")
+        return 1
+
+    result = process_many_parallel(paths, target_type=args.target_type, workers=args.workers,
+                                   chunk_size=args.chunk_size, progress=_print_progress)
+
+    failed = [f for f in result["files"] if f["error"]]
+    for f in failed:
+        print(f"❌ {f['path']}: {f['error']}")
+
+    elapsed = result["elapsed_sec"]
+    print(f"파일 {len(paths)}개 (실패 {len(failed)}), 원본 행 {result['row_count']:,}개, "
+          f"ERP 행 {len(result['erp_rows']):,}개")
+    print(f"워커 {result['workers']}개, {elapsed:.2f}s "
+          f"({len(paths) / elapsed if elapsed else 0:,.1f} files/s)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8', newline='') as f:
+            for row in result["erp_rows"]:
+                f.write(erp_layout.format_tsv_row(row) + '\n')
+        print(f"저장: {args.output}")
+    return 1 if failed else 0
+
 if __name__ == "__main__":
-    # 테스트용
     import sys
-    # test processing logic
-    pass
+    sys.exit(main())
@@ -0,0 +1,856 @@
+"""
+락 저장소 백엔드 (Lock Backends)
+================================
+DistributedLockManager 아래에서 실제 락 레코드를 읽고 쓰는 저장소 (LOCK_BACKEND)
+
+- sheets : Google Sheets processing_lock 시트 (여러 매장/PC, 인터넷 지연)
+           order_id → 행 번호 로컬 캐시 (TTL 이 지나면 추가된 행만, 주기적으로 전체 다시 읽기)
+- sqlite : 공유 디스크의 SQLite 파일 (한 매장 안의 PC들, 밀리초 단위 지연)
+           락 판단과 기록을 BEGIN IMMEDIATE 트랜잭션 하나로 처리
+           네트워크 공유 폴더에서는 WAL(공유 메모리)을 쓸 수 없으므로 기본 저널 모드(DELETE) 사용
+- memory : 프로세스 안의 가짜 시트 (MemoryWorksheet) + sheets 백엔드 로직
+           오프라인 테스트/벤치마크용, latency 로 API 왕복 지연을 흉내 낼 수 있음
+
+공통:
+- 레코드는 LOCK_COLUMNS 순서의 리스트 (시트 행과 같은 모양)
+- 락을 가져가도 되는지는 호출자(DistributedLockManager)가 is_available(order_id, row) 로 판단
+- version: 행을 쓸 때마다 1씩 증가, token: 락을 획득할 때의 version (펜싱 토큰, 주문별로 단조 증가)
+  해제/업로드 시 행의 token(과 machine_id)이 자기 것과 다르면 그 사이 다른 PC가 다시 가져간 것 → StaleLockError
+- expires_at: 락 기한 (UTC epoch 초), 획득/갱신한 PC가 자기 시각 + 기한으로 기록
+  PC마다 다른 시간대/현지 시각 문자열을 비교하지 않고, 다른 PC가 가져갈 때는 시계 오차 여유를 더해 판단 (호출자)
+  (sqlite 의 julianday('now') 도 파일 서버가 아니라 각 PC에서 계산되므로 저장소 시계는 따로 없음)
+- 기한 갱신(renew): 잡고 있는 처리 중 락들의 locked_at/expires_at 을 한 번에 바꿈 (token 은 그대로, version 만 증가)
+  → 짧은 기한(LOCK_TIMEOUT_SEC)을 쓰면서 오래 걸리는 처리도 유지, 죽은 PC의 락은 기한이 지나면 바로 풀림
+- 저장소 오류는 예외로 올려 보냄 (로그/에러 기록은 DistributedLockManager 가 담당)
+
+sheets/memory 의 획득 (Compare-and-Set, 시트에는 원자적 연산이 없으므로 낙관적 방식):
+1. 행을 읽고 (version v) 판단
+2. locked_by/locked_at/status + version=v+1, token=v+1, expires_at 을 한 번의 호출로 기록 (새 주문은 행 추가)
+3. settle 초 기다린 뒤 시트를 다시 읽어, 그 주문의 첫 번째 행이 자기 기록(machine_id + locked_at + version)
+   그대로인 경우만 획득 성공 → 같은 순간 읽고 쓴 PC 중 마지막으로 쓴 PC(새 행이면 먼저 추가된 행) 하나만 남음
+   (settle 이 다른 PC의 읽기→쓰기 간격보다 길어야 함, 진 PC가 추가한 중복 행은 failed 로 표시)
+"""
+
+import datetime
+import random
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from logging_config import logger
+from error_handler import error_handler, ErrorSeverity
+
+LOCK_COLUMNS = ["order_id", "locked_by", "locked_at", "status", "machine_id", "notes", "version", "token",
+                "expires_at"]
+_LAST_COL = "I"
+
+STATUS_PROCESSING = "processing"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat()
+
+
+def _epoch_cell(expires_at: float) -> str:
+    # 시트에는 문자열로 기록 (숫자 서식으로 반올림/지수 표기되지 않도록)
+    return f"{expires_at:.3f}" if expires_at else ""
+
+
+def _cell(row: list, index: int) -> str:
+    return row[index] if len(row) > index and row[index] is not None else ""
+
+
+def as_int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def as_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class StaleLockError(Exception):
+    """펜싱 토큰이 현재 행의 토큰과 다름 (그 사이 다른 PC가 락을 다시 가져감)"""
+
+    def __init__(self, order_id: str, token: int, current_token: int, current_owner: str):
+        super().__init__(f"stale fencing token for {order_id}: {token} (current {current_token} by {current_owner})")
+        self.order_id = order_id
+        self.token = token
+        self.current_token = current_token
+        self.current_owner = current_owner
+
+
+def check_token(order_id: str, row: list, machine_id: str, token: int):
+    """row 의 펜싱 토큰/소유 PC가 (machine_id, token) 과 같지 않으면 StaleLockError"""
+    current_token, current_owner = as_int(_cell(row, 7)), _cell(row, 4)
+    if current_token != token or current_owner != machine_id:
+        raise StaleLockError(order_id, token, current_token, current_owner)
+
+
+class LockBackend:
+    """락 저장소 인터페이스"""
+
+    name = "base"
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name}>"
+
+    @property
+    def connected(self) -> bool:
+        return True
+
+    def connect(self) -> bool:
+        return True
+
+    def acquire(self, order_id: str, machine_id: str, notes: str, is_available: Callable,
+                expires_at: float = 0.0) -> Optional[int]:
+        """
+        락 하나 획득 (기존 레코드가 있으면 is_available 이 True 일 때만), 펜싱 토큰 반환 (실패 시 None)
+
+        expires_at: 기록할 락 기한 (UTC epoch 초)
+        """
+        return self.acquire_many([order_id], machine_id, notes, is_available, expires_at).get(order_id)
+
+    def acquire_many(self, order_ids: List[str], machine_id: str, notes: str, is_available: Callable,
+                     expires_at: float = 0.0) -> dict:
+        """여러 락을 한 번에 획득, {획득한 order_id: 펜싱 토큰} 반환"""
+        raise NotImplementedError
+
+    def release(self, order_id: str, status: str, notes: str = "", machine_id: str = None,
+                token: int = None) -> bool:
+        """
+        상태 변경 + 메모 덧붙이기 (레코드가 없으면 False)
+
+        token 을 주면 행의 token/machine_id 가 같을 때만 (다르면 StaleLockError)
+        """
+        raise NotImplementedError
+
+    def renew(self, tokens: dict, machine_id: str, expires_at: float = 0.0) -> dict:
+        """
+        {order_id: 펜싱 토큰} 락들의 기한 갱신 (locked_at = 지금, expires_at, 한 번의 쓰기)
+
+        행의 token/machine_id 가 같고 아직 processing 인 것만, 갱신한 {order_id: 토큰} 반환
+        """
+        raise NotImplementedError
+
+    def get(self, order_id: str) -> Optional[list]:
+        """레코드 조회 (캐시가 있으면 캐시에서)"""
+        raise NotImplementedError
+
+    def read(self, order_id: str) -> Optional[list]:
+        """레코드를 저장소에서 직접 조회 (펜싱 토큰 확인용)"""
+        return self.get(order_id)
+
+    def get_all(self) -> List[list]:
+        raise NotImplementedError
+
+    def cleanup(self, should_delete: Callable) -> int:
+        """should_delete(row) 가 True 인 레코드 삭제, 삭제 수 반환"""
+        raise NotImplementedError
+
+    def invalidate_cache(self, full: bool = False):
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+    def close(self):
+        pass
+
+
+# ============================================================
+# Google Sheets
+# ============================================================
+class SheetsLockBackend(LockBackend):
+    """Google Sheets 락 시트 (worksheet 를 주면 그 객체를 그대로 사용)"""
+
+    name = "sheets"
+
+    def __init__(self, spreadsheet_id: str = None, sheet_name: str = "processing_lock", worksheet=None,
+                 credentials_path: Path = None, token_path: Path = None,
+                 cache_ttl: float = 5.0, cache_full_refresh: float = 60.0, settle: float = 1.0):
+        self.spreadsheet_id = spreadsheet_id
+        self.settle = settle  # 기록 후 확인 읽기까지 대기 (초)
+        self.sheet_name = sheet_name
+        self.credentials_path = credentials_path
+        self.token_path = token_path
+        self.spreadsheet = None
+        self.lock_worksheet = worksheet
+
+        # 락 시트 로컬 캐시 (find() 가 매번 시트 전체를 훑는 것을 피함)
+        self.cache_ttl = cache_ttl
+        self.cache_full_refresh = cache_full_refresh
+        self._cache_lock = threading.RLock()
+        self._row_index = {}        # order_id → 행 번호 (같은 주문이 여러 행이면 첫 번째, find() 와 동일)
+        self._row_data = {}         # 행 번호 → 행 데이터
+        self._cache_rows = 0        # 캐시가 아는 마지막 행 번호 (헤더 포함)
+        self._cache_full_at = None  # 마지막 전체 읽기 (time.monotonic)
+        self._cache_checked_at = None
+        self._cache_counters = {"hits": 0, "misses": 0, "full_refreshes": 0, "tail_refreshes": 0,
+                                "invalidations": 0}
+
+    @property
+    def connected(self) -> bool:
+        return self.lock_worksheet is not None
+
+    def _get_google_credentials(self):
+        """OAuth 인증으로 Google 자격증명 획득"""
+        try:
+            import pickle
+            from google.auth.transport.requests import Request
+            from google_auth_oauthlib.flow import InstalledAppFlow
+
+            SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+            creds = None
+
+            # 저장된 토큰이 있으면 로드
+            if self.token_path.exists():
+                with open(self.token_path, 'rb') as token:
+                    creds = pickle.load(token)
+
+            # 토큰이 없거나 만료된 경우
+            if not creds or not creds.valid:
+                if creds and creds.expired and creds.refresh_token:
+                    logger.info("Refreshing Google token...")
+                    creds.refresh(Request())
+                else:
+                    if not self.credentials_path.exists():
+                        logger.error(f"credentials.json not found: {self.credentials_path}")
+                        return None
+
+                    logger.info("Starting Google OAuth flow...")
+                    flow = InstalledAppFlow.from_client_secrets_file(
+                        str(self.credentials_path), SCOPES)
+                    creds = flow.run_local_server(port=0)
+
+                # 토큰 저장
+                with open(self.token_path, 'wb') as token:
+                    pickle.dump(creds, token)
+                logger.info("Google token saved")
+
+            return creds
+        except Exception as e:
+            error_handler.log_error(
+                "Failed to get Google credentials",
+                ErrorSeverity.HIGH,
+                {"error": str(e)}
+            )
+            return None
+
+    def connect(self) -> bool:
+        """Google Sheets에 연결 및 락 시트 초기화"""
+        if self.lock_worksheet is not None:
+            return True
+
+        logger.info(f"Connecting to Google Sheets (Spreadsheet ID: {self.spreadsheet_id})")
+
+        creds = self._get_google_credentials()
+        if not creds:
+            return False
+
+        import gspread
+        gc = gspread.authorize(creds)
+        self.spreadsheet = gc.open_by_key(self.spreadsheet_id)
+
+        # 락 시트 생성 또는 가져오기
+        try:
+            worksheet = self.spreadsheet.worksheet(self.sheet_name)
+            logger.info(f"Lock sheet '{self.sheet_name}' found")
+            self._ensure_columns(worksheet)
+            self.lock_worksheet = worksheet
+        except gspread.exceptions.WorksheetNotFound:
+            logger.info(f"Creating new lock sheet: {self.sheet_name}")
+            worksheet = self.spreadsheet.add_worksheet(
+                title=self.sheet_name,
+                rows=1000,
+                cols=len(LOCK_COLUMNS)
+            )
+
+            # 헤더 추가
+            worksheet.append_row(LOCK_COLUMNS)
+            self.lock_worksheet = worksheet
+            logger.info("Lock sheet created with headers")
+
+        logger.info("Successfully connected to Google Sheets lock system")
+        return True
+
+    def _ensure_columns(self, worksheet):
+        """예전 6열/8열 락 시트에 version/token/expires_at 열 추가"""
+        header = worksheet.row_values(1)
+        if header[:len(LOCK_COLUMNS)] == LOCK_COLUMNS:
+            return
+        if worksheet.col_count < len(LOCK_COLUMNS):
+            worksheet.add_cols(len(LOCK_COLUMNS) - worksheet.col_count)
+        worksheet.batch_update([{"range": f"A1:{_LAST_COL}1", "values": [LOCK_COLUMNS]}])
+        logger.info("Lock sheet header upgraded with version/token/expires_at columns")
+
+    # ---- 락 시트 로컬 캐시 ----
+    def _load_snapshot(self, all_values: list):
+        """시트 전체 값으로 캐시 재구성 (get_all_values 를 이미 읽은 경우 재사용)"""
+        with self._cache_lock:
+            self._row_index = {}
+            self._row_data = {}
+            for idx, row in enumerate(all_values[1:], start=2):  # Skip header
+                self._row_data[idx] = row
+                if row and row[0]:
+                    self._row_index.setdefault(row[0], idx)
+            self._cache_rows = max(len(all_values), 1)
+            self._cache_full_at = self._cache_checked_at = time.monotonic()
+
+    def _refresh_cache(self):
+        """캐시 갱신: 전체 읽기 주기가 지났으면 시트 전체, 아니면 마지막 행 이후에 추가된 행만 읽음"""
+        with self._cache_lock:
+            now = time.monotonic()
+            if self._cache_full_at is None or now - self._cache_full_at >= self.cache_full_refresh:
+                self._cache_counters["full_refreshes"] += 1
+                self._load_snapshot(self.lock_worksheet.get_all_values())
+                return
+
+            self._cache_counters["tail_refreshes"] += 1
+            start = self._cache_rows + 1
+            new_rows = [row for row in self.lock_worksheet.get_values(f"A{start}:{_LAST_COL}") if row]
+            for idx, row in enumerate(new_rows, start=start):
+                self._row_data[idx] = row
+                if row[0]:
+                    self._row_index.setdefault(row[0], idx)
+            self._cache_rows += len(new_rows)
+            self._cache_checked_at = now
+
+    def _cached_row(self, order_id: str, max_age: float = None):
+        """(행 번호, 행 데이터) 캐시 조회, max_age(기본 TTL) 가 지났으면 먼저 갱신 (없으면 None)"""
+        max_age = self.cache_ttl if max_age is None else max_age
+        with self._cache_lock:
+            if self._cache_checked_at is not None and time.monotonic() - self._cache_checked_at < max_age:
+                self._cache_counters["hits"] += 1
+            else:
+                self._cache_counters["misses"] += 1
+                self._refresh_cache()
+            row_num = self._row_index.get(order_id)
+            if row_num is None:
+                return None
+            return row_num, self._row_data.get(row_num, [])
+
+    def _cache_update_row(self, row_num: int, start_col: int, values: list):
+        """자기 쓰기를 캐시에 반영 (start_col: 1부터)"""
+        with self._cache_lock:
+            row = list(self._row_data.get(row_num, []))
+            end_col = start_col - 1 + len(values)
+            if len(row) < end_col:
+                row.extend([""] * (end_col - len(row)))
+            row[start_col - 1:end_col] = values
+            self._row_data[row_num] = row
+
+    def invalidate_cache(self, full: bool = False):
+        """다음 조회 때 시트를 다시 읽도록 함 (full=True: 행 삭제 등으로 행 번호가 바뀐 경우)"""
+        with self._cache_lock:
+            self._cache_counters["invalidations"] += 1
+            self._cache_checked_at = None
+            if full:
+                self._cache_full_at = None
+
+    def stats(self) -> dict:
+        with self._cache_lock:
+            counters = dict(self._cache_counters)
+            lookups = counters["hits"] + counters["misses"]
+            counters["backend"] = self.name
+            counters["entries"] = len(self._row_index)
+            counters["hit_rate"] = round(counters["hits"] / lookups, 3) if lookups else 0.0
+            counters["age_sec"] = (round(time.monotonic() - self._cache_full_at, 1)
+                                   if self._cache_full_at is not None else None)
+            return counters
+
+    def _read_order_row(self, order_id: str, max_age: float = None):
+        """
+        (행 번호, 실제 행 데이터) 조회 (없으면 None)
+
+        캐시의 행 번호로 그 행을 읽고, 다른 PC의 행 삭제로 어긋났으면 전체를 다시 읽어 한 번 더 시도
+        """
+        for attempt in range(2):
+            cached = self._cached_row(order_id, max_age)
+            if not cached:
+                return None
+            row_num = cached[0]
+            row_data = self.lock_worksheet.row_values(row_num)
+            if row_data and row_data[0] == order_id:
+                with self._cache_lock:
+                    self._row_data[row_num] = row_data
+                return row_num, row_data
+            logger.warning(f"Lock cache row {row_num} no longer holds {order_id}, reloading sheet")
+            self.invalidate_cache(full=True)
+        return None
+
+    # ---- 락 연산 ----
+    def _claim_values(self, row_data: list, machine_id: str, current_time: str, notes: str,
+                      expires_at: float) -> list:
+        """기존 행을 가져갈 때 B~I 열에 쓸 값 (version/token = 기존 version + 1)"""
+        version = as_int(_cell(row_data, 6)) + 1
+        return [machine_id, current_time, STATUS_PROCESSING, machine_id, notes or _cell(row_data, 5),
+                version, version, _epoch_cell(expires_at)]
+
+    def _verify_claims(self, claims: dict, machine_id: str, current_time: str) -> dict:
+        """
+        settle 초 뒤 시트를 다시 읽어, 각 주문의 첫 번째 행이 자기 기록 그대로인 것만 남김
+
+        claims: {order_id: 기록한 version}, 반환: {order_id: 펜싱 토큰}
+        진 주문 중 자기가 추가한 중복 행은 failed 로 표시 (한 번의 호출)
+        """
+        if self.settle:
+            time.sleep(self.settle)
+        all_values = self.lock_worksheet.get_all_values()
+        self._load_snapshot(all_values)
+
+        won = {}
+        lost_rows = []
+        with self._cache_lock:
+            row_index = self._row_index
+        for order_id, version in claims.items():
+            row_num = row_index.get(order_id)
+            row = all_values[row_num - 1] if row_num else []
+            if (_cell(row, 1) == machine_id and _cell(row, 2) == current_time
+                    and as_int(_cell(row, 6)) == version):
+                won[order_id] = version
+                continue
+            logger.info(f"Lost lock race for {order_id} to {_cell(row, 1) or 'unknown'}")
+            for idx, other in enumerate(all_values[1:], start=2):  # Skip header
+                if (idx != row_num and _cell(other, 0) == order_id and _cell(other, 1) == machine_id
+                        and _cell(other, 2) == current_time):
+                    lost_rows.append({"range": f"D{idx}:F{idx}",
+                                      "values": [[STATUS_FAILED, machine_id, f"Lost lock race to {_cell(row, 1)}"]]})
+
+        if lost_rows:
+            self.lock_worksheet.batch_update(lost_rows)
+            self.invalidate_cache(full=True)
+        return won
+
+    def acquire(self, order_id: str, machine_id: str, notes: str, is_available: Callable,
+                expires_at: float = 0.0) -> Optional[int]:
+        # 없다고 판단해 새 행을 추가하기 전에 다른 PC가 방금 추가한 행까지 읽음 (max_age=0)
+        existing = self._read_order_row(order_id, max_age=0)
+        current_time = _now()
+
+        if existing:
+            # 기존 행 업데이트 (재처리): 한 번의 호출로 기록
+            existing_row, row_data = existing
+            if not is_available(order_id, row_data):
+                return None
+            claim = self._claim_values(row_data, machine_id, current_time, notes, expires_at)
+            self.lock_worksheet.batch_update([{"range": f"B{existing_row}:{_LAST_COL}{existing_row}",
+                                               "values": [claim]}])
+            version = claim[6]
+        else:
+            # 새 레코드 추가
+            version = 1
+            self.lock_worksheet.append_row([order_id, machine_id, current_time, STATUS_PROCESSING, machine_id,
+                                            notes, version, version, _epoch_cell(expires_at)])
+
+        return self._verify_claims({order_id: version}, machine_id, current_time).get(order_id)
+
+    def acquire_many(self, order_ids: List[str], machine_id: str, notes: str, is_available: Callable,
+                     expires_at: float = 0.0) -> dict:
+        """
+        시트를 한 번 읽어 로컬에서 판단한 뒤, 기존 행은 batch_update 한 번,
+        새 주문은 append_rows 한 번으로 기록하고, 확인 읽기 한 번
+        (주문 수와 관계없이 API 호출 최대 4회 + 경합 시 중복 행 표시 1회)
+
+        쓰기 실패한 묶음은 결과에서 제외
+        """
+        self._load_snapshot(self.lock_worksheet.get_all_values())
+        with self._cache_lock:
+            row_index, row_data_by_num = self._row_index, self._row_data
+
+        current_time = _now()
+        updates = []
+        update_claims = {}
+        new_rows = []
+        for order_id in order_ids:
+            row_num = row_index.get(order_id)
+            if row_num is not None:
+                row_data = row_data_by_num[row_num]
+                if not is_available(order_id, row_data):
+                    continue
+                claim = self._claim_values(row_data, machine_id, current_time, notes, expires_at)
+                updates.append({"range": f"B{row_num}:{_LAST_COL}{row_num}", "values": [claim]})
+                update_claims[order_id] = claim[6]
+            else:
+                new_rows.append([order_id, machine_id, current_time, STATUS_PROCESSING, machine_id, notes, 1, 1,
+                                 _epoch_cell(expires_at)])
+
+        claims = {}
+        if updates:
+            try:
+                self.lock_worksheet.batch_update(updates)
+                claims.update(update_claims)
+            except Exception as e:
+                error_handler.log_error(
+                    f"Failed to re-acquire {len(updates)} locks",
+                    ErrorSeverity.HIGH,
+                    {"order_ids": list(update_claims), "error": str(e)}
+                )
+
+        if new_rows:
+            try:
+                self.lock_worksheet.append_rows(new_rows)
+                claims.update((row[0], 1) for row in new_rows)
+            except Exception as e:
+                error_handler.log_error(
+                    f"Failed to acquire {len(new_rows)} new locks",
+                    ErrorSeverity.HIGH,
+                    {"order_ids": [row[0] for row in new_rows], "error": str(e)}
+                )
+
+        if not claims:
+            return {}
+        return self._verify_claims(claims, machine_id, current_time)
+
+    def release(self, order_id: str, status: str, notes: str = "", machine_id: str = None,
+                token: int = None) -> bool:
+        existing = self._read_order_row(order_id)
+        if not existing:
+            return False
+        row_num, row_data = existing
+        if token is not None:
+            check_token(order_id, row_data, machine_id, token)
+
+        # 상태/메모/version 을 한 번의 호출로 기록 (machine_id 는 그대로)
+        existing_notes = _cell(row_data, 5)
+        if notes:
+            existing_notes = f"{existing_notes} | {notes}" if existing_notes else notes
+        values = [status, _cell(row_data, 4), existing_notes, as_int(_cell(row_data, 6)) + 1]
+        self.lock_worksheet.batch_update([{"range": f"D{row_num}:G{row_num}", "values": [values]}])
+        self._cache_update_row(row_num, 4, values)
+        return True
+
+    def renew(self, tokens: dict, machine_id: str, expires_at: float = 0.0) -> dict:
+        """
+        시트를 한 번 읽어 아직 자기 것인 락만 골라 batch_update 한 번으로 기한 갱신
+
+        locked_at(C)/version(G)/expires_at(I) 칸만 써서, 같은 순간 이 PC의 해제(D~G)가 바꾼 상태를 되돌리지 않음
+        """
+        all_values = self.lock_worksheet.get_all_values()
+        self._load_snapshot(all_values)
+        with self._cache_lock:
+            row_index = self._row_index
+
+        current_time = _now()
+        updates = []
+        renewed = {}
+        for order_id, token in tokens.items():
+            row_num = row_index.get(order_id)
+            row = all_values[row_num - 1] if row_num else []
+            if (_cell(row, 3) != STATUS_PROCESSING or _cell(row, 4) != machine_id
+                    or as_int(_cell(row, 7)) != token):
+                continue
+            version = as_int(_cell(row, 6)) + 1
+            updates.append({"range": f"C{row_num}", "values": [[current_time]]})
+            updates.append({"range": f"G{row_num}", "values": [[version]]})
+            updates.append({"range": f"I{row_num}", "values": [[_epoch_cell(expires_at)]]})
+            renewed[order_id] = (row_num, version)
+
+        if not updates:
+            return {}
+        self.lock_worksheet.batch_update(updates)
+        for row_num, version in renewed.values():
+            self._cache_update_row(row_num, 3, [current_time])
+            self._cache_update_row(row_num, 7, [version])
+            self._cache_update_row(row_num, 9, [_epoch_cell(expires_at)])
+        return {order_id: tokens[order_id] for order_id in renewed}
+
+    def get(self, order_id: str) -> Optional[list]:
+        cached = self._cached_row(order_id)
+        return cached[1] if cached else None
+
+    def read(self, order_id: str) -> Optional[list]:
+        existing = self._read_order_row(order_id, max_age=0)
+        return existing[1] if existing else None
+
+    def get_all(self) -> List[list]:
+        all_values = self.lock_worksheet.get_all_values()
+        self._load_snapshot(all_values)
+        return [row for row in all_values[1:] if row and row[0]]  # Skip header
+
+    def cleanup(self, should_delete: Callable) -> int:
+        all_values = self.lock_worksheet.get_all_values()
+        rows_to_delete = [idx for idx, row in enumerate(all_values[1:], start=2)  # Skip header
+                          if should_delete(row)]
+
+        # 역순으로 삭제 (인덱스 변화 방지)
+        for row_num in sorted(rows_to_delete, reverse=True):
+            self.lock_worksheet.delete_rows(row_num)
+        if rows_to_delete:
+            self.invalidate_cache(full=True)  # 행 번호가 바뀜
+        return len(rows_to_delete)
+
+
+class MemoryWorksheet:
+    """
+    gspread Worksheet 의 락 시트용 부분 구현 (프로세스 안의 가짜 시트)
+
+    호출 하나하나는 원자적이지만 호출 사이에는 다른 스레드가 끼어들 수 있음 (실제 API 와 같음)
+    latency(+ 0~jitter 무작위) 초만큼 호출마다 잠들어 API 왕복 지연을 흉내 냄
+    """
+
+    _CELL = re.compile(r"([A-Z]+)(\d*)")
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._rows = [list(LOCK_COLUMNS)]
+
+    def _call(self):
+        delay = self.latency + (random.random() * self.jitter if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+        with self._lock:
+            self.calls += 1
+
+    @classmethod
+    def _parse_cell(cls, cell: str):
+        letters, digits = cls._CELL.fullmatch(cell).groups()
+        col = 0
+        for ch in letters:
+            col = col * 26 + ord(ch) - ord('A') + 1
+        return (int(digits) if digits else None), col
+
+    def _set(self, row_num: int, col: int, value):
+        while len(self._rows) < row_num:
+            self._rows.append([])
+        row = self._rows[row_num - 1]
+        if len(row) < col:
+            row.extend([""] * (col - len(row)))
+        row[col - 1] = "" if value is None else str(value)
+
+    def get_all_values(self) -> list:
+        self._call()
+        with self._lock:
+            return [list(row) for row in self._rows]
+
+    def get_values(self, range_name: str) -> list:
+        self._call()
+        start, end = range_name.split(":")
+        start_row, start_col = self._parse_cell(start)
+        end_row, end_col = self._parse_cell(end)
+        with self._lock:
+            rows = self._rows[start_row - 1:end_row]
+            return [list(row[start_col - 1:end_col]) for row in rows]
+
+    def row_values(self, row_num: int) -> list:
+        self._call()
+        with self._lock:
+            return list(self._rows[row_num - 1]) if row_num <= len(self._rows) else []
+
+    def update_cell(self, row_num: int, col: int, value):
+        self._call()
+        with self._lock:
+            self._set(row_num, col, value)
+
+    def batch_update(self, data: list):
+        self._call()
+        with self._lock:
+            for item in data:
+                start = item["range"].split(":")[0]
+                row_num, col = self._parse_cell(start)
+                for r, values in enumerate(item["values"]):
+                    for c, value in enumerate(values):
+                        self._set(row_num + r, col + c, value)
+
+    def append_row(self, values: list):
+        self.append_rows([values])
+
+    def append_rows(self, rows: list):
+        self._call()
+        with self._lock:
+            self._rows.extend(["" if v is None else str(v) for v in row] for row in rows)
+
+    def delete_rows(self, row_num: int):
+        self._call()
+        with self._lock:
+            del self._rows[row_num - 1]
+
+
+class MemoryLockBackend(SheetsLockBackend):
+    """가짜 시트 위의 sheets 백엔드 (worksheet 를 공유하면 여러 "PC" 가 같은 시트를 보는 것과 같음)"""
+
+    name = "memory"
+
+    def __init__(self, worksheet: MemoryWorksheet = None, latency: float = 0.0,
+                 cache_ttl: float = 5.0, cache_full_refresh: float = 60.0, settle: float = 1.0):
+        super().__init__(worksheet=worksheet or MemoryWorksheet(latency),
+                         cache_ttl=cache_ttl, cache_full_refresh=cache_full_refresh, settle=settle)
+
+
+# ============================================================
+# SQLite (공유 디스크)
+# ============================================================
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS locks (
+    order_id TEXT PRIMARY KEY,
+    locked_by TEXT NOT NULL DEFAULT '',
+    locked_at TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT '',
+    machine_id TEXT NOT NULL DEFAULT '',
+    notes TEXT NOT NULL DEFAULT '',
+    version INTEGER NOT NULL DEFAULT 0,
+    token INTEGER NOT NULL DEFAULT 0,
+    expires_at REAL NOT NULL DEFAULT 0
+);
+"""
+
+_SELECT = ("SELECT order_id, locked_by, locked_at, status, machine_id, notes, version, token, expires_at "
+           "FROM locks")
+
+
+class SqliteLockBackend(LockBackend):
+    """공유 디스크의 SQLite 락 테이블 (판단 + 기록을 한 트랜잭션으로)"""
+
+    name = "sqlite"
+
+    def __init__(self, db_path, busy_timeout: float = 30.0):
+        self.db_path = Path(db_path)
+        self.busy_timeout = busy_timeout
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    def connect(self) -> bool:
+        if self._conn is not None:
+            return True
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=self.busy_timeout, check_same_thread=False,
+                               isolation_level=None)
+        conn.executescript(_SCHEMA)
+        # 예전 6열/8열 테이블에 version/token/expires_at 열 추가
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(locks)")}
+        for column, column_type in (("version", "INTEGER"), ("token", "INTEGER"), ("expires_at", "REAL")):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE locks ADD COLUMN {column} {column_type} NOT NULL DEFAULT 0")
+        self._conn = conn
+        logger.info(f"Connected to SQLite lock store: {self.db_path}")
+        return True
+
+    def _transaction(self, func):
+        """BEGIN IMMEDIATE (다른 PC의 쓰기와 직렬화) 안에서 func(conn) 실행"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(self._conn)
+                self._conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def acquire_many(self, order_ids: List[str], machine_id: str, notes: str, is_available: Callable,
+                     expires_at: float = 0.0) -> dict:
+        # 트랜잭션 안에서 읽고 쓰므로 확인 읽기가 필요 없음
+        def claim(conn):
+            won = {}
+            current_time = _now()
+            for order_id in order_ids:
+                row = conn.execute(_SELECT + " WHERE order_id = ?", (order_id,)).fetchone()
+                if row is None:
+                    conn.execute("INSERT INTO locks VALUES (?, ?, ?, ?, ?, ?, 1, 1, ?)",
+                                 (order_id, machine_id, current_time, STATUS_PROCESSING, machine_id, notes,
+                                  expires_at))
+                    won[order_id] = 1
+                elif is_available(order_id, list(row)):
+                    version = row[6] + 1
+                    conn.execute("UPDATE locks SET locked_by = ?, locked_at = ?, status = ?, machine_id = ?, "
+                                 "notes = ?, version = ?, token = ?, expires_at = ? WHERE order_id = ?",
+                                 (machine_id, current_time, STATUS_PROCESSING, machine_id, notes or row[5],
+                                  version, version, expires_at, order_id))
+                    won[order_id] = version
+            return won
+
+        return self._transaction(claim)
+
+    def release(self, order_id: str, status: str, notes: str = "", machine_id: str = None,
+                token: int = None) -> bool:
+        def update(conn):
+            row = conn.execute(_SELECT + " WHERE order_id = ?", (order_id,)).fetchone()
+            if row is None:
+                return False
+            if token is not None:
+                check_token(order_id, list(row), machine_id, token)
+            conn.execute(
+                "UPDATE locks SET status = ?, "
+                "notes = CASE WHEN ? = '' THEN notes WHEN notes = '' THEN ? ELSE notes || ' | ' || ? END, "
+                "version = version + 1 WHERE order_id = ?", (status, notes, notes, notes, order_id))
+            return True
+
+        return self._transaction(update)
+
+    def renew(self, tokens: dict, machine_id: str, expires_at: float = 0.0) -> dict:
+        def touch(conn):
+            current_time = _now()
+            renewed = {}
+            for order_id, token in tokens.items():
+                cursor = conn.execute(
+                    "UPDATE locks SET locked_at = ?, expires_at = ?, version = version + 1 "
+                    "WHERE order_id = ? AND status = ? AND machine_id = ? AND token = ?",
+                    (current_time, expires_at, order_id, STATUS_PROCESSING, machine_id, token))
+                if cursor.rowcount:
+                    renewed[order_id] = token
+            return renewed
+
+        return self._transaction(touch)
+
+    def get(self, order_id: str) -> Optional[list]:
+        with self._lock:
+            row = self._conn.execute(_SELECT + " WHERE order_id = ?", (order_id,)).fetchone()
+        return list(row) if row else None
+
+    def get_all(self) -> List[list]:
+        with self._lock:
+            return [list(row) for row in self._conn.execute(_SELECT + " ORDER BY rowid")]
+
+    def cleanup(self, should_delete: Callable) -> int:
+        def delete(conn):
+            order_ids = [row[0] for row in conn.execute(_SELECT) if should_delete(list(row))]
+            conn.executemany("DELETE FROM locks WHERE order_id = ?", [(order_id,) for order_id in order_ids])
+            return len(order_ids)
+
+        return self._transaction(delete)
+
+    def stats(self) -> dict:
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM locks").fetchone()[0] if self._conn else 0
+        return {"backend": self.name, "entries": count}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def open_lock_backend(backend: str, spreadsheet_id: str = None, sheet_name: str = "processing_lock",
+                      credentials_path: Path = None, token_path: Path = None, db_path=None,
+                      busy_timeout: float = 30.0, cache_ttl: float = 5.0, cache_full_refresh: float = 60.0,
+                      settle: float = 1.0, latency: float = 0.0) -> LockBackend:
+    """설정값(LOCK_BACKEND)에 맞는 락 저장소 생성"""
+    backend = (backend or 'sheets').lower()
+    if backend == 'sheets':
+        return SheetsLockBackend(spreadsheet_id, sheet_name, credentials_path=credentials_path,
+                                 token_path=token_path, cache_ttl=cache_ttl, cache_full_refresh=cache_full_refresh,
+                                 settle=settle)
+    if backend == 'sqlite':
+        return SqliteLockBackend(db_path, busy_timeout=busy_timeout)
+    if backend == 'memory':
+        return MemoryLockBackend(latency=latency, cache_ttl=cache_ttl, cache_full_refresh=cache_full_refresh,
+                                 settle=settle)
+    raise ValueError(f"알 수 없는 LOCK_BACKEND: {backend} (sheets | sqlite | memory)")
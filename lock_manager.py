@@ -1,49 +1,86 @@
 """
 분산 락 관리자 (Distributed Lock Manager)
 ==========================================
-Google Sheets 기반 분산 락 시스템
 여러 컴퓨터에서 동시 실행 시 중복 처리 방지
+락 저장소는 lock_backends 의 백엔드 (LOCK_BACKEND: Google Sheets / 공유 디스크 SQLite / 메모리)
 
 V10 주요 기능:
-- Google Sheets를 중앙 락 저장소로 사용
-- 원자적(atomic) 락 획득/해제
-- 타임아웃 기반 데드락 방지 (기본 30분)
+- Google Sheets를 중앙 락 저장소로 사용 (기본, 한 매장이면 공유 디스크 SQLite 로 대체 가능)
+- 원자적(atomic) 락 획득/해제 (시트: version 열 + 확인 읽기로 Compare-and-Set)
+- 펜싱 토큰: 획득할 때마다 주문별로 증가, 해제/업로드 전에 토큰이 낡았으면 거부
+- 목록 페이지 단위 일괄 락 획득 (acquire_many: 시트 읽기 1회 + 일괄 쓰기)
+- 락 시트 로컬 캐시 (order_id → 행 번호, 짧은 TTL 로 추가된 행만 읽음, 자기 쓰기 시 갱신/무효화)
+- 짧은 기한(LOCK_TIMEOUT_SEC, 기본 45초) + 하트비트 스레드가 잡고 있는 락 전체를 한 번에 갱신
+  → 오래 걸리는 처리는 빼앗기지 않고, 죽은 PC의 락은 기한이 지나면 다른 PC가 가져감
+- 기한은 행의 expires_at (UTC epoch 초, 잡은 PC의 시각 + 기한)
+  잡은 PC는 자기 시계로 기한 확인, 다른 PC는 기한 + LOCK_CLOCK_SKEW_SEC 가 지나야 가져감
+  (PC 시계가 그 이상 어긋나지 않으면 기한 안의 락을 빼앗지 않음)
 - PC 식별 (hostname + IP)
 """
 
 import time
 import socket
+import threading
 import platform
 import datetime
 from typing import Optional, Dict, List
-from pathlib import Path
 
 # Import centralized config
 from config import config
 from logging_config import logger
 from error_handler import error_handler, ErrorSeverity
+import lock_backends
+from lock_backends import LockBackend, LOCK_COLUMNS, StaleLockError
 
 
 class DistributedLockManager:
-    """Google Sheets 기반 분산 락 관리자"""
+    """분산 락 관리자 (판단은 여기서, 기록은 락 저장소 백엔드)"""
 
-    # 락 시트 이름
-    LOCK_SHEET_NAME = "processing_lock"
+    # 락 기한 (초) - 하트비트(start_heartbeat)가 기한 전에 갱신, 갱신이 끊기면 이 시간 뒤 다른 PC가 가져감
+    LOCK_TIMEOUT_SEC = config.LOCK_TIMEOUT_SEC
 
-    # 락 타임아웃 (초) - 30분
-    LOCK_TIMEOUT_SEC = 1800
+    # 다른 PC의 락을 가져가기 전에 기한 뒤로 더 기다리는 시간 (초) - PC 사이 시계 오차 허용 범위
+    CLOCK_SKEW_SEC = config.LOCK_CLOCK_SKEW_SEC
 
-    # 상태 코드
-    STATUS_PROCESSING = "processing"
-    STATUS_COMPLETED = "completed"
-    STATUS_FAILED = "failed"
+    # 기한 계산에 쓰는 시계 (UTC epoch 초, 테스트에서 PC별 시계 오차를 흉내 낼 때 바꿈)
+    clock = staticmethod(time.time)
+
+    # 업로드 직전 토큰 확인에서 저장소 읽기 재시도 횟수 / 간격 (초, 시도마다 늘어남)
+    VALIDATE_RETRIES = 2
+    VALIDATE_RETRY_DELAY_SEC = 0.5
 
-    def __init__(self):
-        """초기화"""
-        self.machine_id = self._get_machine_id()
-        self.spreadsheet = None
-        self.lock_worksheet = None
-        logger.info(f"DistributedLockManager initialized for machine: {self.machine_id}")
+    # 상태 코드
+    STATUS_PROCESSING = lock_backends.STATUS_PROCESSING
+    STATUS_COMPLETED = lock_backends.STATUS_COMPLETED
+    STATUS_FAILED = lock_backends.STATUS_FAILED
+
+    def __init__(self, backend: LockBackend = None, machine_id: str = None):
+        """초기화 (backend 를 주지 않으면 config.LOCK_BACKEND 로 생성)"""
+        self.machine_id = machine_id or self._get_machine_id()
+        self.backend = backend or lock_backends.open_lock_backend(
+            config.LOCK_BACKEND,
+            spreadsheet_id=config.GS_SPREADSHEET_ID,
+            sheet_name=config.LOCK_SHEET_NAME,
+            credentials_path=config.GOOGLE_CREDENTIALS_PATH,
+            token_path=config.GOOGLE_TOKEN_PATH,
+            db_path=config.LOCK_DB_PATH,
+            busy_timeout=config.LOCK_DB_TIMEOUT_SEC,
+            cache_ttl=config.LOCK_CACHE_TTL_SEC,
+            cache_full_refresh=config.LOCK_CACHE_FULL_REFRESH_SEC,
+            settle=config.LOCK_CAS_SETTLE_SEC,
+        )
+        # 이 프로세스가 획득한 주문별 펜싱 토큰 (해제 후에도 업로드 확인용으로 유지)
+        self._tokens = {}
+        # 아직 해제하지 않은 락 {order_id: 토큰} (하트비트가 기한을 갱신하는 대상)
+        self._held = {}
+        self._tokens_lock = threading.Lock()
+        self._heartbeat_thread = None
+        self._heartbeat_stop = threading.Event()
+        self._heartbeat_interval = None
+        self._heartbeat_counters = {"beats": 0, "renewed": 0, "lost": 0, "errors": 0}
+        self._last_heartbeat = None
+        logger.info(f"DistributedLockManager initialized for machine: {self.machine_id} "
+                    f"(backend: {self.backend.name})")
 
     def _get_machine_id(self) -> str:
         """현재 PC의 고유 ID 생성"""
@@ -60,108 +97,98 @@ class DistributedLockManager:
             logger.warning(f"Failed to get machine ID: {e}")
             return f"unknown_{int(time.time())}"
 
-    def _get_google_credentials(self):
-        """OAuth 인증으로 Google 자격증명 획득"""
+    def connect(self) -> bool:
+        """락 저장소 연결 및 초기화"""
         try:
-            import pickle
-            from google.auth.transport.requests import Request
-            from google_auth_oauthlib.flow import InstalledAppFlow
-
-            SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
-            creds = None
-
-            # 저장된 토큰이 있으면 로드
-            if config.GOOGLE_TOKEN_PATH.exists():
-                with open(config.GOOGLE_TOKEN_PATH, 'rb') as token:
-                    creds = pickle.load(token)
-
-            # 토큰이 없거나 만료된 경우
-            if not creds or not creds.valid:
-                if creds and creds.expired and creds.refresh_token:
-                    logger.info("Refreshing Google token...")
-                    creds.refresh(Request())
-                else:
-                    if not config.GOOGLE_CREDENTIALS_PATH.exists():
-                        logger.error(f"credentials.json not found: {config.GOOGLE_CREDENTIALS_PATH}")
-                        return None
-
-                    logger.info("Starting Google OAuth flow...")
-                    flow = InstalledAppFlow.from_client_secrets_file(
-                        str(config.GOOGLE_CREDENTIALS_PATH), SCOPES)
-                    creds = flow.run_local_server(port=0)
-
-                # 토큰 저장
-                with open(config.GOOGLE_TOKEN_PATH, 'wb') as token:
-                    pickle.dump(creds, token)
-                logger.info("Google token saved")
-
-            return creds
+            return self.backend.connect()
         except Exception as e:
             error_handler.log_error(
-                "Failed to get Google credentials",
-                ErrorSeverity.HIGH,
+                f"Failed to connect to lock backend ({self.backend.name})",
+                ErrorSeverity.CRITICAL,
                 {"error": str(e)}
             )
-            return None
+            return False
 
-    def connect(self) -> bool:
-        """Google Sheets에 연결 및 락 시트 초기화"""
-        try:
-            logger.info(f"Connecting to Google Sheets (Spreadsheet ID: {config.GS_SPREADSHEET_ID})")
+    def invalidate_cache(self, full: bool = False):
+        """다음 조회 때 저장소를 다시 읽도록 함"""
+        self.backend.invalidate_cache(full)
+
+    def cache_stats(self) -> dict:
+        """저장소 통계 (sheets/memory: 로컬 캐시 적중률)"""
+        return self.backend.stats()
+
+    def close(self):
+        self.stop_heartbeat()
+        self.backend.close()
+
+    def _remember_tokens(self, tokens: dict):
+        with self._tokens_lock:
+            self._tokens.update(tokens)
+            self._held.update(tokens)
+
+    def held_locks(self) -> dict:
+        """이 프로세스가 잡고 있는 (해제 전) 락 {order_id: 토큰}"""
+        with self._tokens_lock:
+            return dict(self._held)
+
+    def get_token(self, order_id: str) -> Optional[int]:
+        """이 프로세스가 마지막으로 획득한 펜싱 토큰 (없으면 None)"""
+        with self._tokens_lock:
+            return self._tokens.get(order_id)
+
+    def _expires_at(self) -> float:
+        """지금 획득/갱신하는 락의 기한 (UTC epoch 초)"""
+        return self.clock() + self.LOCK_TIMEOUT_SEC
+
+    @staticmethod
+    def _row_expires_at(row_data: list) -> float:
+        """행의 expires_at (없으면 0, expires_at 열 전에 기록된 행)"""
+        return lock_backends.as_float(row_data[8]) if len(row_data) > 8 else 0.0
+
+    def _is_available(self, order_id: str, row_data: list) -> bool:
+        """기존 레코드가 있는 주문을 이 PC가 가져가도 되는지 판단 (완료 / 기한 + 시계 오차 여유 전 처리 중이면 False)"""
+        if len(row_data) < 4:
+            logger.warning(f"Invalid row data for {order_id}")
+            return False
 
-            creds = self._get_google_credentials()
-            if not creds:
-                return False
+        existing_status = row_data[3] if len(row_data) > 3 else ""
+        existing_locked_at = row_data[2] if len(row_data) > 2 else ""
+        existing_machine = row_data[4] if len(row_data) > 4 else ""
 
-            import gspread
-            gc = gspread.authorize(creds)
-            self.spreadsheet = gc.open_by_key(config.GS_SPREADSHEET_ID)
+        # 완료 상태면 처리하지 않음
+        if existing_status == self.STATUS_COMPLETED:
+            logger.info(f"Order {order_id} already completed by {existing_machine}")
+            return False
 
-            # 락 시트 생성 또는 가져오기
+        # 처리 중 상태 확인
+        if existing_status == self.STATUS_PROCESSING:
+            expires_at = self._row_expires_at(row_data)
+            if expires_at:
+                # 기한은 잡은 PC의 시각 → 이 PC 시계가 빠를 수 있으므로 CLOCK_SKEW_SEC 만큼 더 기다림
+                remaining = expires_at + self.CLOCK_SKEW_SEC - self.clock()
+                if remaining > 0:
+                    logger.info(f"Order {order_id} is being processed by {existing_machine} "
+                                f"(lease ends in {remaining:.0f}s)")
+                    return False
+                logger.warning(f"Order {order_id} lease expired {-remaining:.0f}s ago, re-acquiring lock")
+                return True
+
+            # expires_at 이 없는 예전 행: locked_at (쓴 PC의 현지 시각) + 기한 + 시계 오차 여유
             try:
-                self.lock_worksheet = self.spreadsheet.worksheet(self.LOCK_SHEET_NAME)
-                logger.info(f"Lock sheet '{self.LOCK_SHEET_NAME}' found")
-            except gspread.exceptions.WorksheetNotFound:
-                logger.info(f"Creating new lock sheet: {self.LOCK_SHEET_NAME}")
-                self.lock_worksheet = self.spreadsheet.add_worksheet(
-                    title=self.LOCK_SHEET_NAME,
-                    rows=1000,
-                    cols=6
-                )
-
-                # 헤더 추가
-                self.lock_worksheet.append_row([
-                    "order_id",
-                    "locked_by",
-                    "locked_at",
-                    "status",
-                    "machine_id",
-                    "notes"
-                ])
-                logger.info("Lock sheet created with headers")
-
-            logger.info("Successfully connected to Google Sheets lock system")
-            return True
+                locked_time = datetime.datetime.fromisoformat(existing_locked_at)
+                elapsed = (datetime.datetime.now() - locked_time).total_seconds()
 
-        except Exception as e:
-            error_handler.log_error(
-                "Failed to connect to Google Sheets",
-                ErrorSeverity.CRITICAL,
-                {"error": str(e)}
-            )
-            return False
+                if elapsed < self.LOCK_TIMEOUT_SEC + self.CLOCK_SKEW_SEC:
+                    # 아직 타임아웃 안됨 - 다른 PC가 처리 중
+                    logger.info(f"Order {order_id} is being processed by {existing_machine} (elapsed: {elapsed:.0f}s)")
+                    return False
+                # 타임아웃 - 재처리 허용
+                logger.warning(f"Order {order_id} timed out (elapsed: {elapsed:.0f}s), re-acquiring lock")
+            except Exception as e:
+                logger.warning(f"Failed to parse locked_at time: {e}")
+                # 시간 파싱 실패 - 재처리 허용
 
-    def _find_order_row(self, order_id: str) -> Optional[int]:
-        """특정 order_id의 행 번호 찾기 (없으면 None 반환)"""
-        try:
-            # 첫 번째 컬럼(order_id)에서 찾기
-            cell = self.lock_worksheet.find(order_id, in_column=1)
-            if cell:
-                return cell.row
-            return None
-        except Exception as e:
-            logger.warning(f"Error finding order row: {e}")
-            return None
+        return True
 
     def acquire_lock(self, order_id: str, notes: str = "") -> bool:
         """
@@ -172,88 +199,64 @@ class DistributedLockManager:
             False: 락 획득 실패 (다른 PC가 처리 중이거나 이미 완료됨)
         """
         try:
-            if not self.lock_worksheet:
-                logger.error("Lock worksheet not initialized. Call connect() first.")
+            if not self.backend.connected:
+                logger.error("Lock backend not initialized. Call connect() first.")
                 return False
 
             logger.info(f"Attempting to acquire lock for order: {order_id}")
 
-            # 1. 기존 레코드 확인
-            existing_row = self._find_order_row(order_id)
+            token = self.backend.acquire(order_id, self.machine_id, notes, self._is_available, self._expires_at())
+            if token is None:
+                return False
 
-            if existing_row:
-                # 기존 레코드가 있음
-                row_data = self.lock_worksheet.row_values(existing_row)
+            self._remember_tokens({order_id: token})
+            logger.info(f"Lock acquired for order {order_id} (token {token})")
+            return True
 
-                if len(row_data) < 4:
-                    logger.warning(f"Invalid row data for {order_id}")
-                    return False
+        except Exception as e:
+            error_handler.log_error(
+                f"Failed to acquire lock for {order_id}",
+                ErrorSeverity.HIGH,
+                {"order_id": order_id, "error": str(e)}
+            )
+            return False
 
-                existing_status = row_data[3] if len(row_data) > 3 else ""
-                existing_locked_at = row_data[2] if len(row_data) > 2 else ""
-                existing_machine = row_data[4] if len(row_data) > 4 else ""
+    def acquire_many(self, order_ids: List[str], notes: str = "") -> dict:
+        """
+        여러 주문의 락을 한 번에 획득 시도 (목록 페이지 단위)
 
-                # 완료 상태면 처리하지 않음
-                if existing_status == self.STATUS_COMPLETED:
-                    logger.info(f"Order {order_id} already completed by {existing_machine}")
-                    return False
+        sheets: 시트를 한 번 읽어 로컬에서 판단한 뒤, 기존 행은 batch_update 한 번,
+        새 주문은 append_rows 한 번으로 기록하고 확인 읽기 한 번 (주문 수와 관계없이 API 호출 최대 4회)
+        sqlite: 트랜잭션 하나
 
-                # 처리 중 상태 확인
-                if existing_status == self.STATUS_PROCESSING:
-                    # 타임아웃 체크
-                    try:
-                        locked_time = datetime.datetime.fromisoformat(existing_locked_at)
-                        elapsed = (datetime.datetime.now() - locked_time).total_seconds()
-
-                        if elapsed < self.LOCK_TIMEOUT_SEC:
-                            # 아직 타임아웃 안됨 - 다른 PC가 처리 중
-                            logger.info(f"Order {order_id} is being processed by {existing_machine} (elapsed: {elapsed:.0f}s)")
-                            return False
-                        else:
-                            # 타임아웃 - 재처리 허용
-                            logger.warning(f"Order {order_id} timed out (elapsed: {elapsed:.0f}s), re-acquiring lock")
-                            # 아래에서 업데이트
-                    except Exception as e:
-                        logger.warning(f"Failed to parse locked_at time: {e}")
-                        # 시간 파싱 실패 - 재처리 허용
-
-                # 기존 행 업데이트 (재처리)
-                current_time = datetime.datetime.now().isoformat()
-                self.lock_worksheet.update_cell(existing_row, 2, self.machine_id)  # locked_by
-                self.lock_worksheet.update_cell(existing_row, 3, current_time)      # locked_at
-                self.lock_worksheet.update_cell(existing_row, 4, self.STATUS_PROCESSING)  # status
-                self.lock_worksheet.update_cell(existing_row, 5, self.machine_id)  # machine_id
-                if notes:
-                    self.lock_worksheet.update_cell(existing_row, 6, notes)  # notes
-
-                logger.info(f"Lock re-acquired for order {order_id}")
-                return True
+        Returns:
+            {이 PC가 락을 획득한 order_id: 펜싱 토큰} (쓰기 실패/경합에서 진 주문은 제외)
+        """
+        if not self.backend.connected:
+            logger.error("Lock backend not initialized. Call connect() first.")
+            return {}
 
-            else:
-                # 새 레코드 추가
-                current_time = datetime.datetime.now().isoformat()
-                new_row = [
-                    order_id,
-                    self.machine_id,
-                    current_time,
-                    self.STATUS_PROCESSING,
-                    self.machine_id,
-                    notes
-                ]
-
-                self.lock_worksheet.append_row(new_row)
-                logger.info(f"Lock acquired for new order {order_id}")
-                return True
+        order_ids = list(dict.fromkeys(order_id for order_id in order_ids if order_id))
+        if not order_ids:
+            return {}
 
+        try:
+            won = self.backend.acquire_many(order_ids, self.machine_id, notes, self._is_available,
+                                            self._expires_at())
         except Exception as e:
             error_handler.log_error(
-                f"Failed to acquire lock for {order_id}",
+                f"Failed to acquire locks for {len(order_ids)} orders",
                 ErrorSeverity.HIGH,
-                {"order_id": order_id, "error": str(e)}
+                {"error": str(e)}
             )
-            return False
+            return {}
 
-    def release_lock(self, order_id: str, status: str = STATUS_COMPLETED, notes: str = "") -> bool:
+        self._remember_tokens(won)
+        logger.info(f"Acquired {len(won)}/{len(order_ids)} locks")
+        return won
+
+    def release_lock(self, order_id: str, status: str = STATUS_COMPLETED, notes: str = "",
+                     token: Optional[int] = None) -> bool:
         """
         락 해제 및 상태 업데이트
 
@@ -261,29 +264,31 @@ class DistributedLockManager:
             order_id: 주문 ID
             status: 최종 상태 (completed/failed)
             notes: 추가 메모
+            token: 펜싱 토큰 (기본: 이 프로세스가 획득한 토큰, 현재 토큰과 다르면 해제 거부)
         """
         try:
-            if not self.lock_worksheet:
-                logger.error("Lock worksheet not initialized")
+            if not self.backend.connected:
+                logger.error("Lock backend not initialized")
                 return False
 
             logger.info(f"Releasing lock for order {order_id} with status: {status}")
 
-            row_num = self._find_order_row(order_id)
-            if not row_num:
+            if token is None:
+                token = self.get_token(order_id)
+            # 결과와 관계없이 더는 기한을 갱신하지 않음 (해제 실패한 락은 기한이 지나면 풀림)
+            with self._tokens_lock:
+                self._held.pop(order_id, None)
+            if not self.backend.release(order_id, status, notes, machine_id=self.machine_id, token=token):
                 logger.warning(f"Order {order_id} not found in lock sheet")
                 return False
 
-            # 상태 업데이트
-            self.lock_worksheet.update_cell(row_num, 4, status)  # status
-            if notes:
-                existing_notes = self.lock_worksheet.cell(row_num, 6).value or ""
-                updated_notes = f"{existing_notes} | {notes}" if existing_notes else notes
-                self.lock_worksheet.update_cell(row_num, 6, updated_notes)
-
             logger.info(f"Lock released for order {order_id}")
             return True
 
+        except StaleLockError as e:
+            logger.warning(f"Rejected release of {order_id}: {e}")
+            return False
+
         except Exception as e:
             error_handler.log_error(
                 f"Failed to release lock for {order_id}",
@@ -292,18 +297,101 @@ class DistributedLockManager:
             )
             return False
 
-    def get_lock_status(self, order_id: str) -> Optional[Dict]:
-        """특정 주문의 락 상태 조회"""
+    def renew_locks(self) -> int:
+        """
+        잡고 있는 락 전체의 기한 갱신 (sheets: 시트 읽기 1회 + batch_update 1회, sqlite: 트랜잭션 하나)
+
+        그 사이 기한이 지나 다른 PC가 가져갔거나 상태가 바뀐 락은 잃은 것으로 보고 목록에서 뺌
+        Returns: 갱신한 락 수
+        """
+        held = self.held_locks()
+        if not held or not self.backend.connected:
+            return 0
+
         try:
-            if not self.lock_worksheet:
-                return None
+            renewed = self.backend.renew(held, self.machine_id, self._expires_at())
+        except Exception as e:
+            with self._tokens_lock:
+                self._heartbeat_counters["errors"] += 1
+            logger.warning(f"Failed to renew {len(held)} locks: {e}")
+            return 0
 
-            row_num = self._find_order_row(order_id)
-            if not row_num:
+        with self._tokens_lock:
+            # 갱신 도중 해제/재획득한 락은 잃은 것으로 치지 않음
+            lost = [order_id for order_id, token in held.items()
+                    if order_id not in renewed and self._held.get(order_id) == token]
+            for order_id in lost:
+                del self._held[order_id]
+            self._heartbeat_counters["renewed"] += len(renewed)
+            self._heartbeat_counters["lost"] += len(lost)
+            self._last_heartbeat = time.monotonic()
+
+        if lost:
+            logger.warning(f"Lost {len(lost)} locks before renewal (expired or re-acquired elsewhere): {lost[:5]}")
+        return len(renewed)
+
+    def start_heartbeat(self, interval: float = None) -> bool:
+        """
+        기한 갱신 스레드 시작 (이미 돌고 있으면 False)
+
+        interval: 갱신 간격 (기본 config.LOCK_HEARTBEAT_SEC), 기한(LOCK_TIMEOUT_SEC)의 1/3 이하여야
+        API 지연/일시 오류가 한두 번 있어도 기한 전에 갱신됨
+        """
+        if self._heartbeat_thread is not None and self._heartbeat_thread.is_alive():
+            return False
+
+        interval = interval or config.LOCK_HEARTBEAT_SEC or self.LOCK_TIMEOUT_SEC / 3
+        if interval * 2 > self.LOCK_TIMEOUT_SEC:
+            logger.warning(f"Lock heartbeat interval {interval}s is too long for a {self.LOCK_TIMEOUT_SEC}s lease")
+        self._heartbeat_interval = interval
+        self._heartbeat_stop.clear()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, args=(interval,),
+                                                  name="lock-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+        logger.info(f"Lock heartbeat started (every {interval}s, lease {self.LOCK_TIMEOUT_SEC}s)")
+        return True
+
+    def stop_heartbeat(self):
+        """기한 갱신 스레드 정지 (잡고 있던 락은 기한이 지나면 다른 PC가 가져감)"""
+        thread = self._heartbeat_thread
+        if thread is None:
+            return
+        self._heartbeat_stop.set()
+        if thread is not threading.current_thread():
+            thread.join(timeout=self._heartbeat_interval)
+        self._heartbeat_thread = None
+
+    def _heartbeat_loop(self, interval: float):
+        while not self._heartbeat_stop.wait(interval):
+            with self._tokens_lock:
+                self._heartbeat_counters["beats"] += 1
+            self.renew_locks()
+
+    def heartbeat_stats(self) -> dict:
+        """기한 갱신 통계 (대시보드/API 용)"""
+        with self._tokens_lock:
+            stats = dict(self._heartbeat_counters)
+            stats["held"] = len(self._held)
+            last = self._last_heartbeat
+        stats["running"] = self._heartbeat_thread is not None and self._heartbeat_thread.is_alive()
+        stats["interval_sec"] = self._heartbeat_interval
+        stats["lease_sec"] = self.LOCK_TIMEOUT_SEC
+        stats["last_renewal_sec"] = round(time.monotonic() - last, 1) if last is not None else None
+        return stats
+
+    def get_lock_status(self, order_id: str) -> Optional[Dict]:
+        """
+        특정 주문의 락 상태 조회 (sheets: 로컬 캐시에서 응답)
+
+        다른 PC가 새로 추가한 행은 LOCK_CACHE_TTL_SEC, 기존 행의 상태 변경은
+        LOCK_CACHE_FULL_REFRESH_SEC 안에 반영됨
+        """
+        try:
+            if not self.backend.connected:
                 return None
 
-            row_data = self.lock_worksheet.row_values(row_num)
-            if len(row_data) < 5:
+            row_data = self.backend.get(order_id)
+            if not row_data or len(row_data) < 5:
                 return None
 
             return {
@@ -312,41 +400,121 @@ class DistributedLockManager:
                 "locked_at": row_data[2] if len(row_data) > 2 else "",
                 "status": row_data[3] if len(row_data) > 3 else "",
                 "machine_id": row_data[4] if len(row_data) > 4 else "",
-                "notes": row_data[5] if len(row_data) > 5 else ""
+                "notes": row_data[5] if len(row_data) > 5 else "",
+                "version": lock_backends.as_int(row_data[6]) if len(row_data) > 6 else 0,
+                "token": lock_backends.as_int(row_data[7]) if len(row_data) > 7 else 0,
+                "expires_at": self._row_expires_at(row_data)
             }
 
         except Exception as e:
             logger.warning(f"Failed to get lock status for {order_id}: {e}")
             return None
 
+    def validate_token(self, order_id: str, token: Optional[int] = None) -> bool:
+        """
+        업로드 직전 펜싱 토큰 확인 (저장소를 직접 읽음)
+
+        True: 현재 토큰/소유 PC가 이 PC의 토큰과 같음, 또는 이 주문의 락을 잡은 적이 없고
+              저장소가 연결되지 않았거나 레코드가 없음 (단독 실행)
+        False: 그 사이 다른 PC가 락을 다시 가져감 (낡은 토큰) 또는 처리 중인 락의 기한이 지남 → 업로드하면 안 됨
+               락을 잡았는데 저장소 연결이 끊겼거나 레코드가 없거나, 다시 시도해도 읽을 수 없는 경우도 False
+               (확인할 수 없으면 업로드하지 않음, 락이 남아 있으면 다음 주기에 다시 처리)
+        토큰을 모르는 주문(재시작 전에 받은 파일)은 소유 PC만 비교
+        """
+        if token is None:
+            token = self.get_token(order_id)
+
+        if not self.backend.connected:
+            if token is None:
+                return True
+            logger.warning(f"Fencing check failed: lock backend disconnected while holding {order_id}")
+            return False
+
+        try:
+            row_data = self._read_with_retry(order_id)
+            if not row_data:
+                if token is None:
+                    return True
+                logger.warning(f"Fencing check failed: lock record for {order_id} is missing")
+                return False
+
+            if token is None:
+                return (row_data[4] if len(row_data) > 4 else "") == self.machine_id
+
+            lock_backends.check_token(order_id, row_data, self.machine_id, token)
+
+            # 아직 처리 중인 락이면 기한이 남아 있어야 함 (지났으면 다른 PC가 언제든 가져갈 수 있음)
+            # 토큰이 같으면 기한은 이 PC가 자기 시계로 기록한 것 → 시계 오차 여유 없이 비교
+            if row_data[3] == self.STATUS_PROCESSING:
+                expires_at = self._row_expires_at(row_data)
+                if expires_at:
+                    remaining = expires_at - self.clock()
+                else:
+                    locked_at = datetime.datetime.fromisoformat(row_data[2])
+                    remaining = self.LOCK_TIMEOUT_SEC - (datetime.datetime.now() - locked_at).total_seconds()
+                if remaining <= 0:
+                    logger.warning(f"Fencing check failed: lock for {order_id} expired ({-remaining:.0f}s ago)")
+                    return False
+            return True
+
+        except StaleLockError as e:
+            logger.warning(f"Fencing check failed: {e}")
+            return False
+
+        except Exception as e:
+            # 확인할 수 없으면 업로드하지 않음
+            logger.warning(f"Fencing check failed: cannot validate token for {order_id}: {e}")
+            return False
+
+    def _read_with_retry(self, order_id: str) -> Optional[list]:
+        """저장소에서 레코드 읽기, 일시 오류는 VALIDATE_RETRIES 번까지 다시 시도 (마지막 오류는 그대로 발생)"""
+        for attempt in range(self.VALIDATE_RETRIES):
+            try:
+                return self.backend.read(order_id)
+            except Exception as e:
+                logger.warning(f"Failed to read lock record for {order_id} (attempt {attempt + 1}): {e}")
+                time.sleep(self.VALIDATE_RETRY_DELAY_SEC * (attempt + 1))
+        return self.backend.read(order_id)
+
     def get_all_locks(self) -> List[Dict]:
         """모든 락 레코드 조회"""
         try:
-            if not self.lock_worksheet:
+            if not self.backend.connected:
                 return []
 
-            all_records = self.lock_worksheet.get_all_records()
-            return all_records
+            return [dict(zip(LOCK_COLUMNS, list(row) + [""] * (len(LOCK_COLUMNS) - len(row))))
+                    for row in self.backend.get_all()]
 
         except Exception as e:
             logger.warning(f"Failed to get all locks: {e}")
             return []
 
+    def get_completed_ids(self) -> set:
+        """완료 상태인 주문 ID 전체 (저장소를 한 번만 읽음, 실패 시 빈 집합)"""
+        try:
+            if not self.backend.connected:
+                return set()
+
+            return {row[0] for row in self.backend.get_all()
+                    if len(row) > 3 and row[0] and row[3] == self.STATUS_COMPLETED}
+
+        except Exception as e:
+            logger.warning(f"Failed to read completed orders: {e}")
+            return set()
+
     def cleanup_old_locks(self, max_age_days: int = 7) -> int:
         """오래된 완료/실패 레코드 정리"""
         try:
-            if not self.lock_worksheet:
+            if not self.backend.connected:
                 return 0
 
             logger.info(f"Cleaning up locks older than {max_age_days} days")
 
             cutoff_time = datetime.datetime.now() - datetime.timedelta(days=max_age_days)
-            all_values = self.lock_worksheet.get_all_values()
 
-            rows_to_delete = []
-            for idx, row in enumerate(all_values[1:], start=2):  # Skip header
+            def is_old(row: list) -> bool:
                 if len(row) < 4:
-                    continue
+                    return False
 
                 status = row[3]
                 locked_at = row[2]
@@ -354,18 +522,15 @@ class DistributedLockManager:
                 # 완료/실패 상태만 정리
                 if status in [self.STATUS_COMPLETED, self.STATUS_FAILED]:
                     try:
-                        locked_time = datetime.datetime.fromisoformat(locked_at)
-                        if locked_time < cutoff_time:
-                            rows_to_delete.append(idx)
+                        return datetime.datetime.fromisoformat(locked_at) < cutoff_time
                     except:
-                        continue
+                        return False
+                return False
 
-            # 역순으로 삭제 (인덱스 변화 방지)
-            for row_num in sorted(rows_to_delete, reverse=True):
-                self.lock_worksheet.delete_rows(row_num)
+            deleted = self.backend.cleanup(is_old)
 
-            logger.info(f"Cleaned up {len(rows_to_delete)} old lock records")
-            return len(rows_to_delete)
+            logger.info(f"Cleaned up {deleted} old lock records")
+            return deleted
 
         except Exception as e:
             logger.warning(f"Failed to cleanup old locks: {e}")
@@ -384,12 +549,12 @@ if __name__ == "__main__":
     lock_mgr = DistributedLockManager()
     print(f"\nMachine ID: {lock_mgr.machine_id}")
 
-    # Google Sheets 연결
+    # 락 저장소 연결
     if not lock_mgr.connect():
-        print("❌ Google Sheets 연결 실패")
+        print(f"❌ 락 저장소 연결 실패 ({lock_mgr.backend.name})")
         exit(1)
 
-    print("✅ Google Sheets 연결 성공")
+    print(f"✅ 락 저장소 연결 성공 ({lock_mgr.backend.name})")
 
     # 테스트 주문 ID
     test_order_id = "TEST_" + str(int(time.time()))
@@ -0,0 +1,144 @@
+"""
+MHTML 디코더 (bytes 기반 경계 스캐너)
+=====================================
+저장된 MHTML(Chrome "웹페이지 전체" / CDP captureSnapshot) 파일에서
+text/html 파트만 찾아 디코딩
+
+- 파일을 텍스트로 바꾸지 않고 bytes 에서 MIME 경계(boundary)를 find() 로 건너뛰며 순회
+- 각 파트는 헤더 블록만 email 파서로 읽고, 본문은 text/html 파트 하나만 잘라서 디코딩
+  (이미지 등 나머지 파트는 복사/디코딩하지 않음)
+- Content-Transfer-Encoding (quoted-printable / base64) 처리
+- 선언된 charset 사용 (헤더 → <meta charset> → utf-8 → euc-kr 순)
+- MIME 구조가 아니면 None 반환 → 호출 측에서 기존 정규식 방식으로 처리
+
+bytes 뿐 아니라 find(sub, start, end) 와 슬라이싱을 지원하는 버퍼(mmap 등)도 받을 수 있음
+"""
+
+import binascii
+import codecs
+import email.parser
+import email.policy
+import re
+from typing import Optional
+
+# 본문 앞부분의 <meta charset=...> / <meta http-equiv content="...; charset=...">
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([A-Za-z0-9_\-]+)', re.IGNORECASE)
+_META_SNIFF_BYTES = 2048
+
+# 헤더 블록이 이보다 길면 MIME 파일이 아닌 것으로 판단
+_MAX_HEADER_BYTES = 64 * 1024
+
+_HEADER_PARSER = email.parser.BytesHeaderParser(policy=email.policy.compat32)
+
+
+def _header_block(buf, start: int, end: int):
+    """start 부터의 헤더 블록 → (헤더 Message, 본문 시작 위치), 빈 줄이 없으면 (None, end)"""
+    limit = min(end, start + _MAX_HEADER_BYTES)
+    crlf = buf.find(b'\r\n\r\n', start, limit)
+    lf = buf.find(b'\n\n', start, limit)
+    if crlf != -1 and (lf == -1 or crlf < lf):
+        header_end, body_start = crlf, crlf + 4
+    elif lf != -1:
+        header_end, body_start = lf, lf + 2
+    else:
+        return None, end
+    return _HEADER_PARSER.parsebytes(bytes(buf[start:header_end])), body_start
+
+
+def _find_html_part(buf, start: int, end: int, headers):
+    """headers 가 가리키는 [start, end) 본문에서 text/html 파트 → (헤더, 본문 시작, 본문 끝)"""
+    content_type = headers.get_content_type()
+    if content_type == 'text/html':
+        return headers, start, end
+    if headers.get_content_maintype() != 'multipart':
+        return None
+    boundary = headers.get_boundary()
+    if not boundary:
+        return None
+
+    delimiter = b'--' + boundary.encode('ascii', errors='ignore')
+    pos = buf.find(delimiter, start, end)
+    while pos != -1:
+        pos += len(delimiter)
+        if buf[pos:pos + 2] == b'--':  # 마지막 경계
+            return None
+        line_end = buf.find(b'\n', pos, end)
+        if line_end == -1:
+            return None
+        part_headers, body_start = _header_block(buf, line_end + 1, end)
+        if part_headers is None:
+            return None
+
+        next_pos = buf.find(delimiter, body_start, end)
+        body_end = end if next_pos == -1 else next_pos
+        # 경계 앞의 줄바꿈은 본문에 포함되지 않음
+        if buf[body_end - 2:body_end] == b'\r\n':
+            body_end -= 2
+        elif buf[body_end - 1:body_end] == b'\n':
+            body_end -= 1
+
+        found = _find_html_part(buf, body_start, body_end, part_headers)
+        if found is not None:
+            return found
+        pos = next_pos
+    return None
+
+
+def _decode_transfer(body: bytes, encoding: str) -> bytes:
+    encoding = (encoding or '').strip().lower()
+    if encoding == 'quoted-printable':
+        return binascii.a2b_qp(body)
+    if encoding == 'base64':
+        try:
+            return binascii.a2b_base64(body)
+        except binascii.Error:
+            return body
+    return body
+
+
+def _known_charset(name) -> Optional[str]:
+    if not name:
+        return None
+    if isinstance(name, bytes):
+        name = name.decode('ascii', errors='ignore')
+    try:
+        return codecs.lookup(name.strip()).name
+    except LookupError:
+        return None
+
+
+def decode_html_payload(payload: bytes, declared_charset: str = None) -> str:
+    """HTML 바이트를 문자열로 (선언된 charset → <meta charset> → utf-8 → euc-kr)"""
+    charset = _known_charset(declared_charset)
+    if charset is None:
+        match = _META_CHARSET_RE.search(payload, 0, _META_SNIFF_BYTES)
+        if match:
+            charset = _known_charset(match.group(1))
+
+    if charset is not None:
+        try:
+            return payload.decode(charset)
+        except UnicodeDecodeError:
+            pass
+    try:
+        return payload.decode('utf-8')
+    except UnicodeDecodeError:
+        return payload.decode('euc-kr', errors='replace')
+
+
+def locate_html_part(buf) -> Optional[tuple]:
+    """MHTML 버퍼에서 text/html 파트 위치 → (헤더 Message, 본문 시작, 본문 끝), 없으면 None"""
+    headers, body_start = _header_block(buf, 0, len(buf))
+    if headers is None:
+        return None
+    return _find_html_part(buf, body_start, len(buf), headers)
+
+
+def extract_html(buf) -> Optional[str]:
+    """MHTML 바이트에서 HTML 추출 (text/html 파트가 없으면 None)"""
+    found = locate_html_part(buf)
+    if found is None:
+        return None
+    headers, start, end = found
+    payload = _decode_transfer(bytes(buf[start:end]), headers.get('Content-Transfer-Encoding'))
+    return decode_html_payload(payload, headers.get_content_charset()).strip()
@@ -0,0 +1,123 @@
+"""
+주문서 파싱 결과 캐시 (Content-Hash Parse Cache)
+================================================
+같은 주문서 파일을 재시도/재업로드 때마다 다시 파싱하지 않도록
+파일 바이트의 SHA-256 → (파싱된 행, 감지된 회사) 를 data/ 아래에 저장
+
+- 항목마다 파일 하나 (data/parse_cache/ab/abcd....json) → 여러 프로세스가 동시에 써도 안전
+- msgpack 이 설치되어 있으면 msgpack, 없으면 압축 JSON
+- 저장 시 버전 스탬프 기록, 파서/규칙 버전이 바뀌면 자동으로 미스 처리
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def content_hash(data, *extra: bytes) -> str:
+    """bytes/mmap 등 버퍼의 SHA-256 (복사 없이), extra 는 뒤에 이어서 해시"""
+    digest = hashlib.sha256(data)
+    for part in extra:
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """SHA-256 키 기반 디스크 캐시 (enabled=False 이면 항상 미스)"""
+
+    def __init__(self, directory, version: str, enabled: bool = True):
+        self.directory = Path(directory)
+        self.version = version
+        self.enabled = enabled
+        self.suffix = ".msgpack" if msgpack is not None else ".json"
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / (key + self.suffix)
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str):
+        """저장된 값 반환 (없음/버전 불일치/손상 시 None)"""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+            if msgpack is not None:
+                entry = msgpack.unpackb(raw, raw=False)
+            else:
+                entry = json.loads(raw.decode('utf-8'))
+        except Exception:  # 파일 없음, JSON/msgpack 손상 데이터
+            self._count(False)
+            return None
+
+        if not isinstance(entry, dict) or entry.get("v") != self.version:
+            self._count(False)
+            return None
+        self._count(True)
+        return entry.get("data")
+
+    def put(self, key: str, value) -> bool:
+        """값 저장 (임시 파일 작성 후 교체), 실패해도 예외 없이 False"""
+        if not self.enabled:
+            return False
+        path = self._path(key)
+        entry = {"v": self.version, "data": value}
+        if msgpack is not None:
+            raw = msgpack.packb(entry, use_bin_type=True)
+        else:
+            raw = json.dumps(entry, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(raw)
+            os.replace(tmp_path, path)
+            return True
+        except OSError:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            return False
+
+    def clear(self) -> int:
+        """저장된 항목 모두 삭제, 삭제한 파일 수 반환"""
+        removed = 0
+        if not self.directory.exists():
+            return 0
+        for path in self.directory.glob("*/*" + self.suffix):
+            try:
+                path.unlink()
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "format": self.suffix.lstrip('.'),
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
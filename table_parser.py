@@ -0,0 +1,588 @@
+"""
+주문서 테이블 파서 백엔드 (Table Parser Backends)
+================================================
+local_file_processor.parse_html_table 의 파싱 엔진을 교체 가능하게 분리
+
+- 기본은 BeautifulSoup(html.parser) (기존 동작)
+- lxml / selectolax 가 설치되어 있으면 빠른 백엔드를 선택할 수 있음 (auto: 설치된 빠른 백엔드 우선)
+- DOM을 만들지 않는 스트리밍 추출기 (iter_table_rows) 제공
+- 모든 백엔드는 9열 행(OrderLine)을 반환:
+  [NO, 품목명(공백), 색상, 품명, 규격, 수량, 단가, 금액, 비고]
+
+정상적인 주문서(fixtures)에서는 모든 백엔드 결과가 bs4 와 같지만 (tests/test_table_parser.py),
+깨진 마크업에서는 다름 → 결과가 bs4 와 같아질 때까지 기본값은 bs4
+- 닫히지 않은 <td>/<tr>: html.parser 는 암시적으로 닫지 않아 셀/행이 중첩됨, lxml/selectolax/stream 은 닫음
+- tbody 없이 thead 안에 <td> 행: selectolax 는 암시적 tbody 를 만들어 thead 행을 제외
+- 셀 안의 중첩 테이블: bs4/lxml/selectolax 는 안쪽 셀/행/텍스트를 포함, stream 은 제외
+
+백엔드 선택: 환경변수 HTML_PARSER_BACKEND (bs4 | auto | lxml | selectolax | stream, 기본 bs4)
+"""
+
+import os
+from html.parser import HTMLParser
+from typing import NamedTuple
+
+# 선택 백엔드 (설치되지 않은 경우 None)
+try:
+    from lxml import etree as _lxml_etree
+    from lxml import html as _lxml_html
+except ImportError:
+    _lxml_etree = None
+    _lxml_html = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as _SelectolaxParser
+except ImportError:
+    _SelectolaxParser = None
+
+# auto 모드에서 시도하는 순서 (깨진 마크업에서 결과가 다를 수 있음, 모듈 설명 참고)
+AUTO_BACKEND_ORDER = ['lxml', 'selectolax', 'bs4']
+
+DEFAULT_BACKEND = os.getenv("HTML_PARSER_BACKEND", "bs4").lower()
+
+# bs4 get_text 에서 제외되는 태그 (스크립트/스타일 문자열)
+_SKIP_TEXT_TAGS = ('script', 'style', 'template')
+
+
+# =================================================================================================
+# 공통 행 검증/매핑 (모든 백엔드 공유)
+# =================================================================================================
+
+class OrderLine(NamedTuple):
+    """주문서 품목 한 줄 (튜플이므로 기존처럼 row[2] 인덱스 접근도 가능)"""
+    no: str
+    product_name: str   # 품목명 (나중에 조합, 항상 공백)
+    color: str
+    item: str
+    spec: str
+    quantity: str
+    unit_price: str
+    amount: str
+    remarks: str
+
+def build_item_row(row_data_raw: list):
+    """셀 텍스트 리스트를 검증하여 9열 OrderLine 으로 변환 (유효하지 않으면 None)"""
+    # 유효성 검사
+    # 1. 데이터가 하나라도 있어야 함
+    if not any(row_data_raw):
+        return None
+    # 2. 첫 열이 '합계'가 아니어야 함
+    if row_data_raw[0] == '합계':
+        return None
+    # 3. 열 개수가 최소 4개 이상 (NO, 색상, 품명, 규격...)
+    if len(row_data_raw) < 4:
+        return None
+    # 4. 첫 열(NO)이 숫자여야 함
+    if row_data_raw[0] and not row_data_raw[0].isdigit():
+        return None
+
+    # 데이터 매핑 (GAS 로직 참조)
+    # resultData 구조: [NO, 품목명(조합), 색상, 품명, 규격, 수량, 단가, 금액, 비고]
+    n = len(row_data_raw)
+    return OrderLine(
+        row_data_raw[0],                          # NO
+        '',                                       # 품목명 (나중에 조합)
+        row_data_raw[1],                          # 색상
+        row_data_raw[2],                          # 품명
+        row_data_raw[3],                          # 규격
+        row_data_raw[4] if n > 4 else '',         # 수량
+        row_data_raw[5] if n > 5 else '',         # 단가
+        row_data_raw[6] if n > 6 else '',         # 금액
+        row_data_raw[7] if n > 7 else '',         # 비고
+    )
+
+
+# =================================================================================================
+# BeautifulSoup 백엔드 (기본/대체)
+# =================================================================================================
+
+def parse_with_bs4(html_content: str) -> list:
+    """BeautifulSoup(html.parser) 기반 파싱 (GAS: parseHtmlTable + parseTableBody)"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html_content, 'html.parser')
+    all_result_data = []
+
+    # 1. table.table-item 찾기
+    tables = soup.find_all('table', class_='table-item')
+
+    if not tables:
+        # 대안: 모든 테이블 검색
+        tables = soup.find_all('table')
+
+    for table in tables:
+        # 데이터가 있는지 확인 (간단한 체크: td 안에 숫자가 있는지)
+        if not table.find('td'):
+            continue
+
+        # 헤더 건너뛰기 로직은 row 루프에서 처리
+        rows = table.find_all('tr')
+        if not rows:
+            continue
+
+        # tbody가 있으면 tbody 우선
+        tbody = table.find('tbody')
+        if tbody:
+            rows = tbody.find_all('tr')
+
+        for row in rows:
+            # 헤더 체크 (th가 있거나 class가 td-header 등)
+            if row.find('th') or 'td-header' in row.get('class', []):
+                continue
+
+            row_data_raw = []
+            for col in row.find_all(['td', 'th']):
+                # div가 있으면 div 내용 사용, 아니면 셀 텍스트
+                div = col.find('div')
+                text = div.get_text(strip=True) if div else col.get_text(strip=True)
+                row_data_raw.append(text)
+
+            new_row = build_item_row(row_data_raw)
+            if new_row is not None:
+                all_result_data.append(new_row)
+
+    return all_result_data
+
+
+# =================================================================================================
+# lxml 백엔드
+# =================================================================================================
+
+def _lxml_collect_text(el, parts: list):
+    for child in el:
+        if isinstance(child.tag, str) and child.tag not in _SKIP_TEXT_TAGS:
+            if child.text:
+                text = child.text.strip()
+                if text:
+                    parts.append(text)
+            _lxml_collect_text(child, parts)
+        # 주석 노드의 tail 은 부모의 텍스트이므로 항상 포함
+        if child.tail:
+            tail = child.tail.strip()
+            if tail:
+                parts.append(tail)
+
+
+def _lxml_text(el) -> str:
+    """bs4 get_text(strip=True) 와 동일: 텍스트 노드별 strip 후 공백 없이 연결"""
+    parts = []
+    if el.text:
+        text = el.text.strip()
+        if text:
+            parts.append(text)
+    _lxml_collect_text(el, parts)
+    return ''.join(parts)
+
+
+def _lxml_has_class(el, class_name: str) -> bool:
+    return class_name in (el.get('class') or '').split()
+
+
+def _lxml_first(el, tag: str):
+    for node in el.iter(tag):
+        if node is not el:
+            return node
+    return None
+
+
+def parse_with_lxml(html_content: str) -> list:
+    """lxml.html 기반 파싱 (정상 마크업에서 bs4 백엔드와 동일한 결과, 닫히지 않은 td/tr 은 다름)"""
+    if not html_content or not html_content.strip():
+        return []
+
+    parser = _lxml_html.HTMLParser(remove_comments=False, recover=True)
+    try:
+        root = _lxml_html.document_fromstring(html_content, parser=parser)
+    except (_lxml_etree.ParserError, ValueError):
+        # 인코딩 선언이 포함된 str 등 - 기존 백엔드로 처리
+        return parse_with_bs4(html_content)
+
+    all_result_data = []
+
+    tables = [t for t in root.iter('table') if _lxml_has_class(t, 'table-item')]
+    if not tables:
+        tables = list(root.iter('table'))
+
+    for table in tables:
+        if _lxml_first(table, 'td') is None:
+            continue
+
+        rows = list(table.iter('tr'))
+        if not rows:
+            continue
+
+        tbody = _lxml_first(table, 'tbody')
+        if tbody is not None:
+            rows = list(tbody.iter('tr'))
+
+        for row in rows:
+            if _lxml_first(row, 'th') is not None or _lxml_has_class(row, 'td-header'):
+                continue
+
+            row_data_raw = []
+            for col in row.iter('td', 'th'):
+                if col is row:
+                    continue
+                div = _lxml_first(col, 'div')
+                row_data_raw.append(_lxml_text(div if div is not None else col))
+
+            new_row = build_item_row(row_data_raw)
+            if new_row is not None:
+                all_result_data.append(new_row)
+
+    return all_result_data
+
+
+# =================================================================================================
+# selectolax (lexbor) 백엔드
+# =================================================================================================
+
+def parse_with_selectolax(html_content: str) -> list:
+    """selectolax(lexbor) 기반 파싱
+
+    HTML5 파서이므로 tbody 가 없는 테이블에도 암시적 tbody 가 생성되어 tbody 행만 읽음
+    → thead/tfoot 안의 <td> 행은 bs4 와 달리 제외됨 (th 헤더/합계 행이면 어차피 걸러지므로 같음)
+    """
+    if not html_content:
+        return []
+
+    tree = _SelectolaxParser(html_content)
+    # bs4 get_text 처럼 스크립트/스타일 문자열은 셀 텍스트에서 제외
+    tree.strip_tags(list(_SKIP_TEXT_TAGS))
+    all_result_data = []
+
+    tables = tree.css('table.table-item')
+    if not tables:
+        tables = tree.css('table')
+
+    for table in tables:
+        if table.css_first('td') is None:
+            continue
+
+        tbody = table.css_first('tbody')
+        rows = tbody.css('tr') if tbody is not None else table.css('tr')
+
+        for row in rows:
+            row_class = (row.attributes.get('class') or '').split()
+            if row.css_first('th') is not None or 'td-header' in row_class:
+                continue
+
+            row_data_raw = []
+            for col in row.css('td'):
+                div = col.css_first('div')
+                target = div if div is not None else col
+                row_data_raw.append(target.text(deep=True, separator='', strip=True))
+
+            new_row = build_item_row(row_data_raw)
+            if new_row is not None:
+                all_result_data.append(new_row)
+
+    return all_result_data
+
+
+# =================================================================================================
+# 스트리밍 추출기 (DOM 미생성)
+# =================================================================================================
+
+# 스트리밍 시 한 번에 토크나이저에 넣는 문자 수
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# tbody 상태
+_TBODY_NONE = 0     # 아직 tbody 없음
+_TBODY_OPEN = 1     # 첫 번째 tbody 안
+_TBODY_CLOSED = 2   # 첫 번째 tbody 종료 (이후 행은 bs4 기준으로 제외)
+
+
+class _TableState:
+    __slots__ = ('is_item', 'tbody_state', 'tbody_depth', 'row', 'held')
+
+    def __init__(self, is_item: bool):
+        self.is_item = is_item
+        self.tbody_state = _TBODY_NONE
+        self.tbody_depth = 0
+        self.row = None
+        self.held = []  # tbody 전에 닫힌 행 (tbody 가 나오면 폐기, 없이 테이블이 끝나면 방출)
+
+
+class _RowState:
+    __slots__ = ('cells', 'has_th', 'is_header', 'in_tbody', 'cell')
+
+    def __init__(self, is_header: bool, in_tbody: bool):
+        self.cells = []
+        self.has_th = False
+        self.is_header = is_header
+        self.in_tbody = in_tbody
+        self.cell = None
+
+
+class _CellState:
+    __slots__ = ('parts', 'div_parts', 'div_depth', 'div_done')
+
+    def __init__(self):
+        self.parts = []
+        self.div_parts = None   # 첫 번째 div 의 텍스트 (div 가 있으면 이것을 사용)
+        self.div_depth = 0
+        self.div_done = False
+
+    def add_text(self, text: str):
+        if self.div_parts is not None:
+            if not self.div_done:
+                self.div_parts.append(text)
+        else:
+            self.parts.append(text)
+
+    def text(self) -> str:
+        return ''.join(self.div_parts if self.div_parts is not None else self.parts)
+
+
+class _ItemRowStream(HTMLParser):
+    """</tr> 이 닫히는 즉시 검증된 9열 행을 ready 에 쌓는 토크나이저
+
+    - table.table-item 의 tbody 행은 즉시 방출
+    - tbody 전에 나온 행(thead 등)은 보류: tbody 가 나오면 폐기, tbody 없이 테이블이 끝나면 방출
+      (bs4 백엔드는 tbody 가 있으면 tbody 행만 읽음)
+    - table-item 이 아직 없을 때의 일반 테이블 행은 대안(fallback)으로만 보관하고,
+      table-item 이 나타나면 폐기 (bs4 백엔드의 '대안: 모든 테이블' 규칙)
+    - 중첩 테이블의 셀 텍스트는 바깥 셀에 포함하지 않음
+    """
+
+    def __init__(self, stop_after_item_table: bool = True):
+        super().__init__(convert_charrefs=True)
+        self.stop_after_item_table = stop_after_item_table
+        self.ready = []
+        self.fallback_rows = []
+        self.item_table_seen = False
+        self.done = False
+        self._tables = []
+        self._skip_depth = 0
+
+    # ---- 행/셀 종료 처리 ----
+    def _close_cell(self, row):
+        if row.cell is not None:
+            row.cells.append(row.cell.text())
+            row.cell = None
+
+    def _close_row(self, table):
+        row = table.row
+        if row is None:
+            return
+        self._close_cell(row)
+        table.row = None
+
+        # 헤더 체크 (th가 있거나 class가 td-header 등)
+        if row.has_th or row.is_header:
+            return
+        # 첫 번째 tbody 가 끝난 뒤의 행은 bs4 에서도 제외
+        if table.tbody_state == _TBODY_CLOSED and not row.in_tbody:
+            return
+
+        new_row = build_item_row(row.cells)
+        if new_row is None:
+            return
+        if table.tbody_state == _TBODY_NONE:
+            table.held.append(new_row)
+            return
+        self._emit(table, new_row)
+
+    def _emit(self, table, new_row):
+        if table.is_item:
+            self.ready.append(new_row)
+        elif not self.item_table_seen:
+            self.fallback_rows.append(new_row)
+
+    # ---- HTMLParser 콜백 ----
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag in _SKIP_TEXT_TAGS:
+            self._skip_depth += 1
+            return
+
+        if tag == 'table':
+            classes = (dict(attrs).get('class') or '').split()
+            is_item = 'table-item' in classes
+            if is_item and not self.item_table_seen:
+                self.item_table_seen = True
+                self.fallback_rows = []
+            self._tables.append(_TableState(is_item))
+            return
+
+        if not self._tables:
+            return
+        table = self._tables[-1]
+
+        if tag == 'tbody':
+            if table.tbody_state == _TBODY_NONE:
+                # tbody 가 있으면 그 전의 행은 쓰지 않음
+                self._close_row(table)
+                table.held = []
+                table.tbody_state = _TBODY_OPEN
+            if table.tbody_state == _TBODY_OPEN:
+                table.tbody_depth += 1
+        elif tag == 'tr':
+            self._close_row(table)
+            classes = (dict(attrs).get('class') or '').split()
+            table.row = _RowState('td-header' in classes, table.tbody_state == _TBODY_OPEN)
+        elif tag in ('td', 'th'):
+            row = table.row
+            if row is None:
+                return
+            self._close_cell(row)
+            if tag == 'th':
+                row.has_th = True
+            row.cell = _CellState()
+        elif tag == 'div':
+            row = table.row
+            if row is None or row.cell is None:
+                return
+            cell = row.cell
+            if cell.div_parts is None:
+                cell.div_parts = []
+                cell.div_depth = 1
+            elif not cell.div_done:
+                cell.div_depth += 1
+
+    def handle_endtag(self, tag):
+        if self.done:
+            return
+        if tag in _SKIP_TEXT_TAGS:
+            if self._skip_depth:
+                self._skip_depth -= 1
+            return
+        if not self._tables:
+            return
+        table = self._tables[-1]
+
+        if tag == 'table':
+            self._close_row(table)
+            if table.tbody_state == _TBODY_NONE:
+                for new_row in table.held:
+                    self._emit(table, new_row)
+            self._tables.pop()
+            if table.is_item and self.stop_after_item_table:
+                self.done = True
+        elif tag == 'tbody':
+            if table.tbody_state == _TBODY_OPEN:
+                table.tbody_depth -= 1
+                if table.tbody_depth <= 0:
+                    self._close_row(table)
+                    table.tbody_state = _TBODY_CLOSED
+        elif tag == 'tr':
+            self._close_row(table)
+        elif tag in ('td', 'th'):
+            if table.row is not None:
+                self._close_cell(table.row)
+        elif tag == 'div':
+            row = table.row
+            if row is None or row.cell is None:
+                return
+            cell = row.cell
+            if cell.div_parts is not None and not cell.div_done:
+                cell.div_depth -= 1
+                if cell.div_depth <= 0:
+                    cell.div_done = True
+
+    def handle_data(self, data):
+        if self.done or self._skip_depth or not self._tables:
+            return
+        row = self._tables[-1].row
+        if row is None or row.cell is None:
+            return
+        # bs4 get_text(strip=True) 와 동일하게 텍스트 노드 단위로 strip
+        text = data.strip()
+        if text:
+            row.cell.add_text(text)
+
+    def drain(self) -> list:
+        rows = self.ready
+        self.ready = []
+        return rows
+
+
+def _iter_chunks(source, chunk_size: int):
+    if isinstance(source, str):
+        for i in range(0, len(source), chunk_size):
+            yield source[i:i + chunk_size]
+    elif hasattr(source, 'read'):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    else:
+        yield from source
+
+
+def iter_table_rows(source, stop_after_item_table: bool = True, chunk_size: int = STREAM_CHUNK_SIZE):
+    """DOM 없이 주문서 테이블 행을 하나씩 반환 (generator)
+
+    Args:
+        source: HTML 문자열, 텍스트 파일 객체, 또는 문자열 청크의 iterable
+        stop_after_item_table: True면 첫 table.table-item 이 끝나는 즉시 중단
+        chunk_size: 문자열/파일 입력을 나눌 크기
+
+    행 검증 규칙은 build_item_row 를 그대로 사용하므로 다른 백엔드와 동일.
+    table-item 이 없는 문서는 끝까지 읽은 뒤 대안(모든 테이블) 행을 반환.
+    """
+    stream = _ItemRowStream(stop_after_item_table=stop_after_item_table)
+    for chunk in _iter_chunks(source, chunk_size):
+        stream.feed(chunk)
+        yield from stream.drain()
+        if stream.done:
+            return
+    stream.close()
+    yield from stream.drain()
+    if not stream.item_table_seen:
+        yield from stream.fallback_rows
+
+
+def parse_with_stream(html_content: str) -> list:
+    """스트리밍 추출기 백엔드 (모든 table-item 을 읽음, 중첩 테이블은 제외하므로 그런 문서는 bs4 와 다름)"""
+    if not html_content:
+        return []
+    return list(iter_table_rows(html_content, stop_after_item_table=False))
+
+
+# =================================================================================================
+# 백엔드 선택
+# =================================================================================================
+
+PARSER_BACKENDS = {
+    'lxml': parse_with_lxml,
+    'selectolax': parse_with_selectolax,
+    'stream': parse_with_stream,
+    'bs4': parse_with_bs4,
+}
+
+
+def available_backends() -> list:
+    """현재 환경에서 사용 가능한 백엔드 이름 목록 (auto 우선순위 순)"""
+    available = []
+    if _lxml_html is not None:
+        available.append('lxml')
+    if _SelectolaxParser is not None:
+        available.append('selectolax')
+    available.append('stream')
+    available.append('bs4')
+    return available
+
+
+def resolve_backend(name: str = None) -> str:
+    """요청된 백엔드 이름을 실제 사용할 백엔드로 변환 (미설치 시 bs4)"""
+    name = (name or DEFAULT_BACKEND).lower()
+    available = available_backends()
+
+    if name == 'auto':
+        for candidate in AUTO_BACKEND_ORDER:
+            if candidate in available:
+                return candidate
+
+    if name in available:
+        return name
+
+    return 'bs4'
+
+
+def parse_table(html_content: str, backend: str = None) -> list:
+    """선택된 백엔드로 주문서 테이블 파싱"""
+    return PARSER_BACKENDS[resolve_backend(backend)](html_content)
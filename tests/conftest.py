@@ -0,0 +1,7 @@
+import os
+import sys
+
+# 저장소 루트 모듈(local_file_processor, lock_manager ...)을 그대로 import
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
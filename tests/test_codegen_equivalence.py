@@ -0,0 +1,67 @@
+"""
+품목코드 생성 동일성 검사 (규칙 엔진 / 키워드 오토마톤 vs legacy_codegen)
+benchmarks/bench_code_rules.py, bench_keyword_classifier.py 의 검사를 assert 로 옮김
+"""
+
+import os
+import sys
+
+import pytest
+
+import keyword_matcher
+import local_file_processor
+from conftest import ROOT_DIR
+
+sys.path.insert(0, os.path.join(ROOT_DIR, "benchmarks"))
+import legacy_codegen  # noqa: E402
+from bench_code_rules import ITEMS, SPECS, REMARKS, make_rows, run_pipeline  # noqa: E402
+from bench_keyword_classifier import load_item_names, make_fuzz_names  # noqa: E402
+
+FIXTURE_PATTERNS = [os.path.join(ROOT_DIR, "fixtures", "pages", "*.html")]
+
+CLASSIFIERS = {
+    'classify_target': lambda m, n: m.classify_target(n),
+    'generate_flag_code': lambda m, n: m.generate_flag_code(n),
+    'generate_molding_flag_code': lambda m, n: m.generate_molding_flag_code(n),
+    'generate_rail_code': lambda m, n: m.generate_rail_code(n),
+    'generate_model_code': lambda m, n: m.generate_model_code(n),
+    'generate_unit': lambda m, n: tuple(m.generate_unit(n, s, r) for s in SPECS[:4] for r in REMARKS[:2]),
+}
+
+
+@pytest.fixture(scope="module")
+def item_names():
+    return load_item_names(FIXTURE_PATTERNS) + ITEMS + make_fuzz_names(5_000, seed=42)
+
+
+@pytest.mark.parametrize("seed", [7, 2026])
+def test_product_fields_match_legacy(seed):
+    rows = make_rows(5_000, seed)
+    expected = run_pipeline(legacy_codegen, rows)
+    actual = run_pipeline(local_file_processor, rows)
+    mismatches = [(row, exp, act) for row, exp, act in zip(rows, expected, actual) if exp != act]
+    assert not mismatches, mismatches[:5]
+
+
+@pytest.mark.parametrize("func_name", list(CLASSIFIERS))
+def test_classifiers_match_legacy(func_name, item_names):
+    call = CLASSIFIERS[func_name]
+    mismatches = [(name, call(legacy_codegen, name), call(local_file_processor, name))
+                  for name in item_names if call(legacy_codegen, name) != call(local_file_processor, name)]
+    assert not mismatches, mismatches[:5]
+
+
+def test_python_automaton_matches_native(item_names):
+    keywords = local_file_processor.ITEM_KEYWORD_AUTOMATON.keywords
+    python_automaton = keyword_matcher.KeywordAutomaton(keywords, use_native=False)
+    assert python_automaton.backend == 'python'
+    for name in item_names:
+        expected = {k: sorted(i for i in range(len(name)) if name.startswith(k, i))
+                    for k in keywords if k in name}
+        assert python_automaton.scan(name) == expected, name
+
+
+def test_fixture_pages_produce_item_names():
+    # 동일성 검사가 빈 입력으로 통과하지 않도록
+    names = load_item_names(FIXTURE_PATTERNS)
+    assert names and all(names)
@@ -0,0 +1,101 @@
+"""
+완료 주문 필터 테스트
+=====================
+- 추가한 주문은 항상 있다고 답함 (거짓 음성 없음), 처음 보는 주문의 오탐률은 error_rate 근처
+- 용량이 차면 층을 늘려 계속 추가
+- 저장 → 다시 열기에서 그대로 유지, 손상/다른 버전 파일은 예외 없이 빈 필터로 시작
+"""
+
+import pytest
+
+from completed_filter import _HEADER, _MAGIC, CompletedOrderFilter
+
+
+def _order_ids(prefix, count):
+    return [f"{prefix}{n:06d}" for n in range(count)]
+
+
+def _false_positive_rate(bloom, samples=20000):
+    return sum(bloom.might_contain(order_id) for order_id in _order_ids("NEW", samples)) / samples
+
+
+def test_no_false_negatives():
+    bloom = CompletedOrderFilter(capacity=1000, error_rate=1e-3)
+    order_ids = _order_ids("ORD", 1000)
+    assert bloom.add_many(order_ids) == 1000
+    assert all(bloom.might_contain(order_id) for order_id in order_ids)
+    assert not bloom.add(order_ids[0])
+    assert bloom.count == 1000
+
+    assert _false_positive_rate(bloom) <= 1e-3 * 3
+
+
+def test_layers_grow_past_initial_capacity():
+    bloom = CompletedOrderFilter(capacity=50, error_rate=1e-4)
+    order_ids = _order_ids("ORD", 400)
+    bloom.add_many(order_ids)
+
+    # 50 + 100 + 200 + 400 → 4층, 층마다 오탐률 절반
+    assert bloom.stats()["layers"] == 4
+    assert [layer.capacity for layer in bloom._layers] == [50, 100, 200, 400]
+    assert all(later.error_rate == earlier.error_rate / 2
+               for earlier, later in zip(bloom._layers, bloom._layers[1:]))
+    assert bloom.count == 400
+    assert all(bloom.might_contain(order_id) for order_id in order_ids)
+    assert _false_positive_rate(bloom) <= 1e-4 * 3
+
+
+def test_save_and_reload_keeps_membership(tmp_path):
+    path = tmp_path / "completed.bloom"
+    bloom = CompletedOrderFilter(path, capacity=50, error_rate=1e-4)
+    order_ids = _order_ids("ORD", 120)
+    bloom.add_many(order_ids)
+    assert bloom.save()
+    assert not bloom.save()  # 변경 없으면 쓰지 않음
+    assert not path.with_name(path.name + '.tmp').exists()
+
+    reloaded = CompletedOrderFilter(path, capacity=50, error_rate=1e-4)
+    assert reloaded.stats() == bloom.stats()
+    assert all(reloaded.might_contain(order_id) for order_id in order_ids)
+
+    # 다시 연 필터에 추가해도 마지막 층부터 이어서 채움
+    assert reloaded.add("ORD-NEW")
+    assert reloaded.stats()["layers"] == bloom.stats()["layers"]
+
+
+def test_missing_file_starts_empty(tmp_path):
+    bloom = CompletedOrderFilter(tmp_path / "missing.bloom", capacity=10)
+    assert bloom.count == 0
+    assert bloom.stats()["layers"] == 1
+    assert not bloom.might_contain("ORD000001")
+
+
+def _saved_bytes(tmp_path):
+    bloom = CompletedOrderFilter(tmp_path / "good.bloom", capacity=50, error_rate=1e-4)
+    bloom.add_many(_order_ids("ORD", 120))
+    bloom.save()
+    return (tmp_path / "good.bloom").read_bytes()
+
+
+@pytest.mark.parametrize("corrupt", [
+    pytest.param(lambda data: b'', id="empty"),
+    pytest.param(lambda data: b'\x00' * 64, id="garbage"),
+    pytest.param(lambda data: data[:_HEADER.size + 10], id="truncated_header"),
+    pytest.param(lambda data: data[:len(data) // 2], id="truncated_bits"),
+    pytest.param(lambda data: b'BLM1' + data[len(_MAGIC):], id="old_hash_positions"),
+    pytest.param(lambda data: _HEADER.pack(_MAGIC, 99) + data[_HEADER.size:], id="wrong_layer_count"),
+])
+def test_corrupt_file_falls_back_to_empty(tmp_path, capsys, corrupt):
+    path = tmp_path / "completed.bloom"
+    path.write_bytes(corrupt(_saved_bytes(tmp_path)))
+
+    bloom = CompletedOrderFilter(path, capacity=50, error_rate=1e-4)
+    assert bloom.count == 0
+    assert bloom.stats()["layers"] == 1
+    assert not bloom.might_contain("ORD000001")
+    assert "새로 시작" in capsys.readouterr().out
+
+    # 다시 채워 저장하면 정상 파일로 덮어씀
+    bloom.add("ORD000001")
+    assert bloom.save()
+    assert CompletedOrderFilter(path, capacity=50, error_rate=1e-4).might_contain("ORD000001")
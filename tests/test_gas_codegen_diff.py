@@ -0,0 +1,64 @@
+"""
+GAS ↔ Python 품목코드 차등 검사 (benchmarks/diff_gas_codegen) 를 작은 코퍼스로 실행
+==================================================================================
+- 모든 불일치가 문서화된 이식 차이(KNOWN_DIVERGENCE_CLASSES)에 해당해야 함
+- Node.js 가 없으면 건너뜀
+- fixture 주문서를 읽어도 파싱 캐시 디렉터리에 쓰지 않음
+"""
+
+import os
+import shutil
+import sys
+
+import pytest
+
+from conftest import ROOT_DIR
+
+NODE = shutil.which("node") or shutil.which("nodejs")
+pytestmark = pytest.mark.skipif(not NODE, reason="Node.js 가 없음")
+
+sys.path.insert(0, os.path.join(ROOT_DIR, "benchmarks"))
+import diff_gas_codegen  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def rows():
+    return list(dict.fromkeys(diff_gas_codegen.load_fixture_rows(diff_gas_codegen.DEFAULT_PATTERNS)
+                              + diff_gas_codegen.make_rows(2000, 42)
+                              + diff_gas_codegen.make_fuzz_rows(2000, 42)))
+
+
+def test_only_documented_divergences(rows):
+    divergences, _, _ = diff_gas_codegen.compare(rows, list(diff_gas_codegen.FUNCTIONS), NODE)
+    unexplained = {name: [item["args"] for item in items if item["known"] is None]
+                   for name, items in divergences.items()}
+    assert {name: args for name, args in unexplained.items() if args} == {}
+
+
+def test_main_exit_code(capsys):
+    argv = ["--rows", "300", "--fuzz", "300", "--examples", "0", "--node", NODE]
+    assert diff_gas_codegen.main(argv) == 0
+    # 퍼징 코퍼스에는 알려진 차이가 있으므로 --strict 는 실패
+    assert diff_gas_codegen.main(argv + ["--strict"]) == 1
+    assert "알려진 이식 차이" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("call_args, expected", [
+    (["２문틀", "", ""], 'unicode_digit'),
+    (["일반형٣60MM"], 'unicode_digit'),
+    (["예림예림화이트", "Y"], 'replace_first'),
+    (["화이트", "Y"], None),
+    (["문틀 2100", "12", ""], None),
+])
+def test_classify_divergence(call_args, expected):
+    assert diff_gas_codegen.classify_divergence(call_args) == expected
+
+
+def test_fixture_rows_do_not_touch_parse_cache(monkeypatch, tmp_path):
+    cache = diff_gas_codegen.lfp.PARSE_CACHE
+    monkeypatch.setattr(cache, "directory", tmp_path)
+    monkeypatch.setattr(cache, "enabled", True)
+
+    assert diff_gas_codegen.load_fixture_rows(diff_gas_codegen.DEFAULT_PATTERNS)
+    assert list(tmp_path.iterdir()) == []
+    assert cache.enabled
@@ -0,0 +1,282 @@
+"""
+history_store 백엔드 테스트
+===========================
+- sqlite: 기존 JSON 이력을 한 번만 가져옴, 손상된 JSON 은 가져오지 않고 HistoryCorruptError
+- journal: 쓰다 만 마지막 줄은 다시 열 때 잘라 냄 (다음 추가가 이어 붙지 않음), 압축, 같은 객체를 읽는 스레드
+- json  : 그룹 커밋이 성공한 뒤에만 메모리에 반영, 기록 실패는 호출자에게 예외
+"""
+
+import json
+import sqlite3
+import threading
+
+import pytest
+
+import history_store
+
+
+def _meta(db_path, key):
+    conn = sqlite3.connect(str(db_path))
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    finally:
+        conn.close()
+
+
+def test_sqlite_migrates_legacy_json_once(tmp_path):
+    json_path = tmp_path / "v10_history.json"
+    db_path = tmp_path / "history.db"
+    json_path.write_text(json.dumps({"ledger": ["L1", "L2"], "estimate": ["E1"]}), encoding='utf-8')
+
+    store = history_store.SqliteHistoryStore(db_path, legacy_json_path=json_path)
+    assert store.migrated == 3
+    assert store.ids('ledger') == {"L1", "L2"}
+    store.close()
+    assert _meta(db_path, "migrated_from") == str(json_path)
+
+    # 다시 열어도 가져오지 않음 (JSON 에 나중에 추가된 건은 무시)
+    json_path.write_text(json.dumps({"ledger": ["L1", "L2", "L3"]}), encoding='utf-8')
+    store = history_store.SqliteHistoryStore(db_path, legacy_json_path=json_path)
+    assert store.migrated == 0
+    assert store.ids('ledger') == {"L1", "L2"}
+    store.close()
+
+
+def test_sqlite_migrates_old_list_format(tmp_path):
+    json_path = tmp_path / "v10_history.json"
+    json_path.write_text(json.dumps(["L1", 2]), encoding='utf-8')
+
+    store = history_store.SqliteHistoryStore(tmp_path / "history.db", legacy_json_path=json_path)
+    assert store.ids('ledger') == {"L1", "2"}
+    store.close()
+
+
+@pytest.mark.parametrize("content", ['{"ledger": ["L1", "L2"', '', '\x00\x00\x00'])
+def test_sqlite_corrupt_legacy_json_is_not_migrated(tmp_path, content):
+    json_path = tmp_path / "v10_history.json"
+    db_path = tmp_path / "history.db"
+    json_path.write_text(content, encoding='utf-8')
+
+    with pytest.raises(history_store.HistoryCorruptError):
+        history_store.SqliteHistoryStore(db_path, legacy_json_path=json_path)
+    with pytest.raises(history_store.HistoryCorruptError):
+        history_store.open_history_store('sqlite', db_path=db_path, json_path=json_path)
+    assert _meta(db_path, "migrated_from") is None
+
+    # 파일을 복구하면 그때 가져옴
+    json_path.write_text(json.dumps({"ledger": ["L1", "L2"]}), encoding='utf-8')
+    store = history_store.SqliteHistoryStore(db_path, legacy_json_path=json_path)
+    assert store.migrated == 2
+    assert store.ids('ledger') == {"L1", "L2"}
+    store.close()
+
+
+def test_sqlite_without_legacy_json_starts_empty(tmp_path):
+    store = history_store.SqliteHistoryStore(tmp_path / "history.db",
+                                             legacy_json_path=tmp_path / "missing.json")
+    assert store.counts() == {'ledger': 0, 'estimate': 0}
+    assert store.add('ledger', "L1")
+    assert not store.add('ledger', "L1")
+    store.close()
+
+
+def _journal_store(tmp_path, **kwargs):
+    kwargs.setdefault('fsync_interval', 0)
+    return history_store.JournalHistoryStore(tmp_path / "v10_history.json", **kwargs)
+
+
+def test_journal_torn_tail_is_dropped_before_append(tmp_path):
+    store = _journal_store(tmp_path)
+    store.add('ledger', "A")
+    store._journal.close()  # 압축 없이 "죽음"
+    journal_path = store.journal_path
+    with open(journal_path, 'a', encoding='utf-8') as f:
+        f.write('{"t": "ledger", "id": "TO')
+
+    store = _journal_store(tmp_path)
+    assert store.ids('ledger') == {"A"}
+    assert store.add('ledger', "B")
+    store._journal.close()
+    assert journal_path.read_text(encoding='utf-8').splitlines() == [
+        '{"t": "ledger", "id": "A"}', '{"t": "ledger", "id": "B"}']
+
+    store = _journal_store(tmp_path)
+    assert store.ids('ledger') == {"A", "B"}
+    store.close()
+
+
+def test_journal_bad_line_in_the_middle_keeps_later_lines(tmp_path):
+    store = _journal_store(tmp_path)
+    store._journal.close()
+    store.journal_path.write_text('{"t": "ledger", "id": "A"}\n{"t": "led\n{"t": "estimate", "id": "E"}\n',
+                                  encoding='utf-8')
+
+    store = _journal_store(tmp_path)
+    assert store.as_dict() == {'ledger': ["A"], 'estimate': ["E"]}
+    assert store.journal_lines == 2
+    store.add('ledger', "B")
+    store.close()
+    assert _journal_store(tmp_path).as_dict() == {'ledger': ["A", "B"], 'estimate': ["E"]}
+
+
+def test_journal_compaction(tmp_path):
+    store = _journal_store(tmp_path, compact_every=3)
+    store.add_many('ledger', ["A", "B"])
+    store.add('estimate', "E")
+    assert store.journal_lines == 3
+    store.compact()
+    assert store.journal_lines == 0
+    assert store.stats()['compactions'] == 1
+    assert store.journal_path.read_text(encoding='utf-8') == ''
+    assert json.loads(store.snapshot_path.read_text(encoding='utf-8')) == {'ledger': ["A", "B"], 'estimate': ["E"]}
+
+    # 압축 뒤 추가분은 저널에만, 다시 열면 스냅샷 + 저널
+    store.add('ledger', "C")
+    store._journal.close()
+    assert _journal_store(tmp_path).as_dict() == {'ledger': ["A", "B", "C"], 'estimate': ["E"]}
+
+
+def test_journal_background_flush_and_compaction(tmp_path):
+    store = _journal_store(tmp_path, fsync_interval=0.01, compact_every=5)
+    store.add_many('ledger', [f"L{n}" for n in range(6)])
+    for _ in range(200):
+        if store.stats()['compactions']:
+            break
+        threading.Event().wait(0.01)
+    assert store.stats()['compactions'] >= 1
+    store.close()
+    assert _journal_store(tmp_path).count('ledger') == 6
+
+
+def test_journal_shared_by_readers(tmp_path):
+    # 다운로더/업로더/대시보드가 같은 객체를 공유: 쓰는 동안 읽는 스레드도 기록된 주문을 바로 봄
+    store = _journal_store(tmp_path)
+    order_ids = [f"L{n}" for n in range(300)]
+    errors = []
+    done = threading.Event()
+
+    def reader():
+        while not done.is_set():
+            seen = store.ids('ledger')
+            # 추가 순서대로 보임 (중간이 빠진 상태는 없음)
+            if seen and seen != set(order_ids[:len(seen)]):
+                errors.append(len(seen))
+            done.wait(0.001)
+
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    for t in readers:
+        t.start()
+    for order_id in order_ids:
+        store.add('ledger', order_id)
+        assert store.contains('ledger', order_id)
+    done.set()
+    for t in readers:
+        t.join()
+    assert errors == []
+
+    # 같은 파일을 여는 다른 프로세스 (재시작)도 같은 이력을 읽음
+    store.flush()
+    assert _journal_store(tmp_path).ids('ledger') == set(order_ids)
+    store.close()
+
+
+def test_json_add_many_is_visible_after_commit(tmp_path):
+    path = tmp_path / "v10_history.json"
+    store = history_store.JsonHistoryStore(path, commit_window=0.01)
+    assert store.add_many('ledger', ["L1", "L2", "L1"]) == 2
+    assert store.add_many('ledger', ["L2", "L3"]) == 1
+    assert json.loads(path.read_text(encoding='utf-8'))['ledger'] == ["L1", "L2", "L3"]
+    assert history_store.JsonHistoryStore(path).ids('ledger') == {"L1", "L2", "L3"}
+
+
+def test_json_failed_commit_is_not_applied(tmp_path, monkeypatch):
+    path = tmp_path / "v10_history.json"
+    store = history_store.JsonHistoryStore(path, commit_window=0.01)
+    store.add('ledger', "L1")
+
+    def fail_write(path, data):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(history_store, "write_json_atomic", fail_write)
+        with pytest.raises(OSError):
+            store.add_many('ledger', ["L2", "L3"])
+    assert not store.contains('ledger', "L2")
+    assert store.ids('ledger') == {"L1"}
+    assert json.loads(path.read_text(encoding='utf-8'))['ledger'] == ["L1"]
+
+    # 다시 시도하면 새로 추가된 것으로 기록
+    assert store.add_many('ledger', ["L2", "L3"]) == 2
+    assert json.loads(path.read_text(encoding='utf-8'))['ledger'] == ["L1", "L2", "L3"]
+
+
+def test_json_concurrent_adds_share_commits(tmp_path):
+    path = tmp_path / "v10_history.json"
+    store = history_store.JsonHistoryStore(path, commit_window=0.02)
+    added = []
+
+    def worker(n):
+        # 모든 스레드가 같은 "shared" 를 추가 → 한 스레드만 새로 추가한 것으로 셈
+        added.append(store.add_many('estimate', [f"E{n}", "shared"]))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sum(added) == 17
+    assert store.count('estimate') == 17
+    assert store.stats()['commits'] < 16
+    assert set(json.loads(path.read_text(encoding='utf-8'))['estimate']) == store.ids('estimate')
+
+
+def test_group_commit_failure_does_not_over_count(tmp_path):
+    calls = []
+
+    def commit_fn():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError("disk full")
+
+    committer = history_store.GroupCommitter(commit_fn, window=0.2)
+    results = {}
+
+    def submit(name, count):
+        try:
+            committer.submit(count)
+            results[name] = "ok"
+        except OSError:
+            results[name] = "failed"
+
+    leader = threading.Thread(target=submit, args=("leader", 2))
+    follower = threading.Thread(target=submit, args=("follower", 3))
+    leader.start()
+    threading.Event().wait(0.05)  # 리더의 커밋 창 안에 도착
+    follower.start()
+    leader.join()
+    follower.join()
+
+    assert results == {"leader": "failed", "follower": "ok"}
+    stats = committer.stats()
+    assert stats["commits"] == 1
+    assert stats["entries"] == 3
+    assert stats["batch_last"] == 3
+    assert stats["batch_max"] == 3
+
+
+def test_json_failed_commit_metrics(tmp_path, monkeypatch):
+    store = history_store.JsonHistoryStore(tmp_path / "v10_history.json", commit_window=0.01)
+    store.add('ledger', "L1")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(history_store, "write_json_atomic", lambda path, data: (_ for _ in ()).throw(OSError("full")))
+        with pytest.raises(OSError):
+            store.add_many('ledger', ["L2", "L3"])
+    store.add('ledger', "L4")
+
+    stats = store.stats()
+    assert stats["commits"] == 2
+    assert stats["entries"] == 2
+    assert stats["batch_max"] == 1
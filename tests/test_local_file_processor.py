@@ -0,0 +1,26 @@
+"""
+local_file_processor MHTML 추출 테스트
+======================================
+- extract_html_from_mhtml: 경계선(--) 전까지 HTML 을 추출, QP 소프트 줄바꿈 다음의 '-->' 는 경계선이 아님
+"""
+
+import local_file_processor as lfp
+
+
+def _mhtml(body: str, newline: str = "\n") -> str:
+    lines = ["MIME-Version: 1.0", 'Content-Type: multipart/related; boundary="B"', "", "--B",
+             "Content-Type: text/html; charset=utf-8", "Content-Transfer-Encoding: quoted-printable", "",
+             body, "--B--", ""]
+    return newline.join(lines)
+
+
+def test_extract_stops_at_boundary():
+    assert lfp.extract_html_from_mhtml(_mhtml("<html><body>A</body></html>")) == "<html><body>A</body></html>"
+
+
+def test_extract_soft_line_break_before_comment_end():
+    # 76자 줄 나눔이 주석 끝 '-->' 바로 앞에 걸린 경우: 예전 정규식은 여기서 잘랐음
+    for newline in ("\n", "\r\n"):
+        body = newline.join(["<html><body><!-- note =", "--><table><tr><td>1</td></tr></table></body></html>"])
+        html = lfp.extract_html_from_mhtml(_mhtml(body, newline))
+        assert html == "<html><body><!-- note --><table><tr><td>1</td></tr></table></body></html>"
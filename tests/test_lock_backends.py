@@ -0,0 +1,95 @@
+"""
+sheets 락 백엔드 행 번호 캐시 테스트 (가짜 시트 MemoryWorksheet)
+=================================================================
+- 다른 PC의 정리(cleanup)로 행이 지워지거나 시트 중간에 행이 끼어들어 캐시의 행 번호가 어긋나면,
+  그 행에 쓰지 않고 어긋남을 감지해 시트를 다시 읽은 뒤 올바른 행에 씀
+"""
+
+import logging
+
+import pytest
+
+import lock_backends
+
+STATUS_PROCESSING = lock_backends.STATUS_PROCESSING
+STATUS_COMPLETED = lock_backends.STATUS_COMPLETED
+
+
+@pytest.fixture
+def worksheet():
+    logging.disable(logging.WARNING)
+    yield lock_backends.MemoryWorksheet()
+    logging.disable(logging.NOTSET)
+
+
+def _backend(worksheet):
+    # 캐시 TTL 을 길게: 테스트 중에는 캐시의 행 번호를 그대로 믿는 상태
+    backend = lock_backends.MemoryLockBackend(worksheet=worksheet, settle=0, cache_ttl=600, cache_full_refresh=600)
+    backend.connect()
+    return backend
+
+
+def _always(order_id, row):
+    return True
+
+
+def _sheet(worksheet):
+    """{order_id: (행 번호, 상태, 처리 PC)}"""
+    return {row[0]: (idx, row[3], row[4]) for idx, row in enumerate(worksheet.get_all_values()[1:], start=2)}
+
+
+@pytest.fixture
+def locked(worksheet):
+    """pc01 이 A1~A4 를 잡고 캐시에 행 번호 2~5 를 기억한 상태"""
+    backend = _backend(worksheet)
+    tokens = backend.acquire_many(["A1", "A2", "A3", "A4"], "pc01", "", _always)
+    assert tokens == {"A1": 1, "A2": 1, "A3": 1, "A4": 1}
+    assert backend.get("A3") is not None
+    assert backend._row_index == {"A1": 2, "A2": 3, "A3": 4, "A4": 5}
+    return backend, tokens
+
+
+def test_release_after_other_machine_deletes_rows(worksheet, locked):
+    backend, tokens = locked
+    # 다른 PC가 A1 행을 정리 → A2~A4 가 한 칸씩 올라감 (pc01 의 캐시: A3 = 4행, 지금 4행은 A4)
+    other = _backend(worksheet)
+    assert other.cleanup(lambda row: row[0] == "A1") == 1
+    assert _sheet(worksheet)["A4"][0] == 4
+
+    invalidations = backend.stats()["invalidations"]
+    assert backend.release("A3", STATUS_COMPLETED, machine_id="pc01", token=tokens["A3"])
+    assert backend.stats()["invalidations"] > invalidations
+
+    sheet = _sheet(worksheet)
+    assert sheet["A3"] == (3, STATUS_COMPLETED, "pc01")
+    assert sheet["A4"] == (4, STATUS_PROCESSING, "pc01")
+    assert sheet["A2"] == (2, STATUS_PROCESSING, "pc01")
+    assert backend._row_index["A3"] == 3
+
+
+def test_read_after_row_inserted_above(worksheet, locked):
+    backend, tokens = locked
+    # 누군가 시트 중간(헤더 바로 아래)에 행을 끼워 넣음 → 모든 행이 한 칸씩 내려감
+    with worksheet._lock:
+        worksheet._rows.insert(1, ["X0", "pc09", "", STATUS_COMPLETED, "pc09", "", "1", "1", "0"])
+
+    row = backend.read("A2")
+    assert row[0] == "A2"
+    assert backend._row_index["A2"] == 4
+
+    assert backend.release("A4", STATUS_COMPLETED, machine_id="pc01", token=tokens["A4"])
+    sheet = _sheet(worksheet)
+    assert sheet["A4"] == (6, STATUS_COMPLETED, "pc01")
+    assert sheet["A3"] == (5, STATUS_PROCESSING, "pc01")
+    assert sheet["X0"] == (2, STATUS_COMPLETED, "pc09")
+
+
+def test_release_of_deleted_order_writes_nothing(worksheet, locked):
+    backend, tokens = locked
+    other = _backend(worksheet)
+    assert other.cleanup(lambda row: row[0] in ("A2", "A3")) == 2
+    before = worksheet.get_all_values()
+
+    # 캐시의 3행(A2)에는 지금 A4 가 있음 → 쓰지 않고, 다시 읽어도 A2 가 없으면 해제 실패
+    assert not backend.release("A2", STATUS_COMPLETED, machine_id="pc01", token=tokens["A2"])
+    assert worksheet.get_all_values() == before
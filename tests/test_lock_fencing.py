@@ -0,0 +1,220 @@
+"""
+락 Compare-and-Set / 펜싱 토큰 테스트
+====================================
+- validate_token: 락을 잡은 주문은 확인할 수 없으면 (연결 끊김/레코드 없음/읽기 오류) 업로드 거부
+- 기한: 행의 expires_at (잡은 PC의 UTC 시각 + 기한), 다른 PC는 시계 오차 여유(CLOCK_SKEW_SEC)만큼 더 기다림
+- benchmarks/stress_lock_fencing 시나리오를 짧게 돌려 위반(중복 획득/토큰 역행/중복 업로드/낡은 해제/미완료)이 없는지 확인
+"""
+
+import datetime
+import logging
+import os
+import sqlite3
+import sys
+import time
+
+import pytest
+
+import lock_backends
+from conftest import ROOT_DIR
+from lock_manager import DistributedLockManager
+
+sys.path.insert(0, os.path.join(ROOT_DIR, "benchmarks"))
+import stress_lock_fencing  # noqa: E402
+
+
+@pytest.fixture
+def quiet_logs():
+    # 경합/거부 경고는 끔
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+@pytest.fixture
+def manager(tmp_path, quiet_logs):
+    manager = DistributedLockManager(backend=lock_backends.SqliteLockBackend(tmp_path / "locks.db"),
+                                     machine_id="pc01")
+    manager.VALIDATE_RETRY_DELAY_SEC = 0
+    manager.connect()
+    yield manager
+    manager.close()
+
+
+def test_validate_token_current_lock(manager):
+    assert manager.acquire_lock("A1")
+    assert manager.validate_token("A1")
+    assert manager.validate_token("A1", manager.get_token("A1"))
+    assert not manager.validate_token("A1", manager.get_token("A1") + 1)
+
+
+def test_validate_token_standalone_without_lock(manager):
+    # 락을 잡은 적 없는 주문: 레코드가 없거나 저장소가 연결되지 않았으면 단독 실행으로 보고 허용
+    assert manager.validate_token("NEVER")
+    manager.backend.close()
+    assert manager.validate_token("NEVER")
+
+
+def test_validate_token_fails_closed_when_disconnected(manager):
+    assert manager.acquire_lock("A1")
+    manager.backend.close()
+    assert not manager.validate_token("A1")
+
+
+def test_validate_token_fails_closed_when_record_missing(manager):
+    assert manager.acquire_lock("A1")
+    assert manager.backend.cleanup(lambda row: row[0] == "A1") == 1
+    assert not manager.validate_token("A1")
+
+
+def test_validate_token_fails_closed_on_read_error(manager, monkeypatch):
+    assert manager.acquire_lock("A1")
+    calls = []
+
+    def broken_read(order_id):
+        calls.append(order_id)
+        raise OSError("network down")
+
+    monkeypatch.setattr(manager.backend, "read", broken_read)
+    assert not manager.validate_token("A1")
+    assert len(calls) == manager.VALIDATE_RETRIES + 1
+    # 토큰을 모르는 주문도 저장소를 읽을 수 없으면 거부
+    assert not manager.validate_token("UNKNOWN")
+
+
+def test_validate_token_retries_transient_read_error(manager, monkeypatch):
+    assert manager.acquire_lock("A1")
+    read = manager.backend.read
+    failures = [OSError("timeout")]
+
+    def flaky_read(order_id):
+        if failures:
+            raise failures.pop()
+        return read(order_id)
+
+    monkeypatch.setattr(manager.backend, "read", flaky_read)
+    assert manager.validate_token("A1")
+
+
+def test_validate_token_rejects_expired_lock(manager):
+    assert manager.acquire_lock("A1")
+    manager.clock = lambda: time.time() + manager.LOCK_TIMEOUT_SEC + 1
+    assert not manager.validate_token("A1")
+
+
+def _machine(tmp_path, machine_id, offset):
+    """같은 락 DB 를 쓰는 PC (시계가 offset 초 어긋남)"""
+    manager = DistributedLockManager(backend=lock_backends.SqliteLockBackend(tmp_path / "locks.db"),
+                                     machine_id=machine_id)
+    manager.LOCK_TIMEOUT_SEC = 45
+    manager.CLOCK_SKEW_SEC = 10
+    manager.clock = lambda: time.time() + offset
+    manager.connect()
+    return manager
+
+
+def test_lease_is_stored_as_utc_expiry(tmp_path, quiet_logs):
+    holder = _machine(tmp_path, "pc01", 0)
+    before = time.time()
+    assert holder.acquire_lock("A1")
+    expires_at = holder.get_lock_status("A1")["expires_at"]
+    assert before + 45 <= expires_at <= time.time() + 45
+    holder.close()
+
+
+def test_takeover_waits_for_clock_skew_margin(tmp_path, quiet_logs):
+    holder = _machine(tmp_path, "pc01", 0)
+    assert holder.acquire_lock("A1")
+
+    # 시계가 기한보다 5초 빠른 PC: 기한은 지난 것으로 보이지만 오차 여유(10초) 안 → 가져가지 않음
+    fast = _machine(tmp_path, "pc02", 50)
+    assert not fast.acquire_lock("A1")
+    assert holder.validate_token("A1")
+
+    # 기한 + 여유가 지난 PC 만 가져감, 원래 PC의 토큰은 낡은 것이 됨
+    later = _machine(tmp_path, "pc03", 56)
+    assert later.acquire_lock("A1")
+    assert later.validate_token("A1")
+    assert not holder.validate_token("A1")
+    for manager in (holder, fast, later):
+        manager.close()
+
+
+def test_renewal_extends_the_lease(tmp_path, quiet_logs):
+    holder = _machine(tmp_path, "pc01", 0)
+    assert holder.acquire_lock("A1")
+    first = holder.get_lock_status("A1")["expires_at"]
+
+    holder.clock = lambda: time.time() + 30
+    assert holder.renew_locks() == 1
+    assert holder.get_lock_status("A1")["expires_at"] >= first + 30
+
+    # 처음 기한 + 여유가 지났어도 갱신된 기한 안이면 가져가지 않음
+    other = _machine(tmp_path, "pc02", 60)
+    assert not other.acquire_lock("A1")
+    holder.close()
+    other.close()
+
+
+def test_rows_without_expiry_use_locked_at(tmp_path, quiet_logs):
+    # expires_at 열이 생기기 전에 기록된 행 (locked_at = 쓴 PC의 현지 시각)
+    holder = _machine(tmp_path, "pc01", 0)
+    assert holder.acquire_lock("A1")
+    locked_at = (datetime.datetime.now() - datetime.timedelta(seconds=50)).isoformat()
+    holder.backend._conn.execute("UPDATE locks SET expires_at = 0, locked_at = ? WHERE order_id = 'A1'",
+                                 (locked_at,))
+
+    assert not holder.validate_token("A1")
+    other = _machine(tmp_path, "pc02", 0)
+    assert not other.acquire_lock("A1")  # 50초 < 기한 45 + 여유 10
+    holder.backend._conn.execute("UPDATE locks SET locked_at = ? WHERE order_id = 'A1'",
+                                 ((datetime.datetime.now() - datetime.timedelta(seconds=56)).isoformat(),))
+    assert other.acquire_lock("A1")
+    holder.close()
+    other.close()
+
+
+# 케이스 이름 → (stress_lock_fencing 인자, 허용하는 위반)
+# 하트비트 없이 고정 기한만 쓰면 토큰 확인 뒤 해제 전에 기한이 지나 다른 PC가 다시 가져가 올릴 수 있음
+# (더 큰 토큰이라 ERP 가 받음 = 중복 업로드, 스크립트 설명의 고정 기한 한계) → 나머지 검사만 확인
+# sqlite 는 공유 디스크용이라 WAL 없이 쓰기가 직렬화됨 → 하트비트 간격/기한 비율을 실제 설정(15s/45s)에 가깝게
+STRESS_CASES = {
+    'memory': (["--backend", "memory", "--lock-timeout", "0.3"], {"중복 업로드"}),
+    'sqlite': (["--backend", "sqlite", "--lock-timeout", "0.3"], {"중복 업로드"}),
+    'memory_heartbeat_crash': (["--backend", "memory", "--lock-timeout", "0.5", "--heartbeat", "0.1",
+                                "--crash-rate", "0.1"], set()),
+    'memory_clock_skew': (["--backend", "memory", "--lock-timeout", "0.5", "--heartbeat", "0.1",
+                           "--clock-skew", "0.9", "--stall-rate", "0.05"], set()),
+    'sqlite_heartbeat': (["--backend", "sqlite", "--machines", "4", "--orders", "40", "--lock-timeout", "2.0",
+                          "--heartbeat", "0.2", "--stall-rate", "0.05"], set()),
+}
+
+
+@pytest.mark.parametrize("case", list(STRESS_CASES))
+def test_stress_no_violations(case, quiet_logs):
+    argv, allowed = STRESS_CASES[case]
+    args = stress_lock_fencing.parse_args(["--machines", "6", "--orders", "60", "--stall-rate", "0.1",
+                                           "--duration", "30"] + argv)
+    result = stress_lock_fencing.simulate(args)
+    violations = {name: items for name, items in result["violations"].items() if name not in allowed}
+    assert violations == {}
+    assert result["grants"] >= args.orders
+    if args.heartbeat:
+        assert sum(beat["renewed"] for beat in result["heartbeats"]) > 0
+
+
+def test_sqlite_upgrades_old_table(tmp_path, quiet_logs):
+    db_path = tmp_path / "locks.db"
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("CREATE TABLE locks (order_id TEXT PRIMARY KEY, locked_by TEXT, locked_at TEXT, status TEXT, "
+                 "machine_id TEXT, notes TEXT)")
+    conn.execute("INSERT INTO locks VALUES ('OLD1', 'pc09', '2026-01-07T10:30:00', 'completed', 'pc09', '')")
+    conn.commit()
+    conn.close()
+
+    manager = _machine(tmp_path, "pc01", 0)
+    assert manager.get_lock_status("OLD1")["expires_at"] == 0
+    assert not manager.acquire_lock("OLD1")
+    assert manager.acquire_lock("NEW1")
+    assert manager.get_lock_status("NEW1")["expires_at"] > time.time()
+    manager.close()
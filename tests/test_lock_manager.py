@@ -0,0 +1,105 @@
+"""
+DistributedLockManager.acquire_many 테스트 (가짜 시트 공유 = 여러 PC가 같은 락 시트를 보는 것과 같음)
+=====================================================================================================
+- 비어 있는 / 다른 PC가 잡은 / 기한이 지난 / 완료된 주문이 섞인 목록에서 가져가도 되는 주문만 획득
+- 획득한 주문마다 따로 펜싱 토큰 (같은 주문을 다시 가져가면 전보다 큰 토큰)
+- 다른 PC가 기한 안에 잡고 있는 주문은 절대 획득하지 않음
+"""
+
+import logging
+import time
+
+import pytest
+
+import lock_backends
+from lock_manager import DistributedLockManager
+
+
+@pytest.fixture
+def worksheet():
+    logging.disable(logging.WARNING)
+    yield lock_backends.MemoryWorksheet()
+    logging.disable(logging.NOTSET)
+
+
+def _machine(worksheet, machine_id, offset=0.0):
+    """같은 시트를 쓰는 PC (시계가 offset 초 어긋남)"""
+    manager = DistributedLockManager(backend=lock_backends.MemoryLockBackend(worksheet=worksheet, settle=0),
+                                     machine_id=machine_id)
+    manager.LOCK_TIMEOUT_SEC = 45
+    manager.CLOCK_SKEW_SEC = 10
+    manager.clock = lambda: time.time() + offset
+    manager.connect()
+    return manager
+
+
+def _expired_offset(manager):
+    return manager.LOCK_TIMEOUT_SEC + manager.CLOCK_SKEW_SEC + 1
+
+
+def test_acquire_many_mixed_orders(worksheet):
+    holder = _machine(worksheet, "pc01")
+    assert holder.acquire_lock("HELD")
+    assert holder.acquire_lock("DONE")
+    assert holder.release_lock("DONE")
+
+    # 기한 + 여유 전에 잡아 두고 갱신하지 않은 PC (죽은 PC)
+    crashed = _machine(worksheet, "pc03", offset=-_expired_offset(holder))
+    assert crashed.acquire_lock("STALE")
+    stale_token = crashed.get_token("STALE")
+
+    other = _machine(worksheet, "pc02")
+    won = other.acquire_many(["FREE1", "HELD", "STALE", "DONE", "FREE2", "FREE1", ""])
+
+    assert won == {"FREE1": 1, "STALE": stale_token + 1, "FREE2": 1}
+    assert other.held_locks() == won
+    for order_id, token in won.items():
+        assert other.get_lock_status(order_id)["machine_id"] == "pc02"
+        assert other.validate_token(order_id, token)
+
+    # 다른 PC의 주문은 그대로: 잡고 있던 PC의 토큰은 유효, 기한이 지난 PC의 토큰은 낡음
+    assert holder.get_lock_status("HELD")["machine_id"] == "pc01"
+    assert holder.validate_token("HELD")
+    assert holder.get_lock_status("DONE")["status"] == DistributedLockManager.STATUS_COMPLETED
+    assert not crashed.validate_token("STALE")
+    assert not crashed.release_lock("STALE")
+
+
+def test_acquire_many_tokens_increase_per_order(worksheet):
+    first = _machine(worksheet, "pc01")
+    assert first.acquire_many(["A1", "A2"]) == {"A1": 1, "A2": 1}
+    assert first.release_lock("A1", DistributedLockManager.STATUS_FAILED)
+
+    # 실패로 해제된 A1 은 바로, 기한이 지난 A2 는 여유 뒤에 가져감 - 주문마다 전보다 큰 토큰
+    second = _machine(worksheet, "pc02", offset=_expired_offset(first))
+    won = second.acquire_many(["A1", "A2", "A3"])
+    assert set(won) == {"A1", "A2", "A3"}
+    assert won["A1"] > 1 and won["A2"] > 1 and won["A3"] == 1
+    assert not first.validate_token("A2")
+
+    third = _machine(worksheet, "pc03", offset=2 * _expired_offset(first))
+    again = third.acquire_many(["A1", "A2", "A3"])
+    assert all(again[order_id] > won[order_id] for order_id in won)
+
+
+def test_acquire_many_never_takes_live_locks(worksheet):
+    holders = [_machine(worksheet, f"pc0{n}") for n in range(1, 4)]
+    held = {}
+    for n, holder in enumerate(holders):
+        order_ids = [f"O{n}{m}" for m in range(5)]
+        held.update(dict.fromkeys(holder.acquire_many(order_ids), holder.machine_id))
+    assert len(held) == 15
+
+    # 시계가 여유만큼 빠른 PC도 기한 안의 락은 가져가지 않음, 처음 보는 주문만 획득
+    fast = _machine(worksheet, "pc09", offset=holders[0].LOCK_TIMEOUT_SEC + holders[0].CLOCK_SKEW_SEC - 1)
+    won = fast.acquire_many(list(held) + ["NEW1"])
+    assert won == {"NEW1": 1}
+    for order_id, machine_id in held.items():
+        assert fast.get_lock_status(order_id)["machine_id"] == machine_id
+
+
+def test_acquire_many_when_disconnected(worksheet):
+    manager = DistributedLockManager(backend=lock_backends.MemoryLockBackend(worksheet=worksheet, settle=0),
+                                     machine_id="pc01")
+    manager.backend.lock_worksheet = None
+    assert manager.acquire_many(["A1"]) == {}
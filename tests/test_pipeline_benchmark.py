@@ -0,0 +1,132 @@
+"""
+local_file_processor 파이프라인 단계별 벤치마크 (pytest-benchmark)
+==================================================================
+gen_order_pages 로 만든 작은/보통/큰 예림 거래명세서 페이지에서 단계별 시간을 측정
+(예림은 회사 키워드 우선순위가 가장 낮아 detect_company 가 HTML 전체를 여러 번 훑는 경우)
+
+단계:
+- decode_order_bytes       : MHTML 파일 바이트 → HTML (이미지 파트 포함, 실제 파일 읽기 경로)
+- extract_html_from_mhtml  : MHTML 텍스트 → HTML (MIME 구조가 아닐 때 쓰는 정규식 방식)
+- parse_html_table         : HTML → 9열 행
+- detect_company           : 회사명 탐지 (HTML 전체 + 행 데이터)
+- generate_product_code    : 페이지의 모든 행에 대해 품목코드 생성 (캐시 없음)
+- process_html_content     : 전체 처리 (코드 캐시가 채워진 상태 = 서버 상시 실행 상태)
+- process_html_content_cold: 전체 처리 (매번 코드 캐시를 비움)
+
+각 단계는 결과도 확인하므로 일반 테스트 실행(--benchmark-disable: 한 번만 실행)에서도 검사됨
+huge(2000행) 는 몇십 초 걸리므로 BENCH_HUGE=1 일 때만 실행
+
+기준값 저장/비교 (느려지면 실패):
+    python -m pytest tests/test_pipeline_benchmark.py --benchmark-save=baseline
+    python -m pytest tests/test_pipeline_benchmark.py --benchmark-compare=0001 --benchmark-compare-fail=min:10%
+    BENCH_HUGE=1 python -m pytest tests/test_pipeline_benchmark.py -k "huge and parse_html_table"
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+import local_file_processor as lfp  # noqa: E402
+from conftest import ROOT_DIR  # noqa: E402
+
+sys.path.insert(0, os.path.join(ROOT_DIR, "benchmarks"))
+from bench_mhtml import build_mhtml  # noqa: E402
+from gen_order_pages import build_page  # noqa: E402
+
+SEED = 42
+
+# 크기 이름 → (품목 행 수, MHTML 이미지 파트 수, 이미지 크기 KB)
+SIZES = {
+    'small': (5, 2, 20),
+    'typical': (40, 10, 50),
+    'huge': (2000, 40, 100),
+}
+
+SIZE_PARAMS = [
+    pytest.param(size, marks=pytest.mark.skipif(size == 'huge' and not os.getenv('BENCH_HUGE'),
+                                                reason="BENCH_HUGE=1 일 때만 실행"))
+    for size in SIZES
+]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def no_parse_cache():
+    # 벤치마크 중에는 파싱 캐시를 쓰지 않음
+    enabled = lfp.PARSE_CACHE.enabled
+    lfp.PARSE_CACHE.enabled = False
+    yield
+    lfp.PARSE_CACHE.enabled = enabled
+
+
+_INPUTS = {}
+
+
+def make_inputs(size: str) -> dict:
+    """크기별 입력 (HTML, MHTML 바이트/텍스트, 파싱 행, 회사 정보), 모듈 안에서 한 번만 생성"""
+    if size not in _INPUTS:
+        rows, images, image_kb = SIZES[size]
+        html, _ = build_page(random.Random(f"{SEED}:{size}"), 'ledger', 'y', rows, noise=2)
+        mhtml = build_mhtml(html, 'utf-8', True, images, image_kb * 1024, seed=SEED)
+        raw_data = lfp.parse_html_table(html)
+        _INPUTS[size] = {
+            'html': html,
+            'mhtml': mhtml,
+            'mhtml_text': mhtml.decode('utf-8', errors='replace'),
+            'rows': raw_data,
+            'company': lfp.detect_company(html, raw_data),
+        }
+    return _INPUTS[size]
+
+
+def _generate_codes(rows: list, brand: str) -> list:
+    return [lfp.generate_product_code(row.color, row.item, row.spec, row.remarks, brand) for row in rows]
+
+
+def _quiet(func, *args):
+    # process_html_content 의 진행 로그는 버림
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def _process_cold(html: str) -> list:
+    lfp.CODE_CACHE.clear()
+    return _quiet(lfp.process_html_content, html, 'bench')
+
+
+# 단계 이름 → (입력 dict 를 받아 한 번 실행하는 함수, 결과 확인 함수)
+STAGES = {
+    'decode_order_bytes': (lambda d: lfp.decode_order_bytes(d['mhtml'], 'bench.mhtml'),
+                           lambda d, out: out.strip() == d['html'].strip()),
+    'extract_html_from_mhtml': (lambda d: lfp.extract_html_from_mhtml(d['mhtml_text']),
+                                lambda d, out: lfp._normalize_newlines(out).strip() == d['html'].strip()),
+    'parse_html_table': (lambda d: lfp.parse_html_table(d['html']),
+                         lambda d, out: len(out) == len(d['rows'])),
+    'detect_company': (lambda d: lfp.detect_company(d['html'], d['rows']),
+                       lambda d, out: out['brand'] == 'y'),
+    'generate_product_code': (lambda d: _generate_codes(d['rows'], d['company']['brand']),
+                              lambda d, out: len(out) == len(d['rows'])),
+    'process_html_content': (lambda d: _quiet(lfp.process_html_content, d['html'], 'bench'),
+                             lambda d, out: len(out) >= len(d['rows'])),
+    'process_html_content_cold': (lambda d: _process_cold(d['html']),
+                                  lambda d, out: len(out) >= len(d['rows'])),
+}
+
+
+@pytest.mark.parametrize("size", SIZE_PARAMS)
+@pytest.mark.parametrize("stage", list(STAGES))
+def test_pipeline_stage(benchmark, stage, size):
+    data = make_inputs(size)
+    func, check = STAGES[stage]
+    func(data)  # 준비 실행 (코드 캐시/정규식 컴파일 등)
+    benchmark.group = stage
+    benchmark.extra_info.update(size=size, rows=len(data['rows']), html_kb=len(data['html']) // 1024,
+                                parser_backend=lfp.table_parser.resolve_backend(),
+                                codegen_version=lfp.CODEGEN_VERSION)
+    out = benchmark(func, data)
+    assert check(data, out)
@@ -1,10 +1,10 @@
 import os
 import time
-import json
 import threading
 import sys
 import subprocess
 import datetime
+import atexit
 from flask import Flask, jsonify, request, render_template_string
 from pathlib import Path
 from selenium import webdriver
@@ -21,14 +21,17 @@ from error_handler import error_handler, ErrorSeverity
 
 # V10: Import distributed lock manager
 from lock_manager import DistributedLockManager
+import history_store as history_store_module
+from completed_filter import CompletedOrderFilter
 
-# Import existing logic
+# Import existing logic (a failure is reported by main(), not at import time)
+import_error = None
 try:
     import local_file_processor
+    import code_rules
     from erp_upload_automation_v2 import ErpUploadAutomation
 except ImportError as e:
-    logger.critical(f"Error importing modules: {e}")
-    sys.exit(1)
+    import_error = e
 
 # Server setup
 app = Flask(__name__)
@@ -36,8 +39,14 @@ lock = threading.Lock()
 ledger_lock = threading.Lock()
 estimate_lock = threading.Lock()
 
-# V10: Initialize distributed lock manager
-distributed_lock = DistributedLockManager()
+# Services are created by init_services() from main(), never at import time:
+# process_many_parallel's spawn workers re-import this module as __mp_main__ and must not
+# build their own lock manager / browser / history store / filter (or exit the worker)
+distributed_lock = None
+browser_manager = None
+history_store = None
+completed_filter = None
+completed_filter_seeded_at = 0.0
 
 # Status tracking
 server_status = {
@@ -103,6 +112,14 @@ HTML_TEMPLATE = """
                     lockStatus.style.color = '#f5576c';
                 }
                 lockMachine.innerText = data.status.machine_id || 'Unknown';
+                const lockCache = data.lock_cache;
+                document.getElementById('lock-cache').innerText = lockCache.hits === undefined
+                    ? `${lockCache.backend} (${lockCache.entries} rows, no cache)`
+                    : `${lockCache.backend}: ${(lockCache.hit_rate * 100).toFixed(1)}% hit (${lockCache.hits}/${lockCache.hits + lockCache.misses}), ${lockCache.entries} rows`;
+                const lease = data.lock_heartbeat;
+                document.getElementById('lock-lease').innerText = lease.running
+                    ? `${lease.lease_sec}s, renewed every ${lease.interval_sec}s (${lease.held} held, ${lease.lost} lost)`
+                    : `${lease.lease_sec}s, heartbeat stopped`;
 
                 // Update Downloader
                 document.getElementById('dl-status').innerText = data.status.downloader_status;
@@ -163,6 +180,8 @@ HTML_TEMPLATE = """
             <div class="status-box">
                 <div><span class="label">Status:</span><span class="val" id="lock-status">Loading...</span></div>
                 <div><span class="label">Machine ID:</span><span class="val" id="lock-machine">-</span></div>
+                <div><span class="label">Lock Store:</span><span class="val" id="lock-cache">-</span></div>
+                <div><span class="label">Lease:</span><span class="val" id="lock-lease">-</span></div>
             </div>
         </div>
 
@@ -256,26 +275,50 @@ class DoorBrowser:
     def navigate(self, url):
         self.driver.get(url)
 
-browser_manager = DoorBrowser()
+def init_services():
+    """Create the lock manager, browser, history store and completed filter (server process only)"""
+    global distributed_lock, browser_manager, history_store, completed_filter
 
-def load_history():
-    """Load history with ledger/estimate separation"""
-    default_history = {"ledger": [], "estimate": []}
-    if os.path.exists(config.HISTORY_FILE):
-        try:
-            with open(config.HISTORY_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # Handle legacy format (list)
-                if isinstance(data, list):
-                    return {"ledger": data, "estimate": []}
-                return data
-        except:
-            return default_history
-    return default_history
-
-def save_history(history_dict):
-    with open(config.HISTORY_FILE, 'w', encoding='utf-8') as f:
-        json.dump(history_dict, f, ensure_ascii=False, indent=2)
+    # V10: Initialize distributed lock manager
+    distributed_lock = DistributedLockManager()
+
+    browser_manager = DoorBrowser()
+
+    # Processing history (shared in-memory index, persisted by the HISTORY_BACKEND store)
+    # (a corrupt history file stops the server instead of starting empty and re-downloading everything)
+    try:
+        history_store = history_store_module.open_history_store(
+            config.HISTORY_BACKEND, db_path=config.HISTORY_DB, json_path=config.HISTORY_FILE,
+            fsync_interval=config.HISTORY_FSYNC_INTERVAL_SEC, compact_every=config.HISTORY_COMPACT_EVERY,
+            commit_window=config.HISTORY_COMMIT_WINDOW_SEC)
+    except history_store_module.HistoryCorruptError as e:
+        logger.critical(f"[Server] {e} - restore the file from backup or remove it to start with empty history")
+        sys.exit(1)
+
+    # Completed order filter (skips orders finished anywhere before the lock sheet round trip)
+    completed_filter = CompletedOrderFilter(
+        config.COMPLETED_FILTER_PATH, capacity=config.COMPLETED_FILTER_CAPACITY,
+        error_rate=config.COMPLETED_FILTER_ERROR_RATE) if config.COMPLETED_FILTER_ENABLED else None
+
+def seed_completed_filter():
+    """Add local history and completed lock sheet orders to the filter (one sheet read)"""
+    global completed_filter_seeded_at
+    if completed_filter is None:
+        return
+    added = 0
+    for order_ids in history_store.as_dict().values():
+        added += completed_filter.add_many(order_ids)
+    if server_status["lock_manager_connected"]:
+        added += completed_filter.add_many(distributed_lock.get_completed_ids())
+    completed_filter_seeded_at = time.time()
+    completed_filter.save()
+    logger.info(f"[Server] Completed filter seeded: +{added} ({completed_filter})")
+
+def persist_code_cache():
+    """품목코드 캐시를 디스크에 저장 (재시작 후 warm cache 유지)"""
+    if config.CODE_CACHE_PERSIST:
+        if not local_file_processor.save_code_cache(config.CODE_CACHE_PATH):
+            logger.warning(f"[Server] Failed to save code cache: {config.CODE_CACHE_PATH}")
 
 class AutoDownloader(threading.Thread):
     """Background thread to download files from both ledger and estimate pages"""
@@ -315,6 +358,10 @@ class AutoDownloader(threading.Thread):
 
         logger.info("[Downloader] Starting cycle...")
 
+        # Refresh the completed order filter from the lock sheet now and then
+        if completed_filter is not None and time.time() - completed_filter_seeded_at >= config.COMPLETED_FILTER_RESEED_SEC:
+            seed_completed_filter()
+
         # 1. Launch/Check Browser
         browser_manager.launch()
 
@@ -361,9 +408,12 @@ class AutoDownloader(threading.Thread):
         rows = soup.select("table tbody tr")
         logger.info(f"[Downloader] Found {len(rows)} rows in table")
 
-        history = load_history()
         downloaded_count = 0
+        filtered_count = 0
 
+        # Collect candidate orders on this page
+        candidates = []
+        seen = set()
         for row in rows:
             cols = row.find_all("td")
             if len(cols) < 3:
@@ -374,17 +424,33 @@ class AutoDownloader(threading.Thread):
             if not order_no or order_no == "":
                 continue
 
-            # V10: Check distributed lock BEFORE checking local history
-            if not distributed_lock.acquire_lock(order_no, notes=f"Download attempt from {doc_type}"):
+            # Completed somewhere already (local filter, no network call)
+            if completed_filter is not None and completed_filter.might_contain(order_no):
+                completed_filter.record_skip()
+                filtered_count += 1
+                continue
+
+            if order_no not in seen:
+                seen.add(order_no)
+                candidates.append((order_no, cols))
+
+        # V10: Claim the whole page in one lock sheet read + batched write, BEFORE checking local history
+        acquired = distributed_lock.acquire_many([order_no for order_no, _ in candidates],
+                                                 notes=f"Download attempt from {doc_type}") if candidates else set()
+
+        for order_no, cols in candidates:
+            if order_no not in acquired:
                 logger.info(f"[V10] Order {order_no} is locked by another machine or already completed - skipping")
                 continue
 
             # Check local history (backward compatibility)
-            if order_no in history.get(doc_type, []):
+            if history_store.contains(doc_type, order_no):
                 logger.info(f"[Downloader] {order_no} already in local history - skipping")
                 # Release lock since we're skipping
                 distributed_lock.release_lock(order_no, status=DistributedLockManager.STATUS_COMPLETED,
                                             notes="Already in local history")
+                if completed_filter is not None:
+                    completed_filter.add(order_no)
                 continue
 
             try:
@@ -425,12 +491,13 @@ class AutoDownloader(threading.Thread):
                 logger.info(f"[Downloader] ✅ Saved {filepath}")
 
                 # Add to local history
-                history[doc_type].append(order_no)
-                save_history(history)
+                history_store.add(doc_type, order_no)
 
                 # V10: Update lock status to completed
                 distributed_lock.release_lock(order_no, status=DistributedLockManager.STATUS_COMPLETED,
                                             notes="Download successful")
+                if completed_filter is not None:
+                    completed_filter.add(order_no)
 
                 downloaded_count += 1
 
@@ -441,6 +508,11 @@ class AutoDownloader(threading.Thread):
                                             notes=f"Download error: {str(e)[:100]}")
                 continue
 
+        if filtered_count:
+            logger.info(f"[Downloader] Skipped {filtered_count} completed orders without a lock lookup")
+        if completed_filter is not None:
+            completed_filter.save()
+
         return downloaded_count
 
 # Flask Routes
@@ -450,8 +522,6 @@ def index():
 
 @app.route('/api/stats')
 def get_stats():
-    history = load_history()
-
     ledger_files = list((config.DOWNLOADS_DIR / "ledger").glob("*.html")) + \
                    list((config.DOWNLOADS_DIR / "ledger").glob("*.mhtml"))
     estimate_files = list((config.DOWNLOADS_DIR / "estimate").glob("*.html")) + \
@@ -460,11 +530,8 @@ def get_stats():
     ledger_ids = {f.stem for f in ledger_files}
     estimate_ids = {f.stem for f in estimate_files}
 
-    ledger_history_set = set(history.get("ledger", []))
-    estimate_history_set = set(history.get("estimate", []))
-
-    ledger_pending = ledger_ids - ledger_history_set
-    estimate_pending = estimate_ids - estimate_history_set
+    ledger_pending = [i for i in ledger_ids if not history_store.contains("ledger", i)]
+    estimate_pending = [i for i in estimate_ids if not history_store.contains("estimate", i)]
 
     return jsonify({
         "status": server_status,
@@ -473,11 +540,22 @@ def get_stats():
             "estimate": len(estimate_pending)
         },
         "history_count": {
-            "ledger": len(ledger_history_set),
-            "estimate": len(estimate_history_set)
-        }
+            "ledger": history_store.count("ledger"),
+            "estimate": history_store.count("estimate")
+        },
+        "history": history_store.stats(),
+        "lock_cache": distributed_lock.cache_stats(),
+        "lock_heartbeat": distributed_lock.heartbeat_stats(),
+        "code_cache": local_file_processor.CODE_CACHE.stats(),
+        "parse_cache": local_file_processor.PARSE_CACHE.stats(),
+        "completed_filter": completed_filter.stats() if completed_filter is not None else None
     })
 
+@app.route('/api/rule_stats')
+def get_rule_stats():
+    """품목코드 규칙별 적중 횟수 (어떤 우선순위 분기가 쓰이는지 확인용)"""
+    return jsonify(code_rules.rule_hit_stats())
+
 @app.route('/trigger_ledger', methods=['POST'])
 def trigger_ledger_upload():
     """Trigger ledger upload with lock awareness"""
@@ -495,10 +573,7 @@ def trigger_ledger_upload():
                 ledger_dir = config.DOWNLOADS_DIR / "ledger"
                 html_files = list(ledger_dir.glob("*.html")) + list(ledger_dir.glob("*.mhtml"))
 
-                history = load_history()
-                history_set = set(history.get("ledger", []))
-
-                pending_files = [f for f in html_files if f.stem not in history_set]
+                pending_files = [f for f in html_files if not history_store.contains("ledger", f.stem)]
 
                 if not pending_files:
                     logger.info("[Server] No pending ledger files to process")
@@ -506,23 +581,40 @@ def trigger_ledger_upload():
                     ledger_lock.release()
                     return
 
-                # Process each file
+                # V10: Double-check distributed lock
+                upload_files = []
                 for html_file in pending_files:
                     order_id = html_file.stem
-
-                    # V10: Double-check distributed lock
                     lock_status = distributed_lock.get_lock_status(order_id)
                     if lock_status and lock_status['status'] == DistributedLockManager.STATUS_COMPLETED:
                         logger.info(f"[V10] {order_id} already completed by another machine - skipping")
                         continue
+                    upload_files.append(html_file)
 
-                    logger.info(f"[Server] Processing ledger file: {html_file.name}")
+                # Parse all files in one batch (unique rows are coded once)
+                batch = local_file_processor.process_many_parallel(
+                    upload_files, target_type='ledger', workers=config.PARALLEL_WORKERS or None)
+                logger.info(f"[Server] Parsed {len(upload_files)} ledger files: "
+                            f"{batch['row_count']} rows ({batch['unique_count']} unique)")
+
+                # Upload each file
+                for file_result in batch["files"]:
+                    order_id = file_result["order_id"]
+                    logger.info(f"[Server] Processing ledger file: {os.path.basename(file_result['path'])}")
 
                     try:
-                        # Parse and process
-                        erp_data = local_file_processor.process_html_content(str(html_file))
+                        if file_result["error"]:
+                            logger.error(f"[Server] Error processing {order_id}: {file_result['error']}")
+                            continue
+
+                        erp_data = file_result["erp_rows"]
 
                         if erp_data:
+                            # V10: Fencing check right before the ERP upload
+                            if not distributed_lock.validate_token(order_id):
+                                logger.warning(f"[V10] {order_id} failed the fencing check (stale token or lock store unreachable) - skipping upload")
+                                continue
+
                             # Upload to ERP
                             automation = ErpUploadAutomation()
                             success = automation.run(direct_data=erp_data, auto_close=True, target_type='ledger')
@@ -530,8 +622,7 @@ def trigger_ledger_upload():
 
                             if success:
                                 # Add to history
-                                history["ledger"].append(order_id)
-                                save_history(history)
+                                history_store.add("ledger", order_id)
                                 logger.info(f"[Server] ✅ Successfully uploaded {order_id}")
                             else:
                                 logger.error(f"[Server] ❌ Failed to upload {order_id}")
@@ -549,6 +640,7 @@ def trigger_ledger_upload():
                 logger.error(f"[Server] Ledger upload error: {e}")
                 server_status["ledger_uploader_status"] = "Idle"
             finally:
+                persist_code_cache()
                 ledger_lock.release()
 
         thread = threading.Thread(target=run_upload, daemon=True)
@@ -577,10 +669,7 @@ def trigger_estimate_upload():
                 estimate_dir = config.DOWNLOADS_DIR / "estimate"
                 html_files = list(estimate_dir.glob("*.html")) + list(estimate_dir.glob("*.mhtml"))
 
-                history = load_history()
-                history_set = set(history.get("estimate", []))
-
-                pending_files = [f for f in html_files if f.stem not in history_set]
+                pending_files = [f for f in html_files if not history_store.contains("estimate", f.stem)]
 
                 if not pending_files:
                     logger.info("[Server] No pending estimate files to process")
@@ -588,23 +677,40 @@ def trigger_estimate_upload():
                     estimate_lock.release()
                     return
 
-                # Process each file
+                # V10: Double-check distributed lock
+                upload_files = []
                 for html_file in pending_files:
                     order_id = html_file.stem
-
-                    # V10: Double-check distributed lock
                     lock_status = distributed_lock.get_lock_status(order_id)
                     if lock_status and lock_status['status'] == DistributedLockManager.STATUS_COMPLETED:
                         logger.info(f"[V10] {order_id} already completed by another machine - skipping")
                         continue
+                    upload_files.append(html_file)
 
-                    logger.info(f"[Server] Processing estimate file: {html_file.name}")
+                # Parse all files in one batch (unique rows are coded once)
+                batch = local_file_processor.process_many_parallel(
+                    upload_files, target_type='estimate', workers=config.PARALLEL_WORKERS or None)
+                logger.info(f"[Server] Parsed {len(upload_files)} estimate files: "
+                            f"{batch['row_count']} rows ({batch['unique_count']} unique)")
+
+                # Upload each file
+                for file_result in batch["files"]:
+                    order_id = file_result["order_id"]
+                    logger.info(f"[Server] Processing estimate file: {os.path.basename(file_result['path'])}")
 
                     try:
-                        # Parse and process
-                        erp_data = local_file_processor.process_html_content(str(html_file))
+                        if file_result["error"]:
+                            logger.error(f"[Server] Error processing {order_id}: {file_result['error']}")
+                            continue
+
+                        erp_data = file_result["erp_rows"]
 
                         if erp_data:
+                            # V10: Fencing check right before the ERP upload
+                            if not distributed_lock.validate_token(order_id):
+                                logger.warning(f"[V10] {order_id} failed the fencing check (stale token or lock store unreachable) - skipping upload")
+                                continue
+
                             # Upload to ERP
                             automation = ErpUploadAutomation()
                             success = automation.run(direct_data=erp_data, auto_close=True, target_type='estimate')
@@ -612,8 +718,7 @@ def trigger_estimate_upload():
 
                             if success:
                                 # Add to history
-                                history["estimate"].append(order_id)
-                                save_history(history)
+                                history_store.add("estimate", order_id)
                                 logger.info(f"[Server] ✅ Successfully uploaded {order_id}")
                             else:
                                 logger.error(f"[Server] ❌ Failed to upload {order_id}")
@@ -631,6 +736,7 @@ def trigger_estimate_upload():
                 logger.error(f"[Server] Estimate upload error: {e}")
                 server_status["estimate_uploader_status"] = "Idle"
             finally:
+                persist_code_cache()
                 estimate_lock.release()
 
         thread = threading.Thread(target=run_upload, daemon=True)
@@ -649,21 +755,54 @@ def reset_status():
     return jsonify({"status": "success"})
 
 # Main Execution
-if __name__ == "__main__":
+def main():
+    if import_error is not None:
+        logger.critical(f"Error importing modules: {import_error}")
+        sys.exit(1)
+
     logger.info("=" * 60)
     logger.info("V10 Auto Server Starting - Distributed Lock Edition")
     logger.info("=" * 60)
 
-    # V10: Initialize distributed lock manager
+    init_services()
+
+    # V10: Connect distributed lock manager
     logger.info("[V10] Connecting to distributed lock manager...")
     if distributed_lock.connect():
         server_status["lock_manager_connected"] = True
         server_status["machine_id"] = distributed_lock.machine_id
-        logger.info(f"[V10] ✅ Distributed lock manager connected (Machine: {distributed_lock.machine_id})")
+        logger.info(f"[V10] ✅ Distributed lock manager connected (Machine: {distributed_lock.machine_id}, "
+                    f"backend: {distributed_lock.backend.name})")
+        # Keep held locks alive with short leases; a crashed machine's orders are recovered after
+        # LOCK_TIMEOUT_SEC + LOCK_CLOCK_SKEW_SEC
+        distributed_lock.start_heartbeat()
+        atexit.register(distributed_lock.close)
     else:
         logger.warning("[V10] ⚠️ Failed to connect to distributed lock manager - running in standalone mode")
         server_status["lock_manager_connected"] = False
 
+    # Code generation cache (warm start)
+    local_file_processor.CODE_CACHE.maxsize = config.CODE_CACHE_SIZE
+    if config.CODE_CACHE_PERSIST:
+        loaded = local_file_processor.load_code_cache(config.CODE_CACHE_PATH)
+        logger.info(f"[Server] Code cache loaded: {loaded} entries")
+        atexit.register(persist_code_cache)
+
+    # Parse result cache (unchanged downloads are not reparsed on retry)
+    local_file_processor.PARSE_CACHE.directory = config.PARSE_CACHE_DIR
+    local_file_processor.PARSE_CACHE.enabled = config.PARSE_CACHE_ENABLED
+
+    # Processing history
+    if getattr(history_store, "migrated", 0):
+        logger.info(f"[Server] Imported {history_store.migrated} history entries from {config.HISTORY_FILE}")
+    logger.info(f"[Server] History ({history_store.backend}): {history_store.counts()}")
+    atexit.register(history_store.close)
+
+    # Completed order filter (persisted; reseeded from history + lock sheet)
+    if completed_filter is not None:
+        seed_completed_filter()
+        atexit.register(completed_filter.save)
+
     # Start Auto Downloader
     downloader = AutoDownloader()
     downloader.start()
@@ -675,3 +814,6 @@ if __name__ == "__main__":
     logger.info(f"[Server] Dashboard: http://localhost:{config.FLASK_PORT}")
 
     app.run(host='0.0.0.0', port=config.FLASK_PORT, debug=config.FLASK_DEBUG, use_reloader=False)
+
+if __name__ == "__main__":
+    main()
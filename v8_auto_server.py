@@ -400,22 +400,21 @@ def manual_upload_process(source_type, erp_target):
             
         logger.info(f"[Uploader] Found {len(pending_files)} pending {source_type} files. Proceeding with upload...")
         
-        all_data_rows = []
         processed_chulhanos = []
         
-        for fpath in pending_files:
-            fname = os.path.basename(fpath)
-            chulhano = os.path.splitext(fname)[0]
-            
-            # V7/V8 logic: Determine type for parser
-            file_target_type = 'estimate' if source_type == 'estimate' else 'ledger'
-            try:
-                data_rows = local_file_processor.process_html_file(fpath, target_type=file_target_type)
-                if data_rows:
-                    all_data_rows.extend(data_rows)
-                    processed_chulhanos.append(chulhano)
-            except Exception as e:
-                error_handler.handle(e, context={"file": fname, "type": source_type}, severity=ErrorSeverity.MEDIUM)
+        # V7/V8 logic: Determine type for parser
+        file_target_type = 'estimate' if source_type == 'estimate' else 'ledger'
+        batch = local_file_processor.process_many(pending_files, target_type=file_target_type)
+        
+        for file_result in batch["files"]:
+            fname = os.path.basename(file_result["path"])
+            if file_result["error"]:
+                error_handler.log_error(f"Failed to process {fname}: {file_result['error']}",
+                                        ErrorSeverity.MEDIUM, {"file": fname, "type": source_type})
+            elif file_result["erp_rows"]:
+                processed_chulhanos.append(file_result["order_id"])
+        
+        all_data_rows = batch["erp_rows"]
 
         if not all_data_rows:
              logger.info(f"[Uploader] No valid data rows extracted from {len(pending_files)} pending files.")